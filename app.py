@@ -13,6 +13,8 @@ from pathlib import Path
 from flask import Flask, render_template, request, jsonify, redirect, url_for
 from flask_cors import CORS
 
+import db_codec
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'oremus'
 app.config['JSON_AS_ASCII'] = False
@@ -58,7 +60,9 @@ def get_db_connection():
             return None
 
         conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        # Righe come sqlite3.Row, con i testi condivisi (tabella testi) e le colonne compresse già risolti
+        conn.row_factory = db_codec.row_factory
+        db_codec.registra_funzioni(conn)
         return conn
     except Exception as e:
         print(f"❌ Errore connessione DB: {e}")
@@ -1441,10 +1445,10 @@ def get_lodi_with_antifone_salmi(lodi_id):
         print(f"\n📚 Caricamento Lodi ID: {lodi_id}")
 
         # Recupera le antifone e i salmi per questa lodi
-        cursor.execute('''
-            SELECT * FROM antifone_salmi 
-            WHERE lodi_id = ? 
-            ORDER BY antifona_numero
+        # Testo dei salmi dalla tabella salmi (righe migrate) o dalla riga stessa
+        cursor.execute(db_codec.SELECT_ANTIFONE_SALMI + '''
+            WHERE a.lodi_id = ?
+            ORDER BY a.antifona_numero
         ''', (lodi_id,))
 
         antifone_salmi_rows = cursor.fetchall()
@@ -1565,10 +1569,10 @@ def get_vespri_with_antifone_salmi(vespri_id):
         print(f"\n🌙 Caricamento Vespri ID: {vespri_id}")
 
         # Recupera le antifone e i salmi per questi vespri
-        cursor.execute('''
-            SELECT * FROM antifone_salmi 
-            WHERE vespri_id = ? 
-            ORDER BY antifona_numero
+        # Testo dei salmi dalla tabella salmi (righe migrate) o dalla riga stessa
+        cursor.execute(db_codec.SELECT_ANTIFONE_SALMI + '''
+            WHERE a.vespri_id = ?
+            ORDER BY a.antifona_numero
         ''', (vespri_id,))
 
         antifone_salmi_rows = cursor.fetchall()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Benchmark dell'estrazione e del parsing delle pagine della liturgia
+
+Lavora interamente offline su un corpus congelato di pagine salvate
+(<dir>/<ora>/<YYYYMMDD>.html) che copre i tempi dell'anno liturgico
+(CORPUS_DATE). Il corpus incluso in fixtures/pagine è sintetico, con la
+struttura delle pagine reali (menu e script prima del testo, marcatore
+ripetuto, "Condividi" in chiusura, script jQuery nella pagina del santo);
+i giorni 20241216 e 20250121 hanno anche il rumore del markup reale tra i
+marcatori (script e stili che contengono i marcatori, annunci, commenti,
+entità). --registra lo sostituisce con le pagine vere.
+
+L'output del parsing del corpus è congelato in fixtures/attesi.json, con cui
+i test confrontano ogni giorno: dopo --registra o una modifica voluta del
+parser va rigenerato con --salva-attesi.
+
+Misura:
+
+- le pagine al secondo dei backend di estrazione (BeautifulSoup, streaming,
+  lxml se installato);
+- la latenza per pagina di ogni stadio (estrazione, clean_text,
+  clean_duplicate_lines, parse, pagina completa) con i percentili;
+- il picco di memoria di ogni stadio (tracemalloc).
+
+I risultati possono essere salvati come baseline JSON e confrontati con
+un'esecuzione successiva: il confronto termina con codice 1 se uno stadio
+rallenta oltre la soglia.
+
+Uso:
+    python benchmark.py --registra [--cache-dir cache]        # una tantum, serve la rete o la cache
+    python benchmark.py [--dir fixtures/pagine] [--repeat 5] [--salva-baseline benchmark_baseline.json]
+    python benchmark.py --confronta benchmark_baseline.json [--soglia 10]
+    python benchmark.py --salva-attesi [fixtures/attesi.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from old.lrgyParser import (BaseLiturgiaParser, LiturgiaManager, PAGINE_ORE, SantoParser, estrai_testo_ora,
+                            lxml, parse_page)
+from verify_extractor import pagine_da_cartella
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CORPUS_DIR = os.path.join(FIXTURES_DIR, "pagine")
+ATTESI_PATH = os.path.join(FIXTURES_DIR, "attesi.json")
+
+# Giorni del corpus per tempo liturgico (anno 2024/2025); ogni giorno ha lodi, vespri e santo
+CORPUS_DATE = {
+    "avvento": ["20241201", "20241216"],
+    "natale": ["20241225"],
+    "quaresima": ["20250305"],
+    "settimana_santa": ["20250418"],
+    "pasqua": ["20250420"],
+    "tempo_ordinario": ["20250121", "20250715"],
+    "solennita": ["20250815"],
+}
+
+STADI = ("estrazione", "clean_text", "clean_duplicate_lines", "parse", "pagina")
+PERCENTILI = (50, 90, 99)
+
+
+def registra_corpus(cartella: str = CORPUS_DIR, cache_dir: Optional[str] = None) -> int:
+    """
+    Salva nella cartella del corpus le pagine dei giorni di CORPUS_DATE.
+
+    Le pagine vengono prese dalla cache HTML se presenti, altrimenti scaricate.
+
+    Returns:
+        int: numero di pagine salvate
+    """
+    manager = LiturgiaManager(cache_dir=cache_dir)
+    salvate = 0
+    try:
+        for tempo, date in CORPUS_DATE.items():
+            for date_str in date:
+                for ora in LiturgiaManager.ORE:
+                    url = manager.page_url(date_str, ora)
+                    try:
+                        html = manager._fetch(url, date_str)
+                    except Exception as e:
+                        print(f"❌ {tempo} {date_str} {ora}: {e}")
+                        continue
+                    if not html:
+                        print(f"⚠️  {tempo} {date_str} {ora}: pagina vuota")
+                        continue
+                    os.makedirs(os.path.join(cartella, ora), exist_ok=True)
+                    with open(os.path.join(cartella, ora, f"{date_str}.html"), "w", encoding="utf-8") as f:
+                        f.write(html)
+                    salvate += 1
+    finally:
+        manager.close()
+    return salvate
+
+
+def _data_pagina(nome: str) -> str:
+    """YYYYMMDD dal nome del file della pagina, se presente"""
+    base = os.path.splitext(os.path.basename(nome))[0]
+    return base if len(base) == 8 and base.isdigit() else ""
+
+
+def parse_corpus(cartella: str = CORPUS_DIR) -> Dict[str, Dict]:
+    """
+    Parsifica il corpus giorno per giorno.
+
+    Returns:
+        dict: {YYYYMMDD: Day.to_dict()} nell'ordine delle date
+    """
+    giorni = {}
+    for nome, ora, html in pagine_da_cartella(cartella):
+        date_str = _data_pagina(nome)
+        if date_str not in giorni:
+            giorni[date_str] = LiturgiaManager._new_day(date_str)
+        setattr(giorni[date_str], ora, parse_page(ora, html, date_str))
+    return {date_str: giorni[date_str].to_dict() for date_str in sorted(giorni)}
+
+
+def _estrattori() -> Dict[str, Callable]:
+    estrattori = {
+        "bs4 (html.parser)": lambda ora, html: estrai_testo_ora(
+            ora, html, estrattore=BaseLiturgiaParser.estrai_testo_filtrato_bs4),
+        "streaming": lambda ora, html: estrai_testo_ora(ora, html),
+    }
+    if lxml is not None:
+        estrattori["lxml"] = lambda ora, html: estrai_testo_ora(ora, html, backend="lxml")
+    return estrattori
+
+
+def benchmark_estrazione(pagine: List[Tuple[str, str, str]], repeat: int = 3) -> Dict[str, float]:
+    """
+    Returns:
+        dict: {backend: pagine al secondo} (miglior tempo su `repeat` giri)
+    """
+    risultati = {}
+    for nome, estrai in _estrattori().items():
+        migliore = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _, ora, html in pagine:
+                estrai(ora, html)
+            migliore = min(migliore, time.perf_counter() - started)
+        risultati[nome] = len(pagine) / migliore if migliore else 0.0
+    return risultati
+
+
+def _stadi_pagina(nome: str, ora: str, html: str) -> Dict[str, Callable[[], object]]:
+    """Funzioni senza argomenti che eseguono ogni stadio su una pagina"""
+    date_str = _data_pagina(nome)
+    testi = estrai_testo_ora(ora, html)
+    testo = "\n".join(testi)
+    if ora == "santo_del_giorno":
+        parse = lambda: SantoParser.parse(testo, data_str=date_str)
+    else:
+        parser = PAGINE_ORE[ora][2]
+        parse = lambda: parser.parse(testo)
+    return {
+        "estrazione": lambda: estrai_testo_ora(ora, html),
+        "clean_text": lambda: [BaseLiturgiaParser.clean_text(t) for t in testi],
+        "clean_duplicate_lines": lambda: BaseLiturgiaParser.clean_duplicate_lines(testo),
+        "parse": parse,
+        "pagina": lambda: parse_page(ora, html, date_str),
+    }
+
+
+def _percentile(valori: List[float], p: float) -> float:
+    """Percentile nearest-rank di una lista ordinata"""
+    if not valori:
+        return 0.0
+    indice = max(0, min(len(valori) - 1, int(round(p / 100 * len(valori) + 0.5)) - 1))
+    return valori[indice]
+
+
+def benchmark_stadi(pagine: List[Tuple[str, str, str]], repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Returns:
+        dict: {stadio: {"p50": ms, "p90": ms, "p99": ms, "max": ms, "pagine_s": pagine/s}}
+    """
+    stadi = [_stadi_pagina(*pagina) for pagina in pagine]
+    risultati = {}
+    for stadio in STADI:
+        latenze = []
+        for _ in range(repeat):
+            for funzioni in stadi:
+                started = time.perf_counter()
+                funzioni[stadio]()
+                latenze.append(time.perf_counter() - started)
+        latenze.sort()
+        totale = sum(latenze)
+        risultati[stadio] = {f"p{p}": _percentile(latenze, p) * 1000 for p in PERCENTILI}
+        risultati[stadio]["max"] = latenze[-1] * 1000
+        risultati[stadio]["pagine_s"] = len(latenze) / totale if totale else 0.0
+    return risultati
+
+
+def memoria_stadi(pagine: List[Tuple[str, str, str]]) -> Dict[str, float]:
+    """
+    Picco di memoria allocata da ogni stadio su tutto il corpus, in un giro separato
+    (tracemalloc rallenta l'esecuzione e falserebbe le latenze).
+
+    Returns:
+        dict: {stadio: KB}
+    """
+    stadi = [_stadi_pagina(*pagina) for pagina in pagine]
+    risultati = {}
+    for stadio in STADI:
+        tracemalloc.start()
+        try:
+            for funzioni in stadi:
+                funzioni[stadio]()
+            risultati[stadio] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return risultati
+
+
+def esegui(cartella: str, repeat: int = 3) -> Dict:
+    """Esegue tutto il benchmark sul corpus e restituisce i risultati serializzabili"""
+    if not os.path.isdir(cartella):
+        raise FileNotFoundError(f"corpus non trovato: {cartella}")
+    pagine = list(pagine_da_cartella(cartella))
+    if not pagine:
+        raise FileNotFoundError(f"nessuna pagina trovata in {cartella}")
+    return {
+        "creato": datetime.now().isoformat(timespec="seconds"),
+        "pagine": len(pagine),
+        "repeat": repeat,
+        "estrazione": benchmark_estrazione(pagine, repeat=repeat),
+        "stadi": benchmark_stadi(pagine, repeat=repeat),
+        "memoria_picco_kb": memoria_stadi(pagine),
+    }
+
+
+def stampa(risultati: Dict):
+    print(f"\n📊 Estrazione su {risultati['pagine']} pagine (miglior tempo su {risultati['repeat']} giri)")
+    print("-" * 56)
+    riferimento = risultati["estrazione"]["bs4 (html.parser)"]
+    for nome, pagine_s in risultati["estrazione"].items():
+        print(f"  {nome:20} {pagine_s:10.1f} pagine/s   x{pagine_s / riferimento:5.1f}")
+    print("-" * 56)
+
+    print("\n⏱️  Latenza per pagina (ms) e picco di memoria")
+    print("-" * 86)
+    print(f"  {'stadio':24} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'pagine/s':>10} {'memoria KB':>12}")
+    for stadio, valori in risultati["stadi"].items():
+        memoria = risultati["memoria_picco_kb"].get(stadio, 0.0)
+        print(f"  {stadio:24} {valori['p50']:8.3f} {valori['p90']:8.3f} {valori['p99']:8.3f} "
+              f"{valori['max']:8.3f} {valori['pagine_s']:10.1f} {memoria:12.1f}")
+    print("-" * 86)
+
+
+def confronta(baseline: Dict, risultati: Dict, soglia: float = 10.0) -> List[str]:
+    """
+    Confronta i risultati con una baseline.
+
+    Returns:
+        list: stadi (e backend) più lenti della baseline oltre `soglia` percento
+    """
+    regressioni = []
+    print(f"\n🔍 Confronto con la baseline del {baseline.get('creato', '?')} (soglia {soglia:.0f}%)")
+    print("-" * 64)
+    for stadio, valori in risultati["stadi"].items():
+        prima = baseline.get("stadi", {}).get(stadio)
+        if not prima or not prima.get("p50"):
+            continue
+        delta = (valori["p50"] - prima["p50"]) / prima["p50"] * 100
+        segno = "❌" if delta > soglia else "✅"
+        print(f"  {segno} {stadio:24} p50 {prima['p50']:8.3f} → {valori['p50']:8.3f} ms  ({delta:+6.1f}%)")
+        if delta > soglia:
+            regressioni.append(stadio)
+
+    for nome, pagine_s in risultati["estrazione"].items():
+        prima = baseline.get("estrazione", {}).get(nome)
+        if not prima:
+            continue
+        delta = (prima - pagine_s) / prima * 100
+        segno = "❌" if delta > soglia else "✅"
+        print(f"  {segno} {nome:24} {prima:8.1f} → {pagine_s:8.1f} pagine/s  ({-delta:+6.1f}%)")
+        if delta > soglia:
+            regressioni.append(nome)
+    print("-" * 64)
+    return regressioni
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline di estrazione e parsing")
+    parser.add_argument("--dir", default=CORPUS_DIR, help="Cartella del corpus (<dir>/<ora>/*.html)")
+    parser.add_argument("--repeat", type=int, default=3, help="Ripetizioni per stadio e backend")
+    parser.add_argument("--registra", action="store_true", help="Salva nel corpus le pagine di CORPUS_DATE")
+    parser.add_argument("--cache-dir", help="Cache HTML da cui prendere le pagine con --registra")
+    parser.add_argument("--salva-baseline", metavar="FILE", help="Scrive i risultati come baseline JSON")
+    parser.add_argument("--confronta", metavar="FILE", help="Confronta con una baseline JSON")
+    parser.add_argument("--soglia", type=float, default=10.0, help="Rallentamento massimo in percento")
+    parser.add_argument("--salva-attesi", metavar="FILE", nargs="?", const=ATTESI_PATH,
+                        help="Scrive l'output del parsing del corpus (default fixtures/attesi.json)")
+    args = parser.parse_args()
+
+    if args.registra:
+        salvate = registra_corpus(args.dir, cache_dir=args.cache_dir)
+        print(f"✅ {salvate} pagine salvate in {args.dir}")
+        return
+
+    if args.salva_attesi:
+        attesi = parse_corpus(args.dir)
+        with open(args.salva_attesi, "w", encoding="utf-8") as f:
+            json.dump(attesi, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"💾 Output del parsing di {len(attesi)} giorni salvato in {args.salva_attesi}")
+        return
+
+    if lxml is None:
+        print("⚠️  lxml non installato: backend lxml escluso")
+    try:
+        risultati = esegui(args.dir, repeat=args.repeat)
+    except FileNotFoundError as e:
+        parser.error(f"{e} (registrare il corpus con --registra)")
+    stampa(risultati)
+
+    if args.salva_baseline:
+        with open(args.salva_baseline, "w", encoding="utf-8") as f:
+            json.dump(risultati, f, ensure_ascii=False, indent=2)
+        print(f"💾 Baseline salvata in {args.salva_baseline}")
+
+    if args.confronta:
+        with open(args.confronta, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressioni = confronta(baseline, risultati, soglia=args.soglia)
+        if regressioni:
+            print(f"❌ Più lenti della baseline: {', '.join(regressioni)}")
+            sys.exit(1)
+        print("✅ Nessuna regressione oltre la soglia")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,103 @@
 import sqlite3
 import os
 import json
-from datetime import datetime
-from typing import Dict, Optional
+import queue
+import threading
+import time
+from concurrent.futures import Future, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 
+import db_codec
 # Importa le classi dal lrgyParser
-from old.lrgyParser import LiturgiaManager, LodiParser, VespriParser, SantoParser
+from old.lrgyParser import Day, Hour, LiturgiaManager, LodiParser, VespriParser, SantoParser, SantoDelGiorno
+
+class _CaricamentoMassivo:
+    """
+    Connessione condivisa da bulk_load(): molti giorni per transazione, ognuno nel proprio savepoint
+
+    Con giorni_per_transazione=None il commit avviene solo chiamando commit()
+    (il writer conferma un lotto intero alla volta).
+    """
+
+    def __init__(self, conn: sqlite3.Connection, giorni_per_transazione: Optional[int]):
+        self.conn = conn
+        self.giorni_per_transazione = None if giorni_per_transazione is None else max(1, giorni_per_transazione)
+        self.in_sospeso = 0
+        self.scritture = 0
+
+    @contextmanager
+    def scrittura(self) -> Iterator[sqlite3.Cursor]:
+        """Un giorno (o un'altra scrittura) annullabile da solo senza perdere il resto del lotto"""
+        cursor = self.conn.cursor()
+        if not self.conn.in_transaction:
+            cursor.execute('BEGIN')
+        cursor.execute('SAVEPOINT scrittura')
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute('ROLLBACK TO scrittura')
+            cursor.execute('RELEASE scrittura')
+            raise
+        cursor.execute('RELEASE scrittura')
+        self.scritture += 1
+        self.in_sospeso += 1
+        if self.giorni_per_transazione and self.in_sospeso >= self.giorni_per_transazione:
+            self.commit()
+
+    def commit(self):
+        """Conferma le scritture in sospeso; se il COMMIT fallisce vengono annullate"""
+        try:
+            if self.conn.in_transaction:
+                self.conn.execute('COMMIT')
+        except sqlite3.Error:
+            self.rollback()
+            raise
+        self.in_sospeso = 0
+
+    def rollback(self):
+        if self.conn.in_transaction:
+            self.conn.execute('ROLLBACK')
+        self.in_sospeso = 0
+
 
 class LiturgiaDBManager:
     """Manager per salvare i dati liturgici in SQLite"""
 
+    # Indici secondari sulle chiavi esterne usati dalle sostituzioni: la cancellazione di un'ora
+    # cerca le righe figlie per cascata e quella dei santi per giorno. Restano anche in bulk_load(),
+    # altrimenti ogni giorno reimportato scandirebbe le tabelle figlie per intero.
+    INDICI_SCRITTURA = {
+        'idx_antifone_lodi': 'antifone_salmi(lodi_id)',
+        'idx_antifone_vespri': 'antifone_salmi(vespri_id)',
+        'idx_versicoli_lodi': 'versicoli(lodi_id)',
+        'idx_versicoli_vespri': 'versicoli(vespri_id)',
+        'idx_invocazioni_lodi': 'invocazioni(lodi_id)',
+        'idx_invocazioni_vespri': 'invocazioni(vespri_id)',
+        'idx_orazioni_lodi': 'orazioni(lodi_id)',
+        'idx_orazioni_vespri': 'orazioni(vespri_id)',
+        'idx_santi_giorno': 'santi(giorno_id)',
+    }
+
+    # Indici usati solo in lettura: bulk_load() li elimina e li ricostruisce a fine caricamento
+    INDICI_LETTURA = {
+        'idx_invocazioni_giorno': 'invocazioni(giorno_id)',
+        'idx_orazioni_giorno': 'orazioni(giorno_id)',
+    }
+
+    INDICI = {**INDICI_SCRITTURA, **INDICI_LETTURA}
+
+    # Al più un'ora di ogni tipo per giorno: vincoli, restano anche durante bulk_load()
+    INDICI_UNICI = {
+        'uq_lodi_giorno': 'lodi_mattutine(giorno_id)',
+        'uq_vespri_giorno': 'vespri(giorno_id)',
+    }
+
     def __init__(self, db_path: str = "instance/oremus.db"):
         self.db_path = db_path
+        self._bulk: Optional[_CaricamentoMassivo] = None
         self._ensure_db_dir()
         self.init_db()
 
@@ -20,9 +105,15 @@ class LiturgiaDBManager:
         """Assicura che la cartella instance esista"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
+    def _connetti(self, **kwargs) -> sqlite3.Connection:
+        """Connessione con le chiavi esterne attive: le cancellazioni propagano ON DELETE CASCADE"""
+        conn = sqlite3.connect(self.db_path, **kwargs)
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
     def init_db(self):
         """Inizializza il database SQLite con le tabelle necessarie"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connetti()
         cursor = conn.cursor()
 
         # Tabella principale per i giorni liturgici
@@ -83,10 +174,12 @@ class LiturgiaDBManager:
                 numero TEXT,
                 titolo TEXT,
                 contenuto TEXT,
+                salmo_id INTEGER REFERENCES salmi(id),
                 FOREIGN KEY (lodi_id) REFERENCES lodi_mattutine(id) ON DELETE CASCADE,
                 FOREIGN KEY (vespri_id) REFERENCES vespri(id) ON DELETE CASCADE
             )
         ''')
+        db_codec.aggiungi_colonna_salmo_id(cursor)
 
         # Tabella per versicoli
         cursor.execute('''
@@ -145,274 +238,786 @@ class LiturgiaDBManager:
             )
         ''')
 
+        # Impronte (sha256) del testo estratto delle pagine salvate, per ora
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS impronte_pagine (
+                data_iso TEXT NOT NULL,
+                ora TEXT NOT NULL,
+                impronta TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (data_iso, ora)
+            )
+        ''')
+
+        # Testi ripetuti (Gloria al Padre, cantici...) salvati una volta sola, vedi db_codec
+        cursor.execute(db_codec.SCHEMA_TESTI)
+        # Salmi e cantici del salterio salvati una volta sola, vedi db_codec
+        cursor.execute(db_codec.SCHEMA_SALMI)
+        # Colonne di testo compresse in scrittura e dizionari di compressione, vedi db_codec
+        for schema in db_codec.SCHEMA_COMPRESSIONE:
+            cursor.execute(schema)
+
+        self._crea_indici(cursor)
+        self._crea_indici_unici(cursor)
+
         conn.commit()
         conn.close()
 
-    def get_or_create_giorno(self, data: str, data_iso: str, giorno_settimana: str) -> int:
-        """Ottiene o crea il record del giorno liturgico"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @classmethod
+    def _crea_indici_unici(cls, cursor: sqlite3.Cursor):
+        """
+        Crea i vincoli di unicità delle ore per giorno. Sui database scritti
+        prima dei vincoli elimina le ore duplicate dai re-import (resta la più
+        recente, i figli seguono per cascata), le righe figlie orfane e i
+        santi ripetuti.
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        esistenti = {row[0] for row in cursor.fetchall()}
+        if esistenti.issuperset(cls.INDICI_UNICI):
+            return
 
-        try:
-            cursor.execute('''
-                INSERT INTO giorni_liturgici (data, data_iso, giorno_settimana)
-                VALUES (?, ?, ?)
-            ''', (data, data_iso, giorno_settimana))
-            conn.commit()
-            giorno_id = cursor.lastrowid
-        except sqlite3.IntegrityError:
-            cursor.execute('SELECT id FROM giorni_liturgici WHERE data_iso = ?', (data_iso,))
-            result = cursor.fetchone()
-            giorno_id = result[0] if result else None
-            if not giorno_id:
-                raise ValueError(f"Impossibile ottenere giorno per {data_iso}")
+        modifiche = cursor.connection.total_changes
+        for tabella in ('lodi_mattutine', 'vespri'):
+            cursor.execute(f'''
+                DELETE FROM {tabella}
+                WHERE id NOT IN (SELECT MAX(id) FROM {tabella} GROUP BY giorno_id)
+            ''')
+        for figlia in ('antifone_salmi', 'versicoli', 'invocazioni', 'orazioni'):
+            cursor.execute(f'''
+                DELETE FROM {figlia}
+                WHERE (lodi_id IS NOT NULL AND lodi_id NOT IN (SELECT id FROM lodi_mattutine))
+                   OR (vespri_id IS NOT NULL AND vespri_id NOT IN (SELECT id FROM vespri))
+            ''')
+        cursor.execute('''
+            DELETE FROM santi
+            WHERE id NOT IN (SELECT MAX(id) FROM santi GROUP BY giorno_id, tipo, nome_santo)
+        ''')
 
-        conn.close()
-        return giorno_id
+        rimosse = cursor.connection.total_changes - modifiche
+        if rimosse:
+            print(f"🧹 Rimosse {rimosse} righe duplicate od orfane")
 
-    def insert_lodi(self, giorno_id: int, lodi_data: Dict) -> Optional[int]:
-        """Inserisce i dati delle lodi mattutine"""
-        if not lodi_data:
-            return None
+        # Sostituiti dagli indici unici sulle stesse colonne
+        cursor.execute('DROP INDEX IF EXISTS idx_lodi_giorno')
+        cursor.execute('DROP INDEX IF EXISTS idx_vespri_giorno')
+        for nome, colonne in cls.INDICI_UNICI.items():
+            cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {nome} ON {colonne}')
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @classmethod
+    def _crea_indici(cls, cursor: sqlite3.Cursor):
+        for nome, colonne in cls.INDICI.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {nome} ON {colonne}')
+
+    @classmethod
+    def _elimina_indici_lettura(cls, cursor: sqlite3.Cursor):
+        for nome in cls.INDICI_LETTURA:
+            cursor.execute(f'DROP INDEX IF EXISTS {nome}')
 
+    @contextmanager
+    def _transazione(self) -> Iterator[sqlite3.Cursor]:
+        """Una connessione e una sola transazione: commit a fine blocco, rollback se il blocco solleva"""
+        if self._bulk is not None:
+            # Dentro bulk_load() il commit avviene ogni N giorni sulla connessione condivisa
+            with self._bulk.scrittura() as cursor:
+                yield cursor
+            return
+        conn = self._connetti()
         try:
-            cantico = lodi_data.get('cantico_finale', {})
-            cantico_finale_text = cantico.get('contenuto', '') if isinstance(cantico, dict) else ''
-
-            cursor.execute('''
-                INSERT INTO lodi_mattutine 
-                (giorno_id, tipo, titolo, gloria_al_padre, inno, lettura_breve, responsorio_breve, antifona_cantico_finale, cantico_finale)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                giorno_id,
-                lodi_data.get('tipo'),
-                lodi_data.get('titolo'),
-                lodi_data.get('gloria_al_padre'),
-                lodi_data.get('inno'),
-                json.dumps(lodi_data.get('lettura_breve', {})),
-                json.dumps(lodi_data.get('responsorio_breve', {})),
-                lodi_data.get('antifona_cantico_finale'),
-                cantico_finale_text
-            ))
-
-            lodi_id = cursor.lastrowid
-
-            # Versicoli
-            for versicolo in lodi_data.get('versicoli', []):
-                cursor.execute('''
-                    INSERT INTO versicoli (lodi_id, versicolo, risposta)
-                    VALUES (?, ?, ?)
-                ''', (lodi_id, versicolo.get('versicolo'), versicolo.get('risposta')))
-
-            # Antifone e salmi
-            for item in lodi_data.get('antifone_e_salmi', []):
-                cursor.execute('''
-                    INSERT INTO antifone_salmi 
-                    (lodi_id, antifona_numero, antifona_testo, tipo, numero, titolo, contenuto)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    lodi_id,
-                    item.get('antifona_numero'),
-                    item.get('antifona_testo'),
-                    item.get('tipo'),
-                    item.get('numero'),
-                    item.get('titolo'),
-                    item.get('contenuto')
-                ))
-
-            # Invocazioni
-            for invocazione in lodi_data.get('invocazioni', []):
-                cursor.execute('''
-                    INSERT INTO invocazioni (giorno_id, lodi_id, tipo, contenuto)
-                    VALUES (?, ?, ?, ?)
-                ''', (giorno_id, lodi_id, 'lodi', invocazione))
-
-            # Orazione
-            if lodi_data.get('orazione'):
-                cursor.execute('''
-                    INSERT INTO orazioni (giorno_id, lodi_id, tipo, testo)
-                    VALUES (?, ?, ?, ?)
-                ''', (giorno_id, lodi_id, 'lodi', lodi_data.get('orazione')))
-
-            conn.commit()
-            return lodi_id
+            with conn:
+                yield conn.cursor()
         finally:
             conn.close()
 
-    def insert_vespri(self, giorno_id: int, vespri_data: Dict) -> Optional[int]:
-        """Inserisce i dati dei vespri"""
-        if not vespri_data:
-            return None
+    @contextmanager
+    def bulk_load(self, giorni_per_transazione: int = 500, ricostruisci_indici: bool = True,
+                  synchronous: str = 'OFF') -> Iterator[_CaricamentoMassivo]:
+        """
+        Modalità di caricamento massivo per backfill e import di molti giorni.
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Per la durata del blocco tutte le scritture del manager (save_liturgia_data,
+        replace_days, delete_ore, set_impronte) usano una sola connessione in WAL con
+        `PRAGMA synchronous` ridotto e fanno commit ogni `giorni_per_transazione`
+        giorni; ogni giorno resta atomico grazie a un savepoint. Gli indici usati
+        solo in lettura (INDICI_LETTURA) vengono eliminati all'ingresso e ricostruiti
+        all'uscita, seguiti da ANALYZE; quelli che servono alle sostituzioni
+        (INDICI_SCRITTURA) restano, così reimportare giorni già presenti non diventa
+        quadratico.
+
+        Con synchronous=OFF un crash del sistema operativo può perdere gli ultimi
+        lotti: il caricamento va rieseguito.
+        """
+        if self._bulk is not None:
+            raise RuntimeError("bulk_load() già attivo su questo manager")
 
+        conn = self._connetti(isolation_level=None)
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={synchronous}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        if ricostruisci_indici:
+            self._elimina_indici_lettura(conn.cursor())
+
+        self._bulk = _CaricamentoMassivo(conn, giorni_per_transazione)
+        started = datetime.now()
         try:
-            cantico = vespri_data.get('cantico_finale', {})
-            cantico_finale_text = cantico.get('contenuto', '') if isinstance(cantico, dict) else ''
-
-            cursor.execute('''
-                INSERT INTO vespri 
-                (giorno_id, tipo, titolo, gloria_al_padre, inno, lettura_breve, responsorio_breve, antifona_cantico_finale, cantico_finale)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                giorno_id,
-                vespri_data.get('tipo'),
-                vespri_data.get('titolo'),
-                vespri_data.get('gloria_al_padre'),
-                vespri_data.get('inno'),
-                json.dumps(vespri_data.get('lettura_breve', {})),
-                json.dumps(vespri_data.get('responsorio_breve', {})),
-                vespri_data.get('antifona_cantico_finale'),
-                cantico_finale_text
-            ))
-
-            vespri_id = cursor.lastrowid
-
-            # Versicoli
-            for versicolo in vespri_data.get('versicoli', []):
-                cursor.execute('''
-                    INSERT INTO versicoli (vespri_id, versicolo, risposta)
-                    VALUES (?, ?, ?)
-                ''', (vespri_id, versicolo.get('versicolo'), versicolo.get('risposta')))
-
-            # Antifone e salmi
-            for item in vespri_data.get('antifone_e_salmi', []):
-                cursor.execute('''
-                    INSERT INTO antifone_salmi 
-                    (vespri_id, antifona_numero, antifona_testo, tipo, numero, titolo, contenuto)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    vespri_id,
-                    item.get('antifona_numero'),
-                    item.get('antifona_testo'),
-                    item.get('tipo'),
-                    item.get('numero'),
-                    item.get('titolo'),
-                    item.get('contenuto')
-                ))
-
-            # Intercessioni
-            for intercessione in vespri_data.get('intercessioni', []):
-                cursor.execute('''
-                    INSERT INTO invocazioni (giorno_id, vespri_id, tipo, contenuto)
-                    VALUES (?, ?, ?, ?)
-                ''', (giorno_id, vespri_id, 'vespri', intercessione))
-
-            # Orazione
-            if vespri_data.get('orazione'):
-                cursor.execute('''
-                    INSERT INTO orazioni (giorno_id, vespri_id, tipo, testo)
-                    VALUES (?, ?, ?, ?)
-                ''', (giorno_id, vespri_id, 'vespri', vespri_data.get('orazione')))
-
-            conn.commit()
-            return vespri_id
+            yield self._bulk
         finally:
-            conn.close()
+            bulk, self._bulk = self._bulk, None
+            try:
+                # I giorni completati (savepoint rilasciati) vengono comunque confermati
+                bulk.commit()
+                if ricostruisci_indici:
+                    print("🗂️  Ricostruzione indici...")
+                    self._crea_indici(conn.cursor())
+                conn.execute('ANALYZE')
+                if journal_mode.lower() != 'wal':
+                    try:
+                        conn.execute(f'PRAGMA journal_mode={journal_mode}')
+                    except sqlite3.OperationalError:
+                        # Altre connessioni aperte: il database resta in WAL
+                        pass
+            finally:
+                conn.close()
+            durata = (datetime.now() - started).total_seconds()
+            print(f"📦 Caricamento massivo: {bulk.scritture} scritture in {durata:.1f}s")
 
-    def insert_santi(self, giorno_id: int, santo_data: Dict):
-        """Inserisce i dati dei santi del giorno"""
+    @staticmethod
+    def _get_or_create_giorno(cursor: sqlite3.Cursor, data: str, data_iso: str, giorno_settimana: str) -> int:
+        # Upsert sulla data: il giorno già presente mantiene il proprio id
+        cursor.execute('''
+            INSERT INTO giorni_liturgici (data, data_iso, giorno_settimana)
+            VALUES (?, ?, ?)
+            ON CONFLICT(data_iso) DO UPDATE SET
+                data = excluded.data,
+                giorno_settimana = excluded.giorno_settimana,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (data, data_iso, giorno_settimana))
+        cursor.execute('SELECT id FROM giorni_liturgici WHERE data_iso = ?', (data_iso,))
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _insert_ora(cursor: sqlite3.Cursor, giorno_id: int, ora: Hour, tabella: str, colonna: str,
+                    tipo: str, compressione: db_codec.Compressione) -> int:
+        """Inserisce un'ora (lodi o vespri) e le sue righe figlie, sostituendo quella già salvata per il giorno"""
+        # Le righe figlie dell'ora precedente seguono per cascata
+        cursor.execute(f'DELETE FROM {tabella} WHERE giorno_id = ?', (giorno_id,))
+        cursor.execute(f'''
+            INSERT INTO {tabella}
+            (giorno_id, tipo, titolo, gloria_al_padre, inno, lettura_breve, responsorio_breve, antifona_cantico_finale, cantico_finale)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            giorno_id,
+            ora.tipo,
+            ora.titolo,
+            db_codec.interna(cursor, ora.gloria_al_padre),
+            compressione.codifica(tabella, 'inno', ora.inno),
+            json.dumps(ora.lettura_breve),
+            json.dumps(ora.responsorio_breve),
+            ora.antifona_cantico_finale,
+            db_codec.interna(cursor, ora.cantico_finale.get('contenuto', ''))
+        ))
+        ora_id = cursor.lastrowid
+
+        cursor.executemany(f'''
+            INSERT INTO versicoli ({colonna}, versicolo, risposta)
+            VALUES (?, ?, ?)
+        ''', [(ora_id, versicolo.versicolo, versicolo.risposta) for versicolo in ora.versicoli])
+
+        # Il testo del salmo sta nella tabella salmi: la riga conserva solo il riferimento
+        antifone = []
+        for item in ora.antifone_e_salmi:
+            salmo = db_codec.salmo_id(cursor, item.tipo, item.numero, item.contenuto, compressione)
+            contenuto = None if salmo else compressione.codifica('antifone_salmi', 'contenuto', item.contenuto)
+            antifone.append((ora_id, item.antifona_numero, item.antifona_testo, item.tipo, item.numero,
+                             item.titolo, contenuto, salmo))
+        cursor.executemany(f'''
+            INSERT INTO antifone_salmi
+            ({colonna}, antifona_numero, antifona_testo, tipo, numero, titolo, contenuto, salmo_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', antifone)
+
+        # Invocazioni (lodi) o intercessioni (vespri)
+        cursor.executemany(f'''
+            INSERT INTO invocazioni (giorno_id, {colonna}, tipo, contenuto)
+            VALUES (?, ?, ?, ?)
+        ''', [(giorno_id, ora_id, tipo, preghiera) for preghiera in ora.preci])
+
+        if ora.orazione:
+            cursor.execute(f'''
+                INSERT INTO orazioni (giorno_id, {colonna}, tipo, testo)
+                VALUES (?, ?, ?, ?)
+            ''', (giorno_id, ora_id, tipo, ora.orazione))
+
+        return ora_id
+
+    @classmethod
+    def _insert_lodi(cls, cursor: sqlite3.Cursor, giorno_id: int, lodi_data: Optional[Hour],
+                     compressione: Optional[db_codec.Compressione] = None) -> Optional[int]:
+        if not lodi_data:
+            return None
+        compressione = compressione or db_codec.Compressione.carica(cursor)
+        return cls._insert_ora(cursor, giorno_id, lodi_data, 'lodi_mattutine', 'lodi_id', 'lodi', compressione)
+
+    @classmethod
+    def _insert_vespri(cls, cursor: sqlite3.Cursor, giorno_id: int, vespri_data: Optional[Hour],
+                     compressione: Optional[db_codec.Compressione] = None) -> Optional[int]:
+        if not vespri_data:
+            return None
+        compressione = compressione or db_codec.Compressione.carica(cursor)
+        return cls._insert_ora(cursor, giorno_id, vespri_data, 'vespri', 'vespri_id', 'vespri', compressione)
+
+    @staticmethod
+    def _insert_santi(cursor: sqlite3.Cursor, giorno_id: int, santo_data: Optional[SantoDelGiorno],
+                      compressione: Optional[db_codec.Compressione] = None):
         if not santo_data:
             return
+        cursor.execute('DELETE FROM santi WHERE giorno_id = ?', (giorno_id,))
+        compressione = compressione or db_codec.Compressione.carica(cursor)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        santi = []
+        if santo_data.santo_principale:
+            santo = santo_data.santo_principale
+            santi.append((giorno_id, santo_data.giorno, santo.nome,
+                          compressione.codifica('santi', 'martirologio', santo.martirologio), 'principale', santo.nome))
+        santi += [
+            (giorno_id, santo_data.giorno, santo.nome,
+             compressione.codifica('santi', 'martirologio', santo.martirologio), 'altro', None)
+            for santo in santo_data.altri_santi
+        ]
+        cursor.executemany('''
+            INSERT INTO santi (giorno_id, giorno, nome_santo, martirologio, tipo, santo_principale)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', santi)
+
+    @staticmethod
+    def _delete_ore(cursor: sqlite3.Cursor, data_iso: str, ore: Iterable[str]):
+        ore = list(ore)
+        # Senza righe l'impronta non deve più far saltare il salvataggio dell'ora
+        cursor.executemany('DELETE FROM impronte_pagine WHERE data_iso = ? AND ora = ?',
+                           [(data_iso, ora) for ora in ore])
+        cursor.execute('SELECT id FROM giorni_liturgici WHERE data_iso = ?', (data_iso,))
+        row = cursor.fetchone()
+        if not row:
+            return
+        giorno_id = row[0]
 
+        # Antifone, versicoli, invocazioni e orazioni dell'ora seguono per cascata
+        tabelle = {'lodi_mattutine': 'lodi_mattutine', 'vespri': 'vespri', 'santo_del_giorno': 'santi'}
+        for ora in ore:
+            cursor.execute(f'DELETE FROM {tabelle[ora]} WHERE giorno_id = ?', (giorno_id,))
+
+    def _save_day(self, cursor: sqlite3.Cursor, data: Day) -> int:
+        """Upsert del giorno: le ore presenti sostituiscono quelle salvate, le altre restano invariate"""
+        # Le righe cambiano: l'impronta delle ore riscritte viene registrata di nuovo dopo il salvataggio
+        cursor.executemany('DELETE FROM impronte_pagine WHERE data_iso = ? AND ora = ?',
+                           [(data.data_iso, ora) for ora in LiturgiaManager.ORE if getattr(data, ora)])
+        giorno_id = self._get_or_create_giorno(cursor, data.data, data.data_iso, data.giorno_settimana)
+        # Colonne da comprimere rilette a ogni giorno: attivarle o disattivarle vale senza riavvii
+        compressione = db_codec.Compressione.carica(cursor)
+        self._insert_lodi(cursor, giorno_id, data.lodi_mattutine, compressione)
+        self._insert_vespri(cursor, giorno_id, data.vespri, compressione)
+        self._insert_santi(cursor, giorno_id, data.santo_del_giorno, compressione)
+        return giorno_id
+
+    def get_or_create_giorno(self, data: str, data_iso: str, giorno_settimana: str) -> int:
+        """Ottiene o crea il record del giorno liturgico"""
+        with self._transazione() as cursor:
+            return self._get_or_create_giorno(cursor, data, data_iso, giorno_settimana)
+
+    def insert_lodi(self, giorno_id: int, lodi_data: Optional[Hour]) -> Optional[int]:
+        """Inserisce i dati delle lodi mattutine"""
+        with self._transazione() as cursor:
+            return self._insert_lodi(cursor, giorno_id, lodi_data)
+
+    def insert_vespri(self, giorno_id: int, vespri_data: Optional[Hour]) -> Optional[int]:
+        """Inserisce i dati dei vespri"""
+        with self._transazione() as cursor:
+            return self._insert_vespri(cursor, giorno_id, vespri_data)
+
+    def insert_santi(self, giorno_id: int, santo_data: Optional[SantoDelGiorno]):
+        """Inserisce i dati dei santi del giorno"""
+        with self._transazione() as cursor:
+            self._insert_santi(cursor, giorno_id, santo_data)
+
+    def get_range_status(self, start_iso: str, end_iso: str) -> Dict[str, Dict[str, bool]]:
+        """
+        Stato di completezza delle ore per ogni giorno presente nell'intervallo,
+        calcolato con una sola query.
+
+        Un'ora è completa se è stata salvata: la riga di lodi/vespri esiste e il
+        santo del giorno ha almeno un santo. Le sezioni vuote non contano, perché
+        alcune pagine non hanno davvero inno o antifone e verrebbero riscaricate
+        a ogni sync.
+
+        Returns:
+            dict: {data_iso: {'lodi_mattutine': bool, 'vespri': bool, 'santo_del_giorno': bool}}
+        """
+        conn = self._connetti()
         try:
-            # Santo principale
-            if santo_data.get('santo_principale'):
-                santo = santo_data['santo_principale']
-                cursor.execute('''
-                    INSERT INTO santi (giorno_id, giorno, nome_santo, martirologio, tipo, santo_principale)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    giorno_id,
-                    santo_data.get('giorno'),
-                    santo.get('nome'),
-                    santo.get('martirologio'),
-                    'principale',
-                    santo.get('nome')
-                ))
-
-            # Altri santi
-            for santo in santo_data.get('altri_santi', []):
-                cursor.execute('''
-                    INSERT INTO santi (giorno_id, giorno, nome_santo, martirologio, tipo, santo_principale)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    giorno_id,
-                    santo_data.get('giorno'),
-                    santo.get('nome'),
-                    santo.get('martirologio'),
-                    'altro',
-                    None
-                ))
-
-            conn.commit()
+            rows = conn.execute('''
+                SELECT g.data_iso,
+                    EXISTS (SELECT 1 FROM lodi_mattutine l WHERE l.giorno_id = g.id),
+                    EXISTS (SELECT 1 FROM vespri v WHERE v.giorno_id = g.id),
+                    EXISTS (SELECT 1 FROM santi s WHERE s.giorno_id = g.id)
+                FROM giorni_liturgici g
+                WHERE g.data_iso >= ? AND g.data_iso <= ?
+            ''', (start_iso, end_iso)).fetchall()
         finally:
             conn.close()
 
-    def save_liturgia_data(self, data: Dict) -> bool:
-        """Salva un giorno liturgico completo nel database"""
+        return {
+            data_iso: {
+                'lodi_mattutine': bool(lodi),
+                'vespri': bool(vespri),
+                'santo_del_giorno': bool(santi)
+            }
+            for data_iso, lodi, vespri, santi in rows
+        }
+
+    def get_impronta(self, data_iso: str, ora: str) -> Optional[str]:
+        """Impronta del testo dell'ora salvata per ultima, None se assente"""
+        conn = self._connetti()
         try:
-            giorno_id = self.get_or_create_giorno(
-                data.get('data'),
-                data.get('data_iso'),
-                data.get('giorno_settimana')
-            )
+            row = conn.execute('SELECT impronta FROM impronte_pagine WHERE data_iso = ? AND ora = ?',
+                               (data_iso, ora)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def set_impronte(self, data_iso: str, impronte: Dict[str, str]):
+        """Registra le impronte {ora: sha256} delle ore appena salvate di un giorno"""
+        with self._transazione() as cursor:
+            self._set_impronte(cursor, data_iso, impronte)
+
+    @staticmethod
+    def _set_impronte(cursor: sqlite3.Cursor, data_iso: str, impronte: Dict[str, str]):
+        cursor.executemany('''
+            INSERT OR REPLACE INTO impronte_pagine (data_iso, ora, impronta, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ''', [(data_iso, ora, impronta) for ora, impronta in impronte.items()])
 
-            self.insert_lodi(giorno_id, data.get('lodi_mattutine'))
-            self.insert_vespri(giorno_id, data.get('vespri'))
-            self.insert_santi(giorno_id, data.get('santo_del_giorno'))
+    def delete_ore(self, data_iso: str, ore: Iterable[str]):
+        """Elimina le righe delle ore indicate (e dei relativi figli) per un giorno"""
+        with self._transazione() as cursor:
+            self._delete_ore(cursor, data_iso, ore)
 
+    def replace_days(self, days: Iterable[Union[Day, Dict]]) -> int:
+        """
+        Riscrive in blocco i giorni indicati: per ognuno le ore presenti nel
+        dizionario sostituiscono quelle già salvate, le altre restano invariate.
+        Ogni giorno viene sostituito in una sola transazione.
+
+        Returns:
+            int: Numero di giorni salvati correttamente
+        """
+        salvati = 0
+        for data in days:
+            if isinstance(data, dict):
+                data = Day.from_dict(data)
+            try:
+                with self._transazione() as cursor:
+                    self._save_day(cursor, data)
+                salvati += 1
+            except Exception as e:
+                print(f"✗ Errore nel salvataggio di {data.data_iso}: {e}")
+        return salvati
+
+    def save_liturgia_data(self, data: Union[Day, Dict]) -> bool:
+        """
+        Salva un giorno liturgico completo nel database (Day o dizionario del JSON)
+        in una sola transazione: il giorno è salvato per intero o per niente.
+        Salvare di nuovo lo stesso giorno sostituisce le ore invece di duplicarle.
+        """
+        if isinstance(data, dict):
+            data = Day.from_dict(data)
+        try:
+            with self._transazione() as cursor:
+                self._save_day(cursor, data)
             return True
         except Exception as e:
             print(f"✗ Errore nel salvataggio: {e}")
             return False
 
 
+_FINE = None
+
+
+class LiturgiaDBWriter:
+    """
+    Servizio di scrittura: un solo thread possiede la connessione di scrittura
+    e svuota una coda di giorni e impronte.
+
+    Le voci arrivate insieme (fino a `giorni_per_commit`, attendendone altre
+    per al più `attesa_commit` secondi) vengono scritte in una sola
+    transazione, ognuna nel proprio savepoint: un giorno che fallisce non
+    annulla gli altri del lotto. La coda è limitata, quindi i produttori
+    rallentano se il disco non tiene il passo invece di accumulare giorni.
+    """
+
+    def __init__(self, db_manager: LiturgiaDBManager, giorni_per_commit: int = 50, attesa_commit: float = 0.05,
+                 queue_size: int = 256):
+        self.db_manager = db_manager
+        self.giorni_per_commit = max(1, giorni_per_commit)
+        self.attesa_commit = attesa_commit
+        self._coda: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Giorni il cui ultimo salvataggio è fallito: le loro impronte non vanno registrate
+        self._falliti = set()
+        self.statistiche = {"giorni": 0, "falliti": 0, "impronte": 0, "commit": 0,
+                            "latenza_totale": 0.0, "latenza_massima": 0.0, "coda_massima": 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="liturgia-db-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, data: Day) -> Future:
+        """Accoda un giorno da salvare (stessa semantica di replace_days); il Future riceve l'esito"""
+        return self._accoda("giorno", data.data_iso, data)
+
+    def submit_impronte(self, data_iso: str, impronte: Dict[str, str]) -> Future:
+        """Accoda le impronte di un giorno, scritte dopo il giorno accodato prima di loro"""
+        return self._accoda("impronte", data_iso, impronte)
+
+    def _accoda(self, tipo: str, data_iso: str, contenuto) -> Future:
+        self.start()
+        future = Future()
+        self._coda.put((tipo, data_iso, contenuto, future, time.perf_counter()))
+        profondita = self._coda.qsize()
+        with self._lock:
+            self.statistiche["coda_massima"] = max(self.statistiche["coda_massima"], profondita)
+        return future
+
+    def attendi(self, future: Future) -> bool:
+        """Esito di una voce accodata; False se il thread si ferma prima di scriverla"""
+        while not wait([future], timeout=0.5).done:
+            with self._lock:
+                thread = self._thread
+            if thread is None or not thread.is_alive():
+                self._annulla([])
+                break
+        return future.result() if future.done() else False
+
+    def in_coda(self) -> int:
+        """Voci in attesa di scrittura"""
+        return self._coda.qsize()
+
+    def flush(self):
+        """Attende che tutte le voci accodate siano scritte e confermate"""
+        while True:
+            with self._lock:
+                thread = self._thread
+            if thread is None:
+                return
+            if not thread.is_alive():
+                # Il thread si è fermato per un errore: le voci rimaste non verranno più scritte
+                self._annulla([])
+                return
+            with self._coda.all_tasks_done:
+                if not self._coda.unfinished_tasks:
+                    return
+                self._coda.all_tasks_done.wait(timeout=0.5)
+
+    def close(self):
+        """Scrive le voci in coda e ferma il thread"""
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        # Se il thread si è fermato per un errore nessuno svuoterebbe una coda piena
+        while thread.is_alive():
+            try:
+                self._coda.put(_FINE, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        thread.join()
+        self._annulla([])
+        with self._lock:
+            self._thread = None
+
+    def stato(self) -> Dict:
+        """Latenza di persistenza (dall'accodamento al commit) e profondità della coda"""
+        with self._lock:
+            stats = dict(self.statistiche)
+        scritte = stats["giorni"] + stats["falliti"]
+        return {
+            "giorni": stats["giorni"],
+            "falliti": stats["falliti"],
+            "impronte": stats["impronte"],
+            "commit": stats["commit"],
+            "giorni_per_commit": round(scritte / stats["commit"], 1) if stats["commit"] else 0,
+            "latenza_media_ms": round(stats["latenza_totale"] / scritte * 1000, 1) if scritte else 0,
+            "latenza_massima_ms": round(stats["latenza_massima"] * 1000, 1),
+            "in_coda": self.in_coda(),
+            "coda_massima": stats["coda_massima"],
+        }
+
+    def print_stats(self):
+        stato = self.stato()
+        if not stato["giorni"] and not stato["falliti"]:
+            return
+        print(f"💾 Scrittura DB: {stato['giorni']} giorni in {stato['commit']} commit "
+              f"({stato['giorni_per_commit']} per commit) | latenza media {stato['latenza_media_ms']} ms, "
+              f"max {stato['latenza_massima_ms']} ms | coda max {stato['coda_massima']}")
+        if stato["falliti"]:
+            print(f"⚠️  Giorni non salvati nel DB: {stato['falliti']}")
+
+    def _run(self):
+        conn = None
+        lotto: List[Tuple] = []
+        try:
+            conn = self.db_manager._connetti(isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            # Il commit del lotto avviene solo in _scrivi_lotto, dopo l'ultima voce
+            connessione = _CaricamentoMassivo(conn, None)
+            fine = False
+            while not fine:
+                voce = self._coda.get()
+                if voce is _FINE:
+                    self._coda.task_done()
+                    break
+                lotto = [voce]
+                scadenza = time.perf_counter() + self.attesa_commit
+                while len(lotto) < self.giorni_per_commit:
+                    try:
+                        voce = self._coda.get(timeout=max(0.0, scadenza - time.perf_counter()))
+                    except queue.Empty:
+                        break
+                    if voce is _FINE:
+                        self._coda.task_done()
+                        fine = True
+                        break
+                    lotto.append(voce)
+                self._scrivi_lotto(connessione, lotto)
+                lotto = []
+        except Exception as e:
+            # Senza il thread nessuno svuoterebbe la coda: le voci in sospeso falliscono subito
+            print(f"✗ Scrittura DB interrotta: {e}")
+            self._annulla(lotto)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _annulla(self, lotto: List[Tuple]):
+        """Fa fallire le voci del lotto non ancora confermate e quelle rimaste in coda"""
+        voci = list(lotto)
+        while True:
+            try:
+                voci.append(self._coda.get_nowait())
+            except queue.Empty:
+                break
+        for voce in voci:
+            if voce is _FINE:
+                self._coda.task_done()
+                continue
+            tipo, data_iso, _, future, _ = voce
+            if future.done():
+                continue
+            if tipo == "giorno":
+                with self._lock:
+                    self.statistiche["falliti"] += 1
+                    self._falliti.add(data_iso)
+                print(f"⚠️  JSON salvato ma DB fallito per {data_iso}")
+            future.set_result(False)
+            self._coda.task_done()
+
+    def _scrivi_lotto(self, connessione: _CaricamentoMassivo, lotto: List[Tuple]):
+        esiti = []
+        # Esito dei giorni già scritti in questo lotto: le loro impronte seguono nello stesso lotto
+        giorni_lotto: Dict[str, bool] = {}
+        for tipo, data_iso, contenuto, _, _ in lotto:
+            if tipo == "impronte" and not giorni_lotto.get(data_iso, data_iso not in self._falliti):
+                esiti.append(False)
+                continue
+            try:
+                with connessione.scrittura() as cursor:
+                    if tipo == "giorno":
+                        self.db_manager._save_day(cursor, contenuto)
+                    else:
+                        self.db_manager._set_impronte(cursor, data_iso, contenuto)
+                esiti.append(True)
+            except Exception as e:
+                print(f"✗ Errore nel salvataggio di {data_iso}: {e}")
+                esiti.append(False)
+            if tipo == "giorno":
+                giorni_lotto[data_iso] = esiti[-1]
+        try:
+            connessione.commit()
+        except sqlite3.Error as e:
+            # commit() ha già annullato la transazione: nessuna voce del lotto resta in sospeso
+            print(f"✗ Commit fallito per {len(lotto)} voci: {e}")
+            esiti = [False] * len(lotto)
+
+        confermato = time.perf_counter()
+        with self._lock:
+            self.statistiche["commit"] += 1
+            for (tipo, data_iso, _, _, accodato), ok in zip(lotto, esiti):
+                if tipo == "impronte":
+                    self.statistiche["impronte"] += ok
+                    continue
+                latenza = confermato - accodato
+                self.statistiche["giorni" if ok else "falliti"] += 1
+                self.statistiche["latenza_totale"] += latenza
+                self.statistiche["latenza_massima"] = max(self.statistiche["latenza_massima"], latenza)
+                if ok:
+                    self._falliti.discard(data_iso)
+                else:
+                    self._falliti.add(data_iso)
+
+        for (tipo, data_iso, _, future, _), ok in zip(lotto, esiti):
+            if tipo == "giorno":
+                if ok:
+                    print(f"✅ Salvato in DB: {data_iso}")
+                else:
+                    print(f"⚠️  JSON salvato ma DB fallito per {data_iso}")
+            future.set_result(ok)
+            self._coda.task_done()
+
+
 class LiturgiaParserWithDB(LiturgiaManager):
     """Estende LiturgiaManager per salvare automaticamente in SQLite"""
 
-    def __init__(self, output_dir: str = "json", db_path: str = "instance/oremus.db"):
-        super().__init__(output_dir)
+    def __init__(self, output_dir: str = "json", db_path: str = "instance/oremus.db",
+                 giorni_per_commit: int = 50, **kwargs):
+        super().__init__(output_dir, **kwargs)
         self.db_manager = LiturgiaDBManager(db_path)
+        # Unico writer del DB: i thread di download non scrivono mai su SQLite. save_json attende
+        # l'esito di ogni giorno, quindi il writer non aspetta altre voci prima del commit: i lotti
+        # si formano solo con più produttori
+        self.db_writer = LiturgiaDBWriter(self.db_manager, giorni_per_commit=giorni_per_commit, attesa_commit=0)
+
+    def _scrittura_diretta(self) -> bool:
+        # bulk_load() scrive già a lotti sulla propria connessione, nel thread del chiamante
+        return self.db_manager._bulk is not None
+
+    def save_json(self, data: Day, filename: str) -> bool:
+        """
+        Salva JSON e giorno nel database tramite il writer
 
-    def save_json(self, data: Dict, filename: str) -> bool:
-        """Salva JSON e contemporaneamente nel database"""
+        Restituisce True solo dopo il commit del giorno: i giorni prodotti da
+        iter_plan sono già persistiti e le impronte vengono confermate solo per
+        le scritture riuscite.
+        """
         # Salva il JSON
         json_saved = super().save_json(data, filename)
 
-        # Salva nel database
+        # Salva nel database: le ore presenti sostituiscono quelle già salvate
         if json_saved:
-            db_saved = self.db_manager.save_liturgia_data(data)
+            if not self._scrittura_diretta():
+                return self.db_writer.attendi(self.db_writer.submit(data))
+            db_saved = self.db_manager.replace_days([data]) == 1
             if db_saved:
-                print(f"✅ Salvato in DB: {data.get('data_iso')}")
+                print(f"✅ Salvato in DB: {data.data_iso}")
             else:
-                print(f"⚠️  JSON salvato ma DB fallito per {data.get('data_iso')}")
+                print(f"⚠️  JSON salvato ma DB fallito per {data.data_iso}")
             return db_saved
 
         return False
 
-    def get_date_range(self, start_date: str, end_date: str):
-        """Override per aggiungere il salvataggio in DB"""
+    def impronta_salvata(self, date_str: str, ora: str) -> Optional[str]:
+        """Le impronte stanno nel DB, insieme alle righe che descrivono"""
+        return self.db_manager.get_impronta(date_str, ora)
+
+    def registra_impronte(self, date_str: str, impronte: Dict[str, str]):
+        if self._scrittura_diretta():
+            self.db_manager.set_impronte(date_str, impronte)
+        else:
+            self.db_writer.submit_impronte(date_str, impronte)
+
+    def iter_plan(self, plan: Iterable[Tuple[str, Tuple[str, ...]]], concurrent: bool = False) -> Iterator[Day]:
+        """Come LiturgiaManager.iter_plan, attendendo a fine piano che il writer abbia scritto anche le impronte"""
+        try:
+            yield from super().iter_plan(plan, concurrent=concurrent)
+        finally:
+            self.db_writer.flush()
+
+    def print_connection_stats(self):
+        """Statistiche HTTP e del writer del DB (dopo aver atteso le scritture in coda)"""
+        self.db_writer.flush()
+        super().print_connection_stats()
+        self.db_writer.print_stats()
+
+    def close(self):
+        """Scrive i giorni ancora in coda e chiude le connessioni"""
+        self.db_writer.close()
+        super().close()
+
+    def iter_date_range(self, start_date: str, end_date: str, concurrent: bool = False) -> Iterator[Day]:
+        """Override per aggiungere il salvataggio in DB (usato anche da get_date_range)"""
         print(f"\n📖 Scaricamento dati da {start_date} a {end_date}...")
-        super().get_date_range(start_date, end_date)
+        return super().iter_date_range(start_date, end_date, concurrent=concurrent)
+
+    def get_date_range(self, start_date: str, end_date: str, concurrent: bool = False,
+                       bulk: bool = False) -> List[Day]:
+        """Con bulk=True (backfill di molti giorni) scrive nel DB in modalità di caricamento massivo"""
+        if not bulk:
+            return super().get_date_range(start_date, end_date, concurrent=concurrent)
+        # Il writer non deve avere scritture in sospeso sulla propria connessione
+        self.db_writer.flush()
+        with self.db_manager.bulk_load():
+            return super().get_date_range(start_date, end_date, concurrent=concurrent)
+
+    def plan_sync(self, start_date: str, end_date: str) -> List[Tuple[str, Tuple[str, ...]]]:
+        """
+        Calcola quali giorni e quali ore mancano nel DB
+
+        Returns:
+            list: [(YYYYMMDD, ore da scaricare), ...] in ordine di data
+        """
+        stato = self.db_manager.get_range_status(start_date, end_date)
+        plan = []
+        for date_str in self._date_list(start_date, end_date):
+            presenti = stato.get(date_str, {})
+            ore = tuple(ora for ora in self.ORE if not presenti.get(ora))
+            if ore:
+                plan.append((date_str, ore))
+        return plan
+
+    def sync_date_range(self, start_date: str, end_date: str, concurrent: bool = False) -> List[Day]:
+        """
+        Scarica solo i giorni/ore mancanti nell'intervallo.
+
+        Le righe già presenti non vengono toccate prima del download: è il
+        salvataggio riuscito a sostituire l'ora, quindi un fetch fallito non
+        cancella i dati esistenti.
+        """
+        plan = self.plan_sync(start_date, end_date)
+        richieste = sum(len(ore) for _, ore in plan)
+        print(f"\n🔄 Sync {start_date}-{end_date}: {len(plan)} giorni da aggiornare, {richieste} pagine da scaricare")
+        return self.process_plan(plan, concurrent=concurrent)
+
+    def sync_upcoming(self, days: int = 60, concurrent: bool = True) -> List[Day]:
+        """Mantiene completi i prossimi `days` giorni (da usare in un job notturno)"""
+        start = datetime.now()
+        end = start + timedelta(days=days - 1)
+        return self.sync_date_range(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), concurrent=concurrent)
+
+    def refresh_upcoming(self, days: int = 21, concurrent: bool = True) -> List[Day]:
+        """
+        Riscarica tutte le ore dei prossimi `days` giorni per recepire le modifiche delle pagine.
+
+        Le ore con la stessa impronta dell'ultimo salvataggio non vengono
+        riparsificate né riscritte: con refresh_cache=True ogni pagina
+        invariata costa una risposta 304 e un hash.
+        """
+        start = datetime.now()
+        end = start + timedelta(days=days - 1)
+        return self.get_date_range(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), concurrent=concurrent)
 
 
 if __name__ == "__main__":
-    manager = LiturgiaParserWithDB()
+    manager = LiturgiaParserWithDB(cache_dir="cache")
 
     print("=" * 70)
     print("📖 PARSER LITURGIA + SQLITE DATABASE")
     print("=" * 70)
 
     # Elabora un intervallo di date
-    manager.get_date_range("20251001", "20251130")
+    manager.get_date_range("20251001", "20251130", concurrent=True)
 
     print("\n" + "=" * 70)
     print(f"✨ Database salvato in: instance/oremus.db")
@@ -0,0 +1,360 @@
+"""
+Codifica dei testi salvati nel database della liturgia
+
+I testi che si ripetono quasi identici in molte righe (Gloria al Padre,
+cantici di Zaccaria e della Beata Vergine) sono salvati una sola volta nella tabella `testi`, indirizzata per hash
+del contenuto: la colonna contiene solo un riferimento
+"\\x1etesto:<hash>". In lettura i riferimenti vengono risolti in modo
+trasparente dalla row_factory delle connessioni (db_queries, app.py).
+
+Una colonna può contenere sia testi in chiaro sia riferimenti: la
+migrazione (migrate_testi.py) può quindi avvenire un po' alla volta.
+
+Salmi e cantici, che tornano con il ciclo di quattro settimane del
+salterio, sono salvati una volta sola nella tabella `salmi` (chiave
+tipo e numero normalizzati + hash del testo): le righe di antifone_salmi
+puntano al salmo con salmo_id e lasciano vuoto il proprio contenuto.
+Le letture usano SELECT_ANTIFONE_SALMI (migrazione: migrate_salmi.py).
+
+Le colonne di testo più lunghe (inni, salmi, martirologio) possono essere
+compresse con zlib o zstd e un dizionario addestrato sul corpus, colonna
+per colonna (tabella compressione_colonne). Anche i valori compressi sono
+decodificati dalla row_factory.
+"""
+import hashlib
+import sqlite3
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    # Compressione opzionale, più efficace di zlib sui testi brevi con un dizionario
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Prefisso dei riferimenti: un carattere di controllo che il testo estratto dalle pagine non contiene
+PREFISSO_TESTO = "\x1etesto:"
+
+# Sotto questa lunghezza il riferimento non fa risparmiare abbastanza spazio
+LUNGHEZZA_MINIMA = 64
+
+# Colonne che salvano i testi nella tabella `testi`
+COLONNE_INTERNATE = {
+    "lodi_mattutine": ("gloria_al_padre", "cantico_finale"),
+    "vespri": ("gloria_al_padre", "cantico_finale"),
+}
+
+# Colonne internate in passato: nessuna lettura le risolve, migrate_testi riporta in chiaro
+# i riferimenti rimasti e fino ad allora i loro testi non sono orfani
+COLONNE_NON_PIU_INTERNATE = {
+    "invocazioni": ("contenuto",),
+}
+
+SCHEMA_TESTI = '''
+    CREATE TABLE IF NOT EXISTS testi (
+        hash TEXT PRIMARY KEY,
+        testo TEXT NOT NULL
+    )
+'''
+
+SCHEMA_SALMI = '''
+    CREATE TABLE IF NOT EXISTS salmi (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL,
+        numero TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        contenuto TEXT NOT NULL,
+        UNIQUE (tipo, numero, hash)
+    )
+'''
+
+# Righe di antifone_salmi (stesse colonne di SELECT *) con il testo del salmo canonico
+SELECT_ANTIFONE_SALMI = '''
+    SELECT a.id, a.lodi_id, a.vespri_id, a.antifona_numero, a.antifona_testo,
+           a.tipo, a.numero, a.titolo, COALESCE(s.contenuto, a.contenuto) AS contenuto, a.salmo_id
+    FROM antifone_salmi a
+    LEFT JOIN salmi s ON s.id = a.salmo_id
+'''
+
+# Testi già risolti: indirizzati per contenuto, non cambiano mai e valgono per ogni database
+_MAX_TESTI_RISOLTI = 4096
+_testi_risolti: Dict[str, str] = {}
+
+
+def hash_testo(testo: str) -> str:
+    return hashlib.blake2b(testo.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def riferimento(testo: Optional[str]) -> bool:
+    return isinstance(testo, str) and testo.startswith(PREFISSO_TESTO)
+
+
+def interna(cursor: sqlite3.Cursor, testo: Optional[str]) -> Optional[str]:
+    """Salva il testo in `testi` (se non c'è già) e restituisce il riferimento da mettere nella colonna"""
+    if not testo or (len(testo) < LUNGHEZZA_MINIMA and not riferimento(testo)):
+        return testo
+    chiave = hash_testo(testo)
+    cursor.execute('INSERT OR IGNORE INTO testi (hash, testo) VALUES (?, ?)', (chiave, testo))
+    return PREFISSO_TESTO + chiave
+
+
+def risolvi(conn: sqlite3.Connection, valore):
+    """Testo a cui punta un riferimento; gli altri valori sono restituiti invariati"""
+    if not riferimento(valore):
+        return valore
+    chiave = valore[len(PREFISSO_TESTO):]
+    testo = _testi_risolti.get(chiave)
+    if testo is None:
+        row = conn.execute('SELECT testo FROM testi WHERE hash = ?', (chiave,)).fetchone()
+        if row is None:
+            return valore
+        testo = row[0]
+        if len(_testi_risolti) < _MAX_TESTI_RISOLTI:
+            _testi_risolti[chiave] = testo
+    return testo
+
+
+def decodifica(conn: sqlite3.Connection, valore):
+    """Testo di un valore letto dal database: risolve i riferimenti e decomprime i BLOB compressi"""
+    if compresso(valore):
+        return decomprimi(conn, valore)
+    return risolvi(conn, valore)
+
+
+def row_factory(cursor: sqlite3.Cursor, row: tuple) -> sqlite3.Row:
+    """Come sqlite3.Row, con i riferimenti e i valori compressi già sostituiti dai testi"""
+    if any(riferimento(valore) or compresso(valore) for valore in row):
+        row = tuple(decodifica(cursor.connection, valore) for valore in row)
+    return sqlite3.Row(cursor, row)
+
+
+def elimina_testi_orfani(cursor: sqlite3.Cursor) -> int:
+    """Elimina i testi non più riferiti da nessuna colonna; restituisce quanti"""
+    riferiti = " UNION ".join(
+        f"SELECT substr({colonna}, {len(PREFISSO_TESTO) + 1}) FROM {tabella} "
+        f"WHERE substr({colonna}, 1, {len(PREFISSO_TESTO)}) = :prefisso"
+        for tabella, colonne in (*COLONNE_INTERNATE.items(), *COLONNE_NON_PIU_INTERNATE.items())
+        for colonna in colonne
+    )
+    cursor.execute(f'DELETE FROM testi WHERE hash NOT IN ({riferiti})', {"prefisso": PREFISSO_TESTO})
+    return cursor.rowcount
+
+
+def aggiungi_colonna_salmo_id(cursor: sqlite3.Cursor):
+    """Aggiunge antifone_salmi.salmo_id ai database creati prima della tabella salmi"""
+    cursor.execute("PRAGMA table_info(antifone_salmi)")
+    if "salmo_id" not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE antifone_salmi ADD COLUMN salmo_id INTEGER REFERENCES salmi(id)")
+
+
+def chiave_salmo(tipo: Optional[str], numero: Optional[str]) -> Tuple[str, str]:
+    """Tipo e numero normalizzati: "Salmo", "SALMO " e "42", "42 " indicano lo stesso salmo"""
+    return " ".join((tipo or "").split()).upper(), " ".join((numero or "").split()).rstrip(".")
+
+
+def salmo_id(cursor: sqlite3.Cursor, tipo: Optional[str], numero: Optional[str],
+             contenuto: Optional[str], compressione: Optional["Compressione"] = None) -> Optional[int]:
+    """Id del salmo canonico con questo testo (creato se manca), None se il testo è vuoto"""
+    if not contenuto:
+        return None
+    tipo, numero = chiave_salmo(tipo, numero)
+    chiave = hash_testo(contenuto)
+    cursor.execute('SELECT id FROM salmi WHERE tipo = ? AND numero = ? AND hash = ?', (tipo, numero, chiave))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    if compressione is not None:
+        contenuto = compressione.codifica('salmi', 'contenuto', contenuto)
+    cursor.execute('INSERT INTO salmi (tipo, numero, hash, contenuto) VALUES (?, ?, ?, ?)',
+                   (tipo, numero, chiave, contenuto))
+    return cursor.lastrowid
+
+
+def elimina_salmi_orfani(cursor: sqlite3.Cursor) -> int:
+    """Elimina i salmi non più riferiti da antifone_salmi; restituisce quanti"""
+    cursor.execute('''
+        DELETE FROM salmi
+        WHERE id NOT IN (SELECT salmo_id FROM antifone_salmi WHERE salmo_id IS NOT NULL)
+    ''')
+    return cursor.rowcount
+
+
+# ------------------------------------------------------------------
+# Compressione delle colonne di testo lunghe
+# ------------------------------------------------------------------
+# Un valore compresso è un BLOB: intestazione (magic, algoritmo, id del
+# dizionario o 0) seguita dai dati zlib/zstd del testo UTF-8. Le colonne da
+# comprimere in scrittura sono elencate in compressione_colonne: attivarle,
+# cambiarne il dizionario o disattivarle non richiede di riscrivere subito le
+# righe, perché in lettura testi in chiaro e compressi convivono
+# (migrazione graduale: migrate_compressione.py).
+
+MAGIC_COMPRESSO = b"\x1bLZ"
+_INTESTAZIONE = struct.Struct(">3scI")
+_CODICI_ALGORITMO = {"zlib": b"z", "zstd": b"s"}
+LIVELLI_PREDEFINITI = {"zlib": 9, "zstd": 19}
+
+# Testi più brevi non guadagnano abbastanza dalla compressione
+LUNGHEZZA_MINIMA_COMPRESSIONE = 128
+
+# Colonne per cui la compressione può essere attivata
+COLONNE_COMPRIMIBILI = {
+    "lodi_mattutine": ("inno",),
+    "vespri": ("inno",),
+    "antifone_salmi": ("contenuto",),
+    "salmi": ("contenuto",),
+    "santi": ("martirologio",),
+}
+
+SCHEMA_COMPRESSIONE = (
+    '''
+    CREATE TABLE IF NOT EXISTS dizionari_compressione (
+        id INTEGER PRIMARY KEY,
+        algoritmo TEXT NOT NULL,
+        dati BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS compressione_colonne (
+        tabella TEXT NOT NULL,
+        colonna TEXT NOT NULL,
+        algoritmo TEXT NOT NULL,
+        livello INTEGER NOT NULL,
+        dizionario_id INTEGER REFERENCES dizionari_compressione(id),
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (tabella, colonna)
+    )
+    ''',
+)
+
+# Dizionari per id: l'id è un hash del contenuto, quindi valgono per ogni database
+_dizionari: Dict[int, bytes] = {}
+# Compressori/decompressori zstd per thread (non sono thread-safe), per (livello, dizionario)
+_locale = threading.local()
+
+
+def compresso(valore) -> bool:
+    return isinstance(valore, bytes) and valore.startswith(MAGIC_COMPRESSO)
+
+
+def _dizionario(conn: sqlite3.Connection, dizionario_id: int) -> Optional[bytes]:
+    if not dizionario_id:
+        return None
+    dati = _dizionari.get(dizionario_id)
+    if dati is None:
+        row = conn.execute('SELECT dati FROM dizionari_compressione WHERE id = ?', (dizionario_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Dizionario di compressione {dizionario_id} non trovato")
+        dati = _dizionari[dizionario_id] = bytes(row[0])
+    return dati
+
+
+def _zstd(tipo: str, livello: int, dizionario_id: int, dati_dizionario: Optional[bytes]):
+    if zstandard is None:
+        raise RuntimeError("zstandard non installato: colonne zstd non disponibili")
+    cache = _locale.__dict__.setdefault("zstd", {})
+    chiave = (tipo, livello, dizionario_id)
+    oggetto = cache.get(chiave)
+    if oggetto is None:
+        dizionario = zstandard.ZstdCompressionDict(dati_dizionario) if dati_dizionario else None
+        if tipo == "compressore":
+            oggetto = zstandard.ZstdCompressor(level=livello, dict_data=dizionario)
+        else:
+            oggetto = zstandard.ZstdDecompressor(dict_data=dizionario)
+        cache[chiave] = oggetto
+    return oggetto
+
+
+def comprimi(conn: sqlite3.Connection, testo: str, algoritmo: str = "zlib", livello: Optional[int] = None,
+             dizionario_id: Optional[int] = None) -> bytes:
+    """Testo compresso con intestazione, pronto da salvare come BLOB"""
+    livello = LIVELLI_PREDEFINITI[algoritmo] if livello is None else livello
+    dati_dizionario = _dizionario(conn, dizionario_id)
+    dati = testo.encode("utf-8")
+    if algoritmo == "zstd":
+        payload = _zstd("compressore", livello, dizionario_id or 0, dati_dizionario).compress(dati)
+    else:
+        compressore = zlib.compressobj(livello, zdict=dati_dizionario) if dati_dizionario else zlib.compressobj(livello)
+        payload = compressore.compress(dati) + compressore.flush()
+    return _INTESTAZIONE.pack(MAGIC_COMPRESSO, _CODICI_ALGORITMO[algoritmo], dizionario_id or 0) + payload
+
+
+def decomprimi(conn: sqlite3.Connection, valore: bytes) -> str:
+    _, codice, dizionario_id = _INTESTAZIONE.unpack_from(valore)
+    payload = valore[_INTESTAZIONE.size:]
+    dati_dizionario = _dizionario(conn, dizionario_id)
+    if codice == _CODICI_ALGORITMO["zstd"]:
+        dati = _zstd("decompressore", 0, dizionario_id, dati_dizionario).decompress(payload)
+    else:
+        decompressore = zlib.decompressobj(zdict=dati_dizionario) if dati_dizionario else zlib.decompressobj()
+        dati = decompressore.decompress(payload) + decompressore.flush()
+    return dati.decode("utf-8")
+
+
+class Compressione:
+    """Colonne da comprimere in scrittura, lette da compressione_colonne"""
+
+    def __init__(self, conn: Optional[sqlite3.Connection], colonne: Dict[Tuple[str, str], Tuple]):
+        self.conn = conn
+        self.colonne = colonne
+
+    @classmethod
+    def carica(cls, cursor: sqlite3.Cursor) -> "Compressione":
+        conn = cursor.connection
+        righe = conn.execute(
+            'SELECT tabella, colonna, algoritmo, livello, dizionario_id FROM compressione_colonne').fetchall()
+        return cls(conn, {(tabella, colonna): (algoritmo, livello, dizionario_id)
+                          for tabella, colonna, algoritmo, livello, dizionario_id in righe})
+
+    def codifica(self, tabella: str, colonna: str, testo):
+        """Il testo compresso se la colonna lo prevede e se conviene, altrimenti invariato"""
+        impostazione = self.colonne.get((tabella, colonna))
+        if impostazione is None or not isinstance(testo, str) or len(testo) < LUNGHEZZA_MINIMA_COMPRESSIONE:
+            return testo
+        algoritmo, livello, dizionario_id = impostazione
+        valore = comprimi(self.conn, testo, algoritmo, livello, dizionario_id)
+        return valore if len(valore) < len(testo.encode("utf-8")) else testo
+
+
+def addestra_dizionario(campioni: List[str], algoritmo: str = "zlib", dimensione: int = 32768) -> bytes:
+    """
+    Dizionario per la compressione addestrato sui testi del corpus.
+
+    Per zstd usa il training della libreria; per zlib (finestra di 32 KB)
+    raccoglie le righe più ripetute nei campioni, con le più utili in fondo,
+    dove costano meno da riferire.
+    """
+    if algoritmo == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard non installato")
+        return zstandard.train_dictionary(dimensione, [c.encode("utf-8") for c in campioni]).as_bytes()
+
+    frequenze = Counter(
+        riga.strip() for campione in campioni for riga in campione.splitlines() if len(riga.strip()) >= 16
+    )
+    righe = [riga for riga, volte in frequenze.most_common() if volte > 1]
+    scelte, totale = [], 0
+    for riga in righe:
+        dati = (riga + "\n").encode("utf-8")
+        if totale + len(dati) > min(dimensione, 32768):
+            break
+        scelte.append(dati)
+        totale += len(dati)
+    return b"".join(reversed(scelte))
+
+
+def salva_dizionario(cursor: sqlite3.Cursor, algoritmo: str, dati: bytes) -> int:
+    """Salva il dizionario (se non c'è già) e restituisce il suo id"""
+    dizionario_id = int.from_bytes(hashlib.blake2b(dati, digest_size=4).digest(), "big") or 1
+    cursor.execute('INSERT OR IGNORE INTO dizionari_compressione (id, algoritmo, dati) VALUES (?, ?, ?)',
+                   (dizionario_id, algoritmo, dati))
+    return dizionario_id
+
+
+def registra_funzioni(conn: sqlite3.Connection):
+    """Funzione SQL testo(colonna): il valore decodificato, per i filtri (LIKE) sulle colonne compresse"""
+    conn.create_function("testo", 1, lambda valore: decodifica(conn, valore), deterministic=True)
@@ -4,6 +4,8 @@
 import sqlite3
 from datetime import datetime
 
+import db_codec
+
 DB_PATH = 'instance/oremus.db'
 
 
@@ -16,7 +18,9 @@ def get_connection():
     """
     try:
         conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Permette l'accesso per colonna
+        # Accesso per colonna, con i testi condivisi (tabella testi) e le colonne compresse già risolti
+        conn.row_factory = db_codec.row_factory
+        db_codec.registra_funzioni(conn)
         return conn
     except Exception as e:
         print(f"❌ Errore connessione DB: {e}")
@@ -396,12 +400,10 @@ def get_antifone_salmi_by_lodi_id(lodi_id):
         conn = get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT id, lodi_id, vespri_id, antifona_numero, antifona_testo, 
-                   tipo, numero, titolo, contenuto
-            FROM antifone_salmi 
-            WHERE lodi_id = ?
-            ORDER BY antifona_numero ASC
+        # Testo dei salmi dalla tabella salmi (righe migrate) o dalla riga stessa
+        cursor.execute(db_codec.SELECT_ANTIFONE_SALMI + '''
+            WHERE a.lodi_id = ?
+            ORDER BY a.antifona_numero ASC
         ''', (lodi_id,))
 
         results = cursor.fetchall()
@@ -427,12 +429,10 @@ def get_antifone_salmi_by_vespri_id(vespri_id):
         conn = get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT id, lodi_id, vespri_id, antifona_numero, antifona_testo, 
-                   tipo, numero, titolo, contenuto
-            FROM antifone_salmi 
-            WHERE vespri_id = ?
-            ORDER BY antifona_numero ASC
+        # Testo dei salmi dalla tabella salmi (righe migrate) o dalla riga stessa
+        cursor.execute(db_codec.SELECT_ANTIFONE_SALMI + '''
+            WHERE a.vespri_id = ?
+            ORDER BY a.antifona_numero ASC
         ''', (vespri_id,))
 
         results = cursor.fetchall()
@@ -616,7 +616,7 @@ def search_santi(query):
         cursor.execute('''
             SELECT id, giorno_id, giorno, nome_santo, martirologio, tipo
             FROM santi 
-            WHERE nome_santo LIKE ? OR martirologio LIKE ?
+            WHERE nome_santo LIKE ? OR testo(martirologio) LIKE ?
             ORDER BY nome_santo ASC
             LIMIT 20
         ''', (search_term, search_term))
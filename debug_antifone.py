@@ -8,6 +8,8 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import db_codec
+
 DB_PATH = 'instance/oremus.db'
 
 
@@ -15,7 +17,9 @@ def debug_vespri_antifone_salmi():
     """Debug della struttura vespri + antifone_salmi"""
     try:
         conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        # Testi condivisi e colonne compresse letti come testo
+        conn.row_factory = db_codec.row_factory
+        db_codec.registra_funzioni(conn)
         cursor = conn.cursor()
 
         print("\n" + "=" * 80)
@@ -64,10 +68,10 @@ def debug_vespri_antifone_salmi():
                 print()
 
             # Recupera antifone_salmi per questo vespri
-            cursor.execute('''
-                SELECT * FROM antifone_salmi 
-                WHERE vespri_id = ?
-                ORDER BY antifona_numero
+            # Con il testo del salmo canonico al posto del contenuto vuoto della riga
+            cursor.execute(db_codec.SELECT_ANTIFONE_SALMI + '''
+                WHERE a.vespri_id = ?
+                ORDER BY a.antifona_numero
             ''', (test_vespri_id,))
 
             test_rows = cursor.fetchall()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Import parallelo dell'archivio JSON della liturgia nel database
+
+Legge i file liturgia_*.json di una o più cartelle e/o archivi NDJSON
+(un giorno per riga), decodifica e valida i giorni in un pool di processi
+e li scrive in ordine in modalità di caricamento massivo
+(LiturgiaDBManager.bulk_load). Usa orjson se installato, altrimenti json.
+La velocità è riportata in file/s, contando ogni riga NDJSON come un file.
+
+Reimportare lo stesso archivio sostituisce i giorni invece di duplicarli:
+gli indici usati dalle sostituzioni restano attivi anche durante l'import,
+quindi reimportare su un database già popolato non rallenta con la sua
+dimensione.
+
+Uso:
+    python import_json.py [json] [archivio.ndjson ...] [--db instance/oremus.db]
+                          [--workers N] [--chunk 64] [--giorni-per-transazione 500] [--mantieni-indici]
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    # Decoder JSON opzionale, diverse volte più veloce di json
+    import orjson
+except ImportError:
+    orjson = None
+
+from old.lrgyParser import Day
+from completo import LiturgiaDBManager
+
+JSON_LOADS = orjson.loads if orjson is not None else json.loads
+ESTENSIONI_NDJSON = (".ndjson", ".jsonl")
+ORE = ("lodi_mattutine", "vespri", "santo_del_giorno")
+
+# Lotto da decodificare: ("file", [percorsi]) oppure ("ndjson", (nome, prima riga, [righe]))
+Lotto = Tuple[str, object]
+# Esito per giorno: (origine, Day o None, errore o None)
+Esito = Tuple[str, Optional[Day], Optional[str]]
+
+
+def valida_giorno(data) -> Optional[str]:
+    """Motivo per cui il dizionario non è un giorno importabile, None se è valido"""
+    if not isinstance(data, dict):
+        return "non è un oggetto JSON"
+    data_iso = data.get("data_iso")
+    if not isinstance(data_iso, str) or len(data_iso) != 8:
+        return f"data_iso non valida: {data_iso!r}"
+    try:
+        datetime.strptime(data_iso, "%Y%m%d")
+    except ValueError:
+        return f"data_iso non valida: {data_iso!r}"
+    for campo in ("data", "giorno_settimana"):
+        if not isinstance(data.get(campo), str):
+            return f"{campo} mancante"
+    ore = [ora for ora in ORE if data.get(ora)]
+    if not ore:
+        return "nessuna ora"
+    for ora in ore:
+        if not isinstance(data[ora], dict):
+            return f"{ora} non è un oggetto"
+    return None
+
+
+def _giorno(origine: str, testo) -> Esito:
+    try:
+        data = JSON_LOADS(testo)
+    except ValueError as e:
+        return origine, None, f"JSON non valido: {e}"
+    errore = valida_giorno(data)
+    if errore:
+        return origine, None, errore
+    try:
+        return origine, Day.from_dict(data), None
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        return origine, None, f"struttura non valida: {e}"
+
+
+def _decodifica_lotto(lotto: Lotto) -> List[Esito]:
+    """Worker: legge (per i file) e decodifica un lotto di giorni"""
+    tipo, contenuto = lotto
+    esiti = []
+    if tipo == "file":
+        for percorso in contenuto:
+            try:
+                with open(percorso, "rb") as f:
+                    testo = f.read()
+            except OSError as e:
+                esiti.append((os.path.basename(percorso), None, str(e)))
+                continue
+            esiti.append(_giorno(os.path.basename(percorso), testo))
+    else:
+        nome, prima_riga, righe = contenuto
+        for numero, riga in enumerate(righe, start=prima_riga):
+            if riga.strip():
+                esiti.append(_giorno(f"{nome}:{numero}", riga))
+    return esiti
+
+
+def lotti(sorgenti: Iterable[str], chunk: int = 64) -> Iterator[Lotto]:
+    """Lotti da decodificare: file liturgia_*.json delle cartelle e righe degli archivi NDJSON"""
+    for sorgente in sorgenti:
+        percorso = Path(sorgente)
+        if percorso.is_dir():
+            files = sorted(str(p) for p in percorso.glob("liturgia_*.json"))
+            for i in range(0, len(files), chunk):
+                yield "file", files[i:i + chunk]
+        elif percorso.suffix in ESTENSIONI_NDJSON:
+            # Le righe vengono lette qui (lettura sequenziale, limitata dal disco) e decodificate nei worker
+            with open(percorso, "rb") as f:
+                righe, prima_riga = [], 1
+                for numero, riga in enumerate(f, start=1):
+                    righe.append(riga)
+                    if len(righe) >= chunk:
+                        yield "ndjson", (percorso.name, prima_riga, righe)
+                        righe, prima_riga = [], numero + 1
+                if righe:
+                    yield "ndjson", (percorso.name, prima_riga, righe)
+        elif percorso.is_file():
+            yield "file", [str(percorso)]
+        else:
+            print(f"⚠️  Sorgente non trovata: {sorgente}")
+
+
+def _in_ordine(executor: ProcessPoolExecutor, funzione: Callable, elementi: Iterable, finestra: int) -> Iterator:
+    """Come executor.map ma con al più `finestra` lotti in volo: l'input non viene letto tutto in anticipo"""
+    in_volo = deque()
+    for elemento in elementi:
+        in_volo.append(executor.submit(funzione, elemento))
+        if len(in_volo) >= finestra:
+            yield in_volo.popleft().result()
+    while in_volo:
+        yield in_volo.popleft().result()
+
+
+def importa(sorgenti: Iterable[str], db_path: str = "instance/oremus.db", workers: Optional[int] = None,
+            chunk: int = 64, giorni_per_transazione: int = 500, ricostruisci_indici: bool = True) -> Dict[str, int]:
+    """
+    Importa i giorni delle sorgenti (cartelle di liturgia_*.json o archivi NDJSON)
+
+    Returns:
+        dict: {"importati": n, "scartati": n, "falliti": n}
+    """
+    workers = workers or os.cpu_count() or 1
+    db_manager = LiturgiaDBManager(db_path)
+    risultato = {"importati": 0, "scartati": 0, "falliti": 0}
+    letti = 0
+    decoder = "orjson" if orjson is not None else "json"
+    print(f"📥 Import JSON con {workers} processi (decoder {decoder})...")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            db_manager.bulk_load(giorni_per_transazione=giorni_per_transazione,
+                                 ricostruisci_indici=ricostruisci_indici):
+        for esiti in _in_ordine(executor, _decodifica_lotto, lotti(sorgenti, chunk), finestra=workers * 4):
+            letti += len(esiti)
+            giorni = []
+            for origine, giorno, errore in esiti:
+                if errore:
+                    risultato["scartati"] += 1
+                    print(f"✗ Scartato {origine}: {errore}")
+                else:
+                    giorni.append(giorno)
+            salvati = db_manager.replace_days(giorni)
+            risultato["importati"] += salvati
+            risultato["falliti"] += len(giorni) - salvati
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {risultato['importati']} giorni importati, {risultato['scartati']} scartati, "
+          f"{risultato['falliti']} falliti in {elapsed:.1f}s ({letti / elapsed:.1f} file/s)")
+    return risultato
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import parallelo dell'archivio JSON nel database")
+    parser.add_argument("sorgenti", nargs="*", default=["json"],
+                        help="Cartelle con liturgia_*.json o archivi .ndjson/.jsonl (default: json)")
+    parser.add_argument("--db", default="instance/oremus.db", help="Percorso del database SQLite")
+    parser.add_argument("--workers", type=int, default=None, help="Processi di decodifica (default: tutti i core)")
+    parser.add_argument("--chunk", type=int, default=64, help="Giorni per lotto inviato a un processo")
+    parser.add_argument("--giorni-per-transazione", type=int, default=500, help="Giorni per commit")
+    parser.add_argument("--mantieni-indici", action="store_true",
+                        help="Non eliminare nemmeno gli indici di sola lettura durante l'import")
+    args = parser.parse_args()
+
+    importa(args.sorgenti, db_path=args.db, workers=args.workers, chunk=args.chunk,
+            giorni_per_transazione=args.giorni_per_transazione, ricostruisci_indici=not args.mantieni_indici)
+
+
+if __name__ == "__main__":
+    main()
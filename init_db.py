@@ -2,6 +2,8 @@ import sqlite3
 import os
 from datetime import datetime, timedelta
 
+import db_codec
+
 # Database path
 DB_PATH = 'instance/oremus.db'
 
@@ -112,6 +114,7 @@ def init_database():
                 numero TEXT,
                 titolo TEXT,
                 contenuto TEXT,
+                salmo_id INTEGER REFERENCES salmi(id),
                 FOREIGN KEY (lodi_id) REFERENCES lodi_mattutine(id) ON DELETE CASCADE,
                 FOREIGN KEY (vespri_id) REFERENCES vespri(id) ON DELETE CASCADE
             )
@@ -169,6 +172,25 @@ def init_database():
             )
         ''')
 
+        # ============================================
+        # TABELLA: testi (testi ripetuti salvati una volta sola, vedi db_codec)
+        # ============================================
+        print("📋 Creando tabella: testi")
+        cursor.execute(db_codec.SCHEMA_TESTI)
+
+        # ============================================
+        # TABELLA: salmi (salmi e cantici del salterio, vedi db_codec)
+        # ============================================
+        print("📋 Creando tabella: salmi")
+        cursor.execute(db_codec.SCHEMA_SALMI)
+
+        # ============================================
+        # TABELLE: compressione_colonne, dizionari_compressione (vedi db_codec)
+        # ============================================
+        print("📋 Creando tabelle: compressione_colonne, dizionari_compressione")
+        for schema in db_codec.SCHEMA_COMPRESSIONE:
+            cursor.execute(schema)
+
         # ============================================
         # TABELLA: utenti
         # ============================================
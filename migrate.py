@@ -7,6 +7,8 @@ import sqlite3
 import os
 from pathlib import Path
 
+import db_codec
+
 
 def backup_database(db_path: str):
     """Create a backup of the database before migration"""
@@ -70,6 +72,9 @@ def verify_schema(db_path: str):
     """Verify the schema after migration"""
     try:
         conn = sqlite3.connect(db_path)
+        # Shared and compressed texts are shown decoded
+        conn.row_factory = db_codec.row_factory
+        db_codec.registra_funzioni(conn)
         cursor = conn.cursor()
 
         print("\n📋 Current santi table schema:")
@@ -97,7 +102,7 @@ def verify_schema(db_path: str):
                 LIMIT 3
             ''')
             for row in cursor.fetchall():
-                print(f"  {row}")
+                print(f"  {tuple(row)}")
 
         conn.close()
         return True
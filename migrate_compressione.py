@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Compressione delle colonne di testo lunghe (vedi db_codec)
+
+Attiva la compressione di una o più colonne (inni, salmi, martirologio):
+addestra facoltativamente un dizionario sui testi già salvati, registra la
+colonna in compressione_colonne (da quel momento LiturgiaDBManager comprime
+in scrittura) e comprime le righe esistenti a lotti, con una breve
+transazione ciascuno. Con --disattiva fa il contrario. L'app può restare in
+esecuzione: in lettura testi in chiaro e compressi convivono.
+Rieseguirla è innocuo.
+
+Uso:
+    python migrate_compressione.py --stato [--db instance/oremus.db]
+    python migrate_compressione.py salmi.contenuto santi.martirologio [--algoritmo zlib|zstd]
+                                   [--livello N] [--dizionario] [--campioni 2000] [--lotto 500] [--vacuum]
+    python migrate_compressione.py lodi_mattutine.inno --disattiva
+"""
+import argparse
+import os
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+import db_codec
+from migrate_testi import dimensione
+
+
+def _colonna(nome: str) -> Optional[Tuple[str, str]]:
+    tabella, _, colonna = nome.partition(".")
+    if colonna not in db_codec.COLONNE_COMPRIMIBILI.get(tabella, ()):
+        return None
+    return tabella, colonna
+
+
+def stato(conn: sqlite3.Connection):
+    """Stampa, per ogni colonna comprimibile, impostazione e spazio occupato"""
+    impostazioni = {
+        (tabella, colonna): (algoritmo, livello, dizionario_id)
+        for tabella, colonna, algoritmo, livello, dizionario_id in conn.execute(
+            'SELECT tabella, colonna, algoritmo, livello, dizionario_id FROM compressione_colonne')
+    }
+    for tabella, colonne in db_codec.COLONNE_COMPRIMIBILI.items():
+        for colonna in colonne:
+            compresse, chiare, byte = conn.execute(f'''
+                SELECT COALESCE(SUM(typeof({colonna}) = 'blob'), 0),
+                       COALESCE(SUM(typeof({colonna}) = 'text'), 0),
+                       COALESCE(SUM(length(CAST({colonna} AS BLOB))), 0)
+                FROM {tabella}
+            ''').fetchone()
+            impostazione = impostazioni.get((tabella, colonna))
+            if impostazione:
+                algoritmo, livello, dizionario_id = impostazione
+                descrizione = f"{algoritmo} {livello}" + (f", dizionario {dizionario_id}" if dizionario_id else "")
+            else:
+                descrizione = "non compressa"
+            print(f"   {tabella}.{colonna}: {descrizione} | {compresse} compresse, {chiare} in chiaro, "
+                  f"{byte / 1e6:.2f} MB")
+
+
+def campioni(conn: sqlite3.Connection, tabella: str, colonna: str, quanti: int) -> List[str]:
+    righe = conn.execute(f'''
+        SELECT {colonna} FROM {tabella}
+        WHERE {colonna} IS NOT NULL AND length({colonna}) >= ?
+        ORDER BY random() LIMIT ?
+    ''', (db_codec.LUNGHEZZA_MINIMA_COMPRESSIONE, quanti)).fetchall()
+    return [db_codec.decodifica(conn, valore) for valore, in righe]
+
+
+def converti_colonna(conn: sqlite3.Connection, tabella: str, colonna: str, lotto: int = 500) -> int:
+    """
+    Riscrive le righe secondo l'impostazione attuale della colonna: comprime i
+    testi in chiaro se la compressione è attiva, altrimenti decomprime i BLOB
+
+    Returns:
+        int: Righe aggiornate
+    """
+    aggiornate = 0
+    ultimo_id = 0
+    while True:
+        compressione = db_codec.Compressione.carica(conn.cursor())
+        attiva = (tabella, colonna) in compressione.colonne
+        righe = conn.execute(f'''
+            SELECT id, {colonna} FROM {tabella}
+            WHERE id > ? AND typeof({colonna}) = ?
+            ORDER BY id LIMIT ?
+        ''', (ultimo_id, 'text' if attiva else 'blob', lotto)).fetchall()
+        if not righe:
+            return aggiornate
+        ultimo_id = righe[-1][0]
+        valori = []
+        for id_riga, valore in righe:
+            if attiva:
+                nuovo = compressione.codifica(tabella, colonna, valore)
+            elif db_codec.compresso(valore):
+                nuovo = db_codec.decomprimi(conn, valore)
+            else:
+                continue
+            if nuovo is not valore:
+                valori.append((nuovo, id_riga))
+        with conn:
+            conn.executemany(f'UPDATE {tabella} SET {colonna} = ? WHERE id = ?', valori)
+        aggiornate += len(valori)
+
+
+def migra(db_path: str, colonne: List[str], algoritmo: str = "zlib", livello: Optional[int] = None,
+          dizionario: bool = False, quanti_campioni: int = 2000, disattiva: bool = False, lotto: int = 500,
+          vacuum: bool = False) -> int:
+    """
+    Returns:
+        int: Righe aggiornate
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Database non trovato: {db_path}")
+        return 0
+
+    scelte = []
+    for nome in colonne:
+        scelta = _colonna(nome)
+        if scelta is None:
+            comprimibili = ", ".join(f"{t}.{c}" for t, cc in db_codec.COLONNE_COMPRIMIBILI.items() for c in cc)
+            print(f"❌ Colonna non comprimibile: {nome} (disponibili: {comprimibili})")
+            return 0
+        scelte.append(scelta)
+    if algoritmo == "zstd" and db_codec.zstandard is None:
+        print("❌ zstandard non installato: usa --algoritmo zlib oppure pip install zstandard")
+        return 0
+    livello = db_codec.LIVELLI_PREDEFINITI[algoritmo] if livello is None else livello
+
+    prima = dimensione(db_path)
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            for schema in db_codec.SCHEMA_COMPRESSIONE:
+                conn.execute(schema)
+
+        totale = 0
+        for tabella, colonna in scelte:
+            with conn:
+                if disattiva:
+                    conn.execute('DELETE FROM compressione_colonne WHERE tabella = ? AND colonna = ?',
+                                 (tabella, colonna))
+                else:
+                    dizionario_id = None
+                    if dizionario:
+                        testi = campioni(conn, tabella, colonna, quanti_campioni)
+                        if testi:
+                            dati = db_codec.addestra_dizionario(testi, algoritmo)
+                            dizionario_id = db_codec.salva_dizionario(conn.cursor(), algoritmo, dati)
+                            print(f"📖 Dizionario {dizionario_id} per {tabella}.{colonna}: "
+                                  f"{len(dati) / 1024:.1f} KB da {len(testi)} testi")
+                    # I valori già compressi con un'impostazione precedente restano leggibili
+                    conn.execute('''
+                        INSERT INTO compressione_colonne (tabella, colonna, algoritmo, livello, dizionario_id)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(tabella, colonna) DO UPDATE SET
+                            algoritmo = excluded.algoritmo,
+                            livello = excluded.livello,
+                            dizionario_id = excluded.dizionario_id,
+                            updated_at = CURRENT_TIMESTAMP
+                    ''', (tabella, colonna, algoritmo, livello, dizionario_id))
+
+            aggiornate = converti_colonna(conn, tabella, colonna, lotto)
+            totale += aggiornate
+            print(f"✓ {tabella}.{colonna}: {aggiornate} righe {'decompresse' if disattiva else 'compresse'}")
+
+        stato(conn)
+        if vacuum:
+            print("🗜️  VACUUM...")
+            conn.execute('VACUUM')
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {totale} righe aggiornate in {elapsed:.1f}s | database {prima / 1e6:.1f} MB → {dimensione(db_path) / 1e6:.1f} MB")
+    return totale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprime (o decomprime) le colonne di testo lunghe")
+    parser.add_argument("colonne", nargs="*", help="Colonne tabella.colonna (es. salmi.contenuto)")
+    parser.add_argument("--db", default="instance/oremus.db", help="Percorso del database SQLite")
+    parser.add_argument("--algoritmo", choices=sorted(db_codec.LIVELLI_PREDEFINITI), default="zlib",
+                        help="Algoritmo di compressione (zstd richiede il pacchetto zstandard)")
+    parser.add_argument("--livello", type=int, default=None, help="Livello di compressione")
+    parser.add_argument("--dizionario", action="store_true", help="Addestra un dizionario sui testi della colonna")
+    parser.add_argument("--campioni", type=int, default=2000, help="Testi usati per addestrare il dizionario")
+    parser.add_argument("--disattiva", action="store_true", help="Disattiva la compressione e decomprime le righe")
+    parser.add_argument("--stato", action="store_true", help="Mostra impostazioni e spazio per colonna")
+    parser.add_argument("--lotto", type=int, default=500, help="Righe per transazione")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Compatta il file alla fine (blocca il database per la durata)")
+    args = parser.parse_args()
+
+    if args.stato or not args.colonne:
+        if not os.path.exists(args.db):
+            print(f"❌ Database non trovato: {args.db}")
+            return
+        conn = sqlite3.connect(args.db)
+        try:
+            for schema in db_codec.SCHEMA_COMPRESSIONE:
+                conn.execute(schema)
+            stato(conn)
+        finally:
+            conn.close()
+        return
+
+    migra(args.db, args.colonne, algoritmo=args.algoritmo, livello=args.livello, dizionario=args.dizionario,
+          quanti_campioni=args.campioni, disattiva=args.disattiva, lotto=args.lotto, vacuum=args.vacuum)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Migrazione dei testi di salmi e cantici nella tabella canonica `salmi` (vedi db_codec)
+
+Aggiunge antifone_salmi.salmo_id se manca, poi per ogni riga con il testo
+in chiaro trova o crea il salmo canonico (tipo e numero normalizzati +
+hash del testo), imposta salmo_id e svuota il contenuto della riga.
+Procede a lotti con una breve transazione ciascuno: le letture
+(db_codec.SELECT_ANTIFONE_SALMI) funzionano su righe migrate e non.
+Rieseguirla è innocuo.
+
+Uso:
+    python migrate_salmi.py [--db instance/oremus.db] [--lotto 1000] [--vacuum]
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+import db_codec
+from migrate_testi import dimensione
+
+
+def migra(db_path: str = "instance/oremus.db", lotto: int = 1000, vacuum: bool = False) -> int:
+    """
+    Returns:
+        int: Righe di antifone_salmi migrate
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Database non trovato: {db_path}")
+        return 0
+
+    prima = dimensione(db_path)
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute(db_codec.SCHEMA_SALMI)
+            for schema in db_codec.SCHEMA_COMPRESSIONE:
+                cursor.execute(schema)
+            db_codec.aggiungi_colonna_salmo_id(cursor)
+
+        migrate = 0
+        ultimo_id = 0
+        while True:
+            righe = conn.execute('''
+                SELECT id, tipo, numero, contenuto FROM antifone_salmi
+                WHERE id > ? AND salmo_id IS NULL AND contenuto IS NOT NULL AND contenuto != ''
+                ORDER BY id LIMIT ?
+            ''', (ultimo_id, lotto)).fetchall()
+            if not righe:
+                break
+            ultimo_id = righe[-1][0]
+            with conn:
+                cursor = conn.cursor()
+                compressione = db_codec.Compressione.carica(cursor)
+                # Il contenuto può essere già compresso (migrate_compressione.py): l'hash è sul testo
+                valori = [
+                    (db_codec.salmo_id(cursor, tipo, numero, db_codec.decodifica(conn, contenuto), compressione),
+                     id_riga)
+                    for id_riga, tipo, numero, contenuto in righe
+                ]
+                cursor.executemany('UPDATE antifone_salmi SET salmo_id = ?, contenuto = NULL WHERE id = ?', valori)
+            migrate += len(valori)
+            print(f"   ... {migrate} righe")
+
+        with conn:
+            orfani = db_codec.elimina_salmi_orfani(conn.cursor())
+        salmi, riferimenti = conn.execute('''
+            SELECT (SELECT COUNT(*) FROM salmi), (SELECT COUNT(*) FROM antifone_salmi WHERE salmo_id IS NOT NULL)
+        ''').fetchone()
+        print(f"📖 {riferimenti} righe puntano a {salmi} salmi/cantici distinti (eliminati {orfani} non più usati)")
+
+        if vacuum:
+            print("🗜️  VACUUM...")
+            conn.execute('VACUUM')
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {migrate} righe migrate in {elapsed:.1f}s | database {prima / 1e6:.1f} MB → {dimensione(db_path) / 1e6:.1f} MB")
+    return migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplica i testi di salmi e cantici nella tabella salmi")
+    parser.add_argument("--db", default="instance/oremus.db", help="Percorso del database SQLite")
+    parser.add_argument("--lotto", type=int, default=1000, help="Righe per transazione")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Compatta il file alla fine (blocca il database per la durata)")
+    args = parser.parse_args()
+
+    migra(args.db, lotto=args.lotto, vacuum=args.vacuum)
+
+
+if __name__ == "__main__":
+    main()
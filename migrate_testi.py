@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Migrazione dei testi ripetuti nella tabella `testi` (vedi db_codec)
+
+Sostituisce i testi in chiaro delle colonne di db_codec.COLONNE_INTERNATE
+con i riferimenti alla tabella `testi`, a lotti di righe con una breve
+transazione ciascuno: l'app può restare in esecuzione, perché in lettura
+testi in chiaro e riferimenti convivono. Nelle colonne che non sono più
+internate (db_codec.COLONNE_NON_PIU_INTERNATE) riporta invece in chiaro i
+riferimenti rimasti. Rieseguirla è innocuo.
+
+Uso:
+    python migrate_testi.py [--db instance/oremus.db] [--lotto 1000] [--vacuum]
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+import db_codec
+
+
+def dimensione(db_path: str) -> int:
+    return sum(os.path.getsize(p) for p in (db_path, db_path + "-wal") if os.path.exists(p))
+
+
+def migra_colonna(conn: sqlite3.Connection, tabella: str, colonna: str, lotto: int = 1000) -> int:
+    """Sostituisce con riferimenti i testi in chiaro di una colonna; restituisce le righe aggiornate"""
+    aggiornate = 0
+    ultimo_id = 0
+    while True:
+        righe = conn.execute(f'''
+            SELECT id, {colonna} FROM {tabella}
+            WHERE id > ? AND length({colonna}) >= ?
+            ORDER BY id LIMIT ?
+        ''', (ultimo_id, db_codec.LUNGHEZZA_MINIMA, lotto)).fetchall()
+        if not righe:
+            return aggiornate
+        ultimo_id = righe[-1][0]
+        with conn:
+            cursor = conn.cursor()
+            valori = [
+                (db_codec.interna(cursor, testo), id_riga)
+                for id_riga, testo in righe
+                if not db_codec.riferimento(testo)
+            ]
+            cursor.executemany(f'UPDATE {tabella} SET {colonna} = ? WHERE id = ?', valori)
+        aggiornate += len(valori)
+
+
+def ripristina_colonna(conn: sqlite3.Connection, tabella: str, colonna: str, lotto: int = 1000) -> int:
+    """Sostituisce con i testi i riferimenti di una colonna; restituisce le righe aggiornate"""
+    aggiornate = 0
+    ultimo_id = 0
+    while True:
+        righe = conn.execute(f'''
+            SELECT id, {colonna} FROM {tabella}
+            WHERE id > ? AND substr({colonna}, 1, ?) = ?
+            ORDER BY id LIMIT ?
+        ''', (ultimo_id, len(db_codec.PREFISSO_TESTO), db_codec.PREFISSO_TESTO, lotto)).fetchall()
+        if not righe:
+            return aggiornate
+        ultimo_id = righe[-1][0]
+        valori = [(db_codec.risolvi(conn, valore), id_riga) for id_riga, valore in righe]
+        with conn:
+            conn.executemany(f'UPDATE {tabella} SET {colonna} = ? WHERE id = ?', valori)
+        aggiornate += len(valori)
+
+
+def migra(db_path: str = "instance/oremus.db", lotto: int = 1000, vacuum: bool = False) -> int:
+    """
+    Returns:
+        int: Righe aggiornate
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Database non trovato: {db_path}")
+        return 0
+
+    prima = dimensione(db_path)
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute(db_codec.SCHEMA_TESTI)
+        totale = 0
+        for tabella, colonne in db_codec.COLONNE_INTERNATE.items():
+            for colonna in colonne:
+                aggiornate = migra_colonna(conn, tabella, colonna, lotto)
+                totale += aggiornate
+                print(f"✓ {tabella}.{colonna}: {aggiornate} righe")
+        for tabella, colonne in db_codec.COLONNE_NON_PIU_INTERNATE.items():
+            for colonna in colonne:
+                aggiornate = ripristina_colonna(conn, tabella, colonna, lotto)
+                totale += aggiornate
+                print(f"✓ {tabella}.{colonna}: {aggiornate} righe riportate in chiaro")
+
+        with conn:
+            orfani = db_codec.elimina_testi_orfani(conn.cursor())
+        testi = conn.execute('SELECT COUNT(*) FROM testi').fetchone()[0]
+        print(f"📚 Testi condivisi: {testi} (eliminati {orfani} non più usati)")
+
+        if vacuum:
+            print("🗜️  VACUUM...")
+            conn.execute('VACUUM')
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {totale} righe migrate in {elapsed:.1f}s | database {prima / 1e6:.1f} MB → {dimensione(db_path) / 1e6:.1f} MB")
+    return totale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sposta i testi ripetuti nella tabella testi")
+    parser.add_argument("--db", default="instance/oremus.db", help="Percorso del database SQLite")
+    parser.add_argument("--lotto", type=int, default=1000, help="Righe per transazione")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Compatta il file alla fine (blocca il database per la durata)")
+    args = parser.parse_args()
+
+    migra(args.db, lotto=args.lotto, vacuum=args.vacuum)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from typing import Dict, Optional
 from pathlib import Path
 
 # Importa le classi dal lrgyParser
-from old.lrgyParser import LiturgiaManager, LodiParser, VespriParser, SantoParser
+from old.lrgyParser import Day, LiturgiaManager, LodiParser, VespriParser, SantoParser
 
 class LiturgiaDBManager:
     """Manager per salvare i dati liturgici in SQLite"""
@@ -379,18 +379,18 @@ class LiturgiaParserWithDB(LiturgiaManager):
         super().__init__(output_dir)
         self.db_manager = LiturgiaDBManager(db_path)
 
-    def save_json(self, data: Dict, filename: str) -> bool:
+    def save_json(self, data: Day, filename: str) -> bool:
         """Salva JSON e contemporaneamente nel database"""
         # Salva il JSON
         json_saved = super().save_json(data, filename)
 
-        # Salva nel database
+        # Salva nel database (questa versione lavora ancora sui dizionari del JSON)
         if json_saved:
-            db_saved = self.db_manager.save_liturgia_data(data)
+            db_saved = self.db_manager.save_liturgia_data(data.to_dict())
             if db_saved:
-                print(f"✅ Salvato in DB: {data.get('data_iso')}")
+                print(f"✅ Salvato in DB: {data.data_iso}")
             else:
-                print(f"⚠️  JSON salvato ma DB fallito per {data.get('data_iso')}")
+                print(f"⚠️  JSON salvato ma DB fallito per {data.data_iso}")
             return db_saved
 
         return False
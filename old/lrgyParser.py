@@ -1,12 +1,639 @@
 import time
+import gzip
+import hashlib
+import random
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import re
 import json
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    # Backend di estrazione opzionale, molto più veloce di html.parser
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+try:
+    # urllib3 decodifica le risposte brotli solo se il modulo è installato
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+}
+
+
+class TokenBucket:
+    """Rate limiter a token bucket condiviso tra i thread di download"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Blocca finché non sono disponibili `tokens` gettoni"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchError(Exception):
+    """Download fallito definitivamente (retry esauriti o errore non recuperabile)"""
+
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+
+class RetryPolicy:
+    """Retry con backoff esponenziale e jitter; rispetta Retry-After su 429/503"""
+
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 jitter: float = 0.5):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Converte l'header Retry-After (secondi o data HTTP) in secondi di attesa"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Attesa prima del tentativo successivo (attempt parte da 0), mai oltre max_delay"""
+        server_delay = self.parse_retry_after(retry_after)
+        if server_delay is not None:
+            # Un Retry-After di ore (o una data lontana) non deve bloccare un worker così a lungo
+            return min(self.max_delay, server_delay)
+        backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return backoff * (1 - self.jitter + random.random() * self.jitter)
+
+
+class CircuitBreaker:
+    """
+    Sospende tutti i download quando il tasso di errori sulle ultime
+    `window` richieste supera `failure_rate`, per `cooldown` secondi.
+    """
+
+    def __init__(self, window: int = 20, failure_rate: float = 0.5, min_requests: int = 10,
+                 cooldown: float = 60.0):
+        self.window = window
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.trips = 0
+        self._results = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocca il chiamante finché il circuito è aperto"""
+        while True:
+            with self._lock:
+                remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def record(self, success: bool):
+        with self._lock:
+            self._results.append(success)
+            if len(self._results) < self.min_requests:
+                return
+            failures = self._results.count(False)
+            requests = len(self._results)
+            if failures / requests >= self.failure_rate:
+                self._open_until = time.monotonic() + self.cooldown
+                self._results.clear()
+                self.trips += 1
+                print(f"⛔ Troppi errori ({failures}/{requests}): download sospesi per {self.cooldown:.0f}s")
+
+
+class FailedItems:
+    """Elenco persistente (JSON) dei download falliti, da riprovare in un'esecuzione successiva"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._items: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._items = {f"{i['data_iso']}|{i['ora']}": i for i in json.load(f)}
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Elenco fallimenti illeggibile ({path}): {e}")
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(self._items.values(), key=lambda i: (i['data_iso'], i['ora'])),
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def add(self, date_str: str, ora: str, url: str, reason: str):
+        with self._lock:
+            key = f"{date_str}|{ora}"
+            previous = self._items.get(key, {})
+            self._items[key] = {
+                "data_iso": date_str,
+                "ora": ora,
+                "url": url,
+                "errore": reason,
+                "tentativi": previous.get("tentativi", 0) + 1,
+                "ultimo_tentativo": datetime.now().isoformat(timespec='seconds'),
+            }
+            self._save()
+
+    def discard(self, date_str: str, ora: str):
+        with self._lock:
+            if self._items.pop(f"{date_str}|{ora}", None) is not None:
+                self._save()
+
+    def items(self) -> List[Dict]:
+        with self._lock:
+            return list(self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ImpronteStore:
+    """
+    Impronte persistenti (JSON) del testo delle ore già salvate: {data_iso: {ora: sha256}}
+
+    Le modifiche restano in memoria fino a save(), chiamato a fine piano.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._impronte: Dict[str, Dict[str, str]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._impronte = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Impronte illeggibili ({path}): {e}")
+
+    def get(self, date_str: str, ora: str) -> Optional[str]:
+        with self._lock:
+            return self._impronte.get(date_str, {}).get(ora)
+
+    def set(self, date_str: str, ora: str, impronta: str):
+        with self._lock:
+            self._impronte.setdefault(date_str, {})[ora] = impronta
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._impronte, f, sort_keys=True, indent=1)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+class ConnectionStats:
+    """Statistiche di riuso delle connessioni della sessione HTTP"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.connect_time = 0.0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self, elapsed: float):
+        with self._lock:
+            self.connections += 1
+            self.connect_time += elapsed
+
+    def summary(self) -> Dict:
+        """Richieste, connessioni aperte/riusate e tempo di handshake risparmiato (stima)"""
+        with self._lock:
+            reused = max(0, self.requests - self.connections)
+            avg_connect = self.connect_time / self.connections if self.connections else 0.0
+            return {
+                "richieste": self.requests,
+                "connessioni_aperte": self.connections,
+                "connessioni_riusate": reused,
+                "percentuale_riuso": round(100.0 * reused / self.requests, 1) if self.requests else 0.0,
+                "handshake_medio_ms": round(avg_connect * 1000, 1),
+                "handshake_risparmiato_s": round(reused * avg_connect, 2),
+            }
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter che misura il tempo di connessione (TCP + TLS) di ogni nuova connessione"""
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.stats
+        timed_pools = {}
+        for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items():
+            conn_cls = pool_cls.ConnectionCls
+
+            def connect(conn, _base=conn_cls):
+                started = time.perf_counter()
+                try:
+                    _base.connect(conn)
+                finally:
+                    stats.record_connect(time.perf_counter() - started)
+
+            timed_conn = type(f"Timed{conn_cls.__name__}", (conn_cls,), {"connect": connect})
+            timed_pools[scheme] = type(f"Timed{pool_cls.__name__}", (pool_cls,), {"ConnectionCls": timed_conn})
+        # Copia: il dizionario di default è condiviso a livello di modulo in urllib3
+        self.poolmanager.pool_classes_by_scheme = timed_pools
+
+
+class HtmlCache:
+    """
+    Cache su disco delle pagine HTML grezze.
+
+    I corpi sono salvati compressi e indirizzati per contenuto (sha256), quindi
+    pagine identiche occupano spazio una sola volta; un indice SQLite associa
+    URL e data alla pagina, con ETag/Last-Modified per la rivalidazione e
+    l'ultimo accesso per l'evizione LRU quando si supera max_bytes.
+
+    L'occupazione totale è tenuta in memoria e aggiornata a ogni scrittura;
+    l'ultimo accesso viene riscritto solo se più vecchio di INTERVALLO_ACCESSO
+    secondi, così le letture ripetute non costano una transazione ciascuna.
+    """
+
+    # Secondi oltre i quali un hit aggiorna l'ultimo accesso (granularità LRU)
+    INTERVALLO_ACCESSO = 60.0
+
+    def __init__(self, cache_dir: str = "cache", max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "pagine")
+        self.index_path = os.path.join(cache_dir, "indice.db")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        self._dimensione: Optional[int] = None
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._init_index()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _init_index(self):
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS pagine (
+                    url TEXT PRIMARY KEY,
+                    data_iso TEXT,
+                    hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_pagine_data_iso ON pagine(data_iso)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_pagine_accessed_at ON pagine(accessed_at)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blob_dir, content_hash[:2], f"{content_hash}.html.gz")
+
+    def get(self, url: str, touch: bool = True) -> Optional[Dict]:
+        """
+        Restituisce {'html', 'etag', 'last_modified'} della pagina in cache, None se assente
+
+        Con touch=False non aggiorna l'ultimo accesso (letture massive offline).
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    'SELECT hash, etag, last_modified, size, accessed_at FROM pagine WHERE url = ?', (url,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                try:
+                    with gzip.open(self._blob_path(row[0]), 'rt', encoding='utf-8') as f:
+                        html = f.read()
+                except OSError:
+                    # Blob mancante o corrotto: trattalo come assente
+                    self._dimensione_totale(conn)
+                    conn.execute('DELETE FROM pagine WHERE url = ?', (url,))
+                    self._remove_blob_if_unused(conn, row[0], row[3])
+                    conn.commit()
+                    self.misses += 1
+                    return None
+                now = time.time()
+                if touch and now - row[4] > self.INTERVALLO_ACCESSO:
+                    conn.execute('UPDATE pagine SET accessed_at = ? WHERE url = ?', (now, url))
+                    conn.commit()
+                self.hits += 1
+                return {"html": html, "etag": row[1], "last_modified": row[2]}
+            finally:
+                conn.close()
+
+    def put(self, url: str, html: str, date_str: Optional[str] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Salva (o aggiorna) la pagina e applica l'evizione LRU"""
+        body = html.encode('utf-8')
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(content_hash)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp_path, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            now = time.time()
+
+            conn = self._connect()
+            try:
+                self._dimensione_totale(conn)
+                old = conn.execute('SELECT hash, size FROM pagine WHERE url = ?', (url,)).fetchone()
+                if not conn.execute('SELECT 1 FROM pagine WHERE hash = ? LIMIT 1', (content_hash,)).fetchone():
+                    self._dimensione += size
+                conn.execute('''
+                    INSERT OR REPLACE INTO pagine
+                    (url, data_iso, hash, etag, last_modified, size, fetched_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (url, date_str, content_hash, etag, last_modified, size, now, now))
+                if old and old[0] != content_hash:
+                    self._remove_blob_if_unused(conn, old[0], old[1])
+                self._evict(conn)
+                conn.commit()
+            except Exception:
+                # Transazione annullata: il totale in memoria va ricalcolato
+                self._dimensione = None
+                raise
+            finally:
+                conn.close()
+
+    def list_range(self, start_iso: str, end_iso: str) -> Dict[str, str]:
+        """URL in cache con data compresa nell'intervallo: {url: data_iso}"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT url, data_iso FROM pagine WHERE data_iso >= ? AND data_iso <= ?',
+                (start_iso, end_iso)
+            ).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+
+    def touch(self, url: str):
+        """Registra una rivalidazione riuscita (304 Not Modified)"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                now = time.time()
+                conn.execute('UPDATE pagine SET fetched_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+                conn.commit()
+                self.revalidated += 1
+            finally:
+                conn.close()
+
+    def _remove_blob_if_unused(self, conn: sqlite3.Connection, content_hash: str, size: int):
+        if conn.execute('SELECT 1 FROM pagine WHERE hash = ? LIMIT 1', (content_hash,)).fetchone():
+            return
+        self._dimensione -= size
+        try:
+            os.remove(self._blob_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def _total_size(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM (SELECT hash, MAX(size) AS size FROM pagine GROUP BY hash)'
+        ).fetchone()
+        return row[0]
+
+    def _dimensione_totale(self, conn: sqlite3.Connection) -> int:
+        """Occupazione dei blob: calcolata dall'indice solo al primo uso, poi incrementale"""
+        if self._dimensione is None:
+            self._dimensione = self._total_size(conn)
+        return self._dimensione
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Rimuove le pagine usate meno di recente finché la cache supera max_bytes"""
+        if self._dimensione_totale(conn) <= self.max_bytes:
+            return
+        for url, content_hash, size in conn.execute(
+                'SELECT url, hash, size FROM pagine ORDER BY accessed_at ASC').fetchall():
+            if self._dimensione <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM pagine WHERE url = ?', (url,))
+            self._remove_blob_if_unused(conn, content_hash, size)
+
+    def summary(self) -> Dict:
+        return {"hit": self.hits, "miss": self.misses, "rivalidate": self.revalidated}
+
+
+# Tag il cui contenuto non è testo della pagina
+SKIP_TAGS = ("script", "style")
+_CHUNK_SIZE = 16 * 1024
+
+
+class _SelezioneTesto:
+    """
+    Selezione tra i marcatori dei nodi di testo di <body>, in ordine di documento,
+    con la semantica dell'estrattore originale: si parte dalla seconda occorrenza
+    di marker_start (la prima è nell'intestazione della pagina) e ci si ferma a
+    marker_end; se la seconda occorrenza manca, il testo va dall'inizio del body
+    fino a marker_end. Le righe consecutive ripetute vengono scartate.
+
+    Condivisa dagli estrattori in streaming e lxml, che differiscono solo nel
+    modo di produrre i nodi di testo.
+    """
+
+    def __init__(self, marker_start: str, marker_end: str):
+        self.marker_start = marker_start
+        self.marker_end = marker_end
+        self.done = False
+        self._count = 0
+        # Testi prima della seconda occorrenza del marcatore, usati se questa manca
+        self._prefix: Optional[List[str]] = []
+        self._prefix_closed = False
+        self._texts: List[str] = []
+
+    def testo(self, text: str):
+        if self.done:
+            return
+        text = text.strip()
+        if len(text) <= 1:
+            return
+
+        if self._prefix is not None:
+            if self.marker_start in text:
+                self._count += 1
+                if self._count == 2:
+                    self._prefix = None
+                    self._raccogli(text)
+                    return
+            if not self._prefix_closed:
+                if self.marker_end in text:
+                    self._prefix_closed = True
+                else:
+                    self._prefix.append(text)
+            return
+
+        self._raccogli(text)
+
+    def _raccogli(self, text: str):
+        if self.marker_end in text:
+            self.done = True
+            return
+        if not self._texts or self._texts[-1] != text:
+            self._texts.append(text)
+
+    def risultato(self) -> List[str]:
+        if self._prefix is None:
+            return self._texts
+        # Seconda occorrenza non trovata: testo dall'inizio fino a marker_end
+        result = []
+        for t in self._prefix:
+            if not result or result[-1] != t:
+                result.append(t)
+        return result
+
+
+class _TestoFiltratoParser(HTMLParser):
+    """
+    Parser a eventi usato da estrai_testo_filtrato.
+
+    Riproduce la semantica di soup.body.find_all(string=True): ogni nodo di
+    testo (o commento) dentro <body>, ripulito, lungo più di un carattere.
+    """
+
+    def __init__(self, marker_start: str, marker_end: str, skip_tags: Iterable[str]):
+        super().__init__(convert_charrefs=True)
+        self.skip_tags = frozenset(skip_tags)
+        self.selezione = _SelezioneTesto(marker_start, marker_end)
+        self._in_body = False
+        self._skip_depth = 0
+        self._buffer: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return self.selezione.done
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag == 'body':
+            self._in_body = True
+        elif tag in self.skip_tags:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag == 'body':
+            self._in_body = False
+        elif tag in self.skip_tags and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_body and not self._skip_depth:
+            self._buffer.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+        if self._in_body and not self._skip_depth:
+            self.selezione.testo(data)
+
+    def _flush(self):
+        if self._buffer:
+            text = ''.join(self._buffer)
+            self._buffer = []
+            self.selezione.testo(text)
+
+    def risultato(self) -> List[str]:
+        self._flush()
+        return self.selezione.risultato()
+
+
+# Backend di estrazione disponibili: "streaming" (default, solo libreria standard) e "lxml"
+EXTRACTION_BACKENDS = ("streaming", "lxml")
+
+
+def _iter_testi_lxml(element, skip_tags: frozenset) -> Iterator[str]:
+    """Nodi di testo in ordine di documento, come find_all(string=True)"""
+    if element.tag is etree.Comment:
+        if element.text:
+            yield element.text
+        return
+    if not isinstance(element.tag, str) or element.tag in skip_tags:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _iter_testi_lxml(child, skip_tags)
+        if child.tail:
+            yield child.tail
 
 
 class BaseLiturgiaParser:
@@ -45,14 +672,15 @@ class BaseLiturgiaParser:
         return ' '.join(unique)
 
     @staticmethod
-    def fetch_url(url: str, timeout: int = 10) -> Optional[str]:
-        """Recupera il contenuto HTML della pagina"""
+    def fetch_response(url: str, timeout: int = 10, session: Optional[requests.Session] = None,
+                       headers: Optional[Dict] = None) -> Optional[requests.Response]:
+        """Esegue la GET e restituisce la risposta se 200 o 304, altrimenti None"""
         try:
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            response = requests.get(url, headers=headers, timeout=timeout)
-            if response.status_code == 200:
+            client = session if session is not None else requests
+            response = client.get(url, headers={**DEFAULT_HEADERS, **(headers or {})}, timeout=timeout)
+            if response.status_code in (200, 304):
                 response.encoding = 'utf-8'
-                return response.text
+                return response
             print(f"Errore HTTP {response.status_code} per {url}")
             return None
         except Exception as e:
@@ -60,9 +688,72 @@ class BaseLiturgiaParser:
             return None
 
     @staticmethod
-    def estrai_testo_filtrato(html: str, marker_start: str, marker_end: str = "Condividi") -> List[str]:
-        """Estrae testo filtrato tra due marcatori"""
+    def fetch_url(url: str, timeout: int = 10, session: Optional[requests.Session] = None) -> Optional[str]:
+        """Recupera il contenuto HTML della pagina (usa la sessione se fornita)"""
+        response = BaseLiturgiaParser.fetch_response(url, timeout=timeout, session=session)
+        if response is None or response.status_code != 200:
+            return None
+        return response.text
+
+    @staticmethod
+    def estrai_testo_filtrato(html: str, marker_start: str, marker_end: str = "Condividi",
+                              skip_tags: Iterable[str] = SKIP_TAGS) -> List[str]:
+        """
+        Estrae testo filtrato tra due marcatori
+
+        Parser a eventi in streaming: non costruisce l'albero DOM, ignora il
+        contenuto dei tag in skip_tags, inizia a raccogliere dalla seconda
+        occorrenza di marker_start e smette di leggere la pagina appena
+        incontra marker_end.
+        """
+        parser = _TestoFiltratoParser(marker_start, marker_end, skip_tags)
+        for i in range(0, len(html), _CHUNK_SIZE):
+            parser.feed(html[i:i + _CHUNK_SIZE])
+            if parser.done:
+                break
+        else:
+            parser.close()
+        return parser.risultato()
+
+    @staticmethod
+    def estrai_testo_lxml(html: str, marker_start: str, marker_end: str = "Condividi",
+                          skip_tags: Iterable[str] = SKIP_TAGS) -> List[str]:
+        """
+        Come estrai_testo_filtrato, con il parser C di lxml al posto di html.parser
+
+        Stessa selezione dei testi (_SelezioneTesto) sui nodi di <body>:
+        dalla seconda occorrenza di marker_start a marker_end. Se lxml non è
+        installato o la pagina non si analizza ricade su estrai_testo_filtrato.
+        """
+        if lxml is None or not html:
+            return BaseLiturgiaParser.estrai_testo_filtrato(html, marker_start, marker_end, skip_tags)
+
+        try:
+            body = lxml.html.document_fromstring(html).find('body')
+        except (etree.ParserError, ValueError):
+            body = None
+        if body is None:
+            return BaseLiturgiaParser.estrai_testo_filtrato(html, marker_start, marker_end, skip_tags)
+
+        selezione = _SelezioneTesto(marker_start, marker_end)
+        for text in _iter_testi_lxml(body, frozenset(skip_tags)):
+            selezione.testo(text)
+            if selezione.done:
+                break
+        return selezione.risultato()
+
+    @staticmethod
+    def estrai_testo_filtrato_bs4(html: str, marker_start: str, marker_end: str = "Condividi",
+                                  skip_tags: Iterable[str] = SKIP_TAGS) -> List[str]:
+        """
+        Implementazione originale con BeautifulSoup, mantenuta come riferimento per le verifiche
+
+        Come gli altri estrattori scarta il contenuto dei tag in skip_tags,
+        così il confronto vale anche per le pagine con script tra i marcatori.
+        """
         soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup.body.find_all(list(skip_tags)):
+            tag.decompose()
         all_texts = [t.strip() for t in soup.body.find_all(string=True) if t.strip() and len(t.strip()) > 1]
 
         count = 0
@@ -90,204 +781,588 @@ class BaseLiturgiaParser:
         return result
 
 
-class LodiParser(BaseLiturgiaParser):
-    """Parser per Lodi Mattutine"""
+# ---------------------------------------------------------------------------
+# Record dei dati liturgici
+#
+# I parser producono questi record (con __slots__, senza un dizionario per
+# istanza né chiavi ripetute in ogni giorno) e LiturgiaDBManager li legge
+# direttamente; to_dict()/from_dict() servono solo al confine con il JSON e
+# producono esattamente la struttura dei file liturgia_YYYYMMDD.json.
+# I campi di testo sono Optional: from_dict lascia None le chiavi assenti dal
+# JSON, che nel database restano NULL come prima.
+# ---------------------------------------------------------------------------
+@dataclass(slots=True)
+class Versicolo:
+    versicolo: Optional[str] = ""
+    risposta: Optional[str] = ""
+
+    def to_dict(self) -> Dict:
+        return {"versicolo": self.versicolo, "risposta": self.risposta}
 
     @classmethod
-    def parse(cls, text: str) -> Dict:
-        data = {
-            "tipo": "lodi-mattutine",
-            "titolo": "",
-            "versicoli": [],
-            "gloria_al_padre": "",
-            "inno": "",
-            "antifone_e_salmi": [],
-            "lettura_breve": {},
-            "responsorio_breve": {},
-            "antifona_cantico_finale": "",
-            "cantico_finale": {},
-            "invocazioni": [],
-            "orazione": ""
+    def from_dict(cls, data: Dict) -> "Versicolo":
+        return cls(data.get("versicolo"), data.get("risposta"))
+
+
+@dataclass(slots=True)
+class AntifonaSalmo:
+    antifona_numero: Optional[str] = ""
+    antifona_testo: Optional[str] = ""
+    tipo: Optional[str] = ""
+    numero: Optional[str] = ""
+    titolo: Optional[str] = ""
+    contenuto: Optional[str] = ""
+
+    def to_dict(self) -> Dict:
+        return {
+            "antifona_numero": self.antifona_numero,
+            "antifona_testo": self.antifona_testo,
+            "tipo": self.tipo,
+            "numero": self.numero,
+            "titolo": self.titolo,
+            "contenuto": self.contenuto,
         }
 
-        titolo_match = re.search(r'(MARTEDI\'.*?SALTERIO)', text)
-        if titolo_match:
-            data["titolo"] = cls.clean_text(titolo_match.group(1))
-
-        versicoli = re.findall(r'V\.\s*\n\s*([^\n]+)\n\s*R\.\s*\n\s*([^\n]+)', text)
-        for v, r in versicoli[:1]:
-            data["versicoli"].append({
-                "versicolo": cls.clean_text(v),
-                "risposta": cls.clean_text(r)
-            })
-
-        gloria_match = re.search(r'Gloria al Padre[\s\S]*?nei secoli dei secoli\.\s*Amen\.?\s*(?:Alleluia\.)?', text,
-                                 re.IGNORECASE)
-        if gloria_match:
-            data["gloria_al_padre"] = cls.clean_text(gloria_match.group(0))
-
-        inno_match = re.search(r'INNO\s*\n(.*?)(?=\d+\s+ant\.)', text, re.DOTALL)
-        if inno_match:
-            data["inno"] = cls.clean_text(inno_match.group(1))
-
-        sezione = re.search(r'1\s+ant\..*?(?=LETTURA\s+BREVE)', text, re.DOTALL)
-        if sezione:
-            testo_sezione = sezione.group(0)
-            for num in ['1', '2', '3']:
-                pattern = rf'({num})\s+ant\.\s*\n\s*([^\n]+(?:\n[^\n]+)*?)\n+(SALMO|CANTICO)\s*([^\s]+(?:\s+[\d,:\-]+)*?)\s+([^\n]+)\n(.*?)\n{num}\s+ant\.'
-                match = re.search(pattern, testo_sezione, re.DOTALL)
-                if match:
-                    contenuto_raw = match.group(6)
-                    contenuto_match = re.search(r'\)\.?\s*(.*)', contenuto_raw, re.DOTALL)
-                    contenuto = contenuto_match.group(1) if contenuto_match else contenuto_raw
-                    contenuto_pulito = cls.clean_duplicate_lines(contenuto)
-                    data["antifone_e_salmi"].append({
-                        "antifona_numero": match.group(1),
-                        "antifona_testo": cls.clean_text(match.group(2)),
-                        "tipo": match.group(3),
-                        "numero": cls.clean_text(match.group(4)),
-                        "titolo": cls.clean_text(match.group(5)),
-                        "contenuto": contenuto_pulito
-                    })
-
-        lettura_match = re.search(r'LETTURA\s+BREVE\s*\n\s*([^\n]+)\n(.*?)(?=RESPONSORIO)', text, re.DOTALL)
-        if lettura_match:
-            data["lettura_breve"] = {
-                "riferimento": cls.clean_text(lettura_match.group(1)),
-                "contenuto": cls.clean_text(lettura_match.group(2))[:400]
-            }
-
-        responsorio_match = re.search(r'RESPONSORIO\s+BREVE\s*\n(.*?)(?=Ant\.\s+al\s+Ben\.)', text, re.DOTALL)
-        if responsorio_match:
-            data["responsorio_breve"] = {"contenuto": responsorio_match.group(1).strip()}
-
-        ant_match = re.search(r'Ant\.\s+al\s+Ben\.\s*\n\s*([^\n]+(?:\n[^\n]+)*?)\n\s*(?=CANTICO|INVOCAZIONI)', text)
-        if ant_match:
-            data["antifona_cantico_finale"] = cls.clean_text(ant_match.group(1))
-
-        cantico_match = re.search(r'CANTICO\s+DI\s+ZACCARIA\s*\n\s*(Lc[\s\d,:\-]+)\n(.*?)(?=Gloria al Padre)', text,
-                                  re.DOTALL)
-        if cantico_match:
-            linee = cantico_match.group(2).split('\n', 1)
-            contenuto = linee[1].strip() if len(linee) > 1 else cantico_match.group(2).strip()
-            data["cantico_finale"] = {
-                "riferimento": cls.clean_text(cantico_match.group(1)),
-                "contenuto": contenuto
-            }
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AntifonaSalmo":
+        return cls(data.get("antifona_numero"), data.get("antifona_testo"), data.get("tipo"),
+                   data.get("numero"), data.get("titolo"), data.get("contenuto"))
+
+
+@dataclass(slots=True)
+class Hour:
+    """Un'ora con salmodia (lodi o vespri); i campi mancanti restano vuoti"""
+
+    tipo: Optional[str]
+    # Chiave JSON delle preci: "invocazioni" (lodi) o "intercessioni" (vespri)
+    campo_preci: str
+    titolo: Optional[str] = ""
+    versicoli: List[Versicolo] = field(default_factory=list)
+    gloria_al_padre: Optional[str] = ""
+    inno: Optional[str] = ""
+    antifone_e_salmi: List[AntifonaSalmo] = field(default_factory=list)
+    lettura_breve: Dict = field(default_factory=dict)
+    responsorio_breve: Dict = field(default_factory=dict)
+    antifona_cantico_finale: Optional[str] = ""
+    cantico_finale: Dict = field(default_factory=dict)
+    preci: List[str] = field(default_factory=list)
+    orazione: Optional[str] = ""
+
+    def to_dict(self) -> Dict:
+        return {
+            "tipo": self.tipo,
+            "titolo": self.titolo,
+            "versicoli": [versicolo.to_dict() for versicolo in self.versicoli],
+            "gloria_al_padre": self.gloria_al_padre,
+            "inno": self.inno,
+            "antifone_e_salmi": [item.to_dict() for item in self.antifone_e_salmi],
+            "lettura_breve": self.lettura_breve,
+            "responsorio_breve": self.responsorio_breve,
+            "antifona_cantico_finale": self.antifona_cantico_finale,
+            "cantico_finale": self.cantico_finale,
+            self.campo_preci: self.preci,
+            "orazione": self.orazione,
+        }
 
-        invocazioni_match = re.search(r'INVOCAZIONI\s*\n(.*?)(?=Padre\s+nostro)', text, re.DOTALL)
-        if invocazioni_match:
-            inv_list = re.split(r'\n(?=(?:Re\s|Cristo|Signore|Concedici|Infondi|Fa))', invocazioni_match.group(1))
-            for inv in inv_list:
-                inv_pulita = cls.clean_text(inv)
-                if inv_pulita and len(inv_pulita) > 10:
-                    data["invocazioni"].append(inv_pulita)
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Hour":
+        campo_preci = "intercessioni" if "intercessioni" in data else "invocazioni"
+        return cls(
+            tipo=data.get("tipo"),
+            campo_preci=campo_preci,
+            titolo=data.get("titolo"),
+            versicoli=[Versicolo.from_dict(v) for v in data.get("versicoli") or []],
+            gloria_al_padre=data.get("gloria_al_padre"),
+            inno=data.get("inno"),
+            antifone_e_salmi=[AntifonaSalmo.from_dict(a) for a in data.get("antifone_e_salmi") or []],
+            lettura_breve=data.get("lettura_breve") or {},
+            responsorio_breve=data.get("responsorio_breve") or {},
+            antifona_cantico_finale=data.get("antifona_cantico_finale"),
+            cantico_finale=data.get("cantico_finale") or {},
+            preci=list(data.get(campo_preci) or []),
+            orazione=data.get("orazione"),
+        )
 
-        orazione_match = re.search(r'ORAZIONE\s*\n(.*?Amen\.)', text, re.DOTALL)
-        if orazione_match:
-            data["orazione"] = orazione_match.group(1).strip()
 
-        return data
+@dataclass(slots=True)
+class Santo:
+    nome: Optional[str] = ""
+    martirologio: Optional[str] = ""
 
+    def to_dict(self) -> Dict:
+        return {"nome": self.nome, "martirologio": self.martirologio}
 
-class VespriParser(BaseLiturgiaParser):
-    """Parser per Vespri"""
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Santo":
+        return cls(data.get("nome"), data.get("martirologio"))
+
+
+@dataclass(slots=True)
+class SantoDelGiorno:
+    giorno: Optional[str] = ""
+    santo_principale: Santo = field(default_factory=Santo)
+    altri_santi: List[Santo] = field(default_factory=list)
+    numero_santi_celebrati: int = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "giorno": self.giorno,
+            "santo_principale": self.santo_principale.to_dict(),
+            "altri_santi": [santo.to_dict() for santo in self.altri_santi],
+            "numero_santi_celebrati": self.numero_santi_celebrati,
+        }
 
     @classmethod
-    def parse(cls, text: str) -> Dict:
-        data = {
-            "tipo": "vespri",
-            "titolo": "",
-            "versicoli": [],
-            "gloria_al_padre": "",
-            "inno": "",
-            "antifone_e_salmi": [],
-            "lettura_breve": {},
-            "responsorio_breve": {},
-            "antifona_cantico_finale": "",
-            "cantico_finale": {},
-            "intercessioni": [],
-            "orazione": ""
+    def from_dict(cls, data: Dict) -> "SantoDelGiorno":
+        return cls(
+            giorno=data.get("giorno"),
+            santo_principale=Santo.from_dict(data.get("santo_principale") or {}),
+            altri_santi=[Santo.from_dict(s) for s in data.get("altri_santi") or []],
+            numero_santi_celebrati=data.get("numero_santi_celebrati", 0),
+        )
+
+
+@dataclass(slots=True)
+class Day:
+    """Un giorno liturgico; le ore non scaricate (o da non sovrascrivere) sono None"""
+
+    data: str
+    data_iso: str
+    giorno_settimana: str
+    lodi_mattutine: Optional[Hour] = None
+    vespri: Optional[Hour] = None
+    santo_del_giorno: Optional[SantoDelGiorno] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "data": self.data,
+            "data_iso": self.data_iso,
+            "giorno_settimana": self.giorno_settimana,
+            "lodi_mattutine": self.lodi_mattutine.to_dict() if self.lodi_mattutine else None,
+            "vespri": self.vespri.to_dict() if self.vespri else None,
+            "santo_del_giorno": self.santo_del_giorno.to_dict() if self.santo_del_giorno else None,
         }
 
-        titolo_match = re.search(r'(LUNEDI\'.*?SALTERIO)', text)
-        if titolo_match:
-            data["titolo"] = cls.clean_text(titolo_match.group(1))
-
-        versicoli = re.findall(r'V\.\s*\n\s*([^\n]+)\n\s*R\.\s*\n\s*([^\n]+)', text)
-        for v, r in versicoli[:1]:
-            data["versicoli"].append({
-                "versicolo": cls.clean_text(v),
-                "risposta": cls.clean_text(r)
-            })
-
-        gloria_match = re.search(r'Gloria al Padre[\s\S]*?nei secoli dei secoli\.\s*Amen\.?\s*(?:Alleluia\.)?', text,
-                                 re.IGNORECASE)
-        if gloria_match:
-            data["gloria_al_padre"] = cls.clean_text(gloria_match.group(0))
-
-        inno_match = re.search(r'INNO\s*\n(.*?)(?=\d+\s+ant\.)', text, re.DOTALL)
-        if inno_match:
-            data["inno"] = cls.clean_text(inno_match.group(1))
-
-        sezione = re.search(r'1\s+ant\..*?(?=LETTURA\s+BREVE)', text, re.DOTALL)
-        if sezione:
-            testo_sezione = sezione.group(0)
-            for num in ['1', '2', '3']:
-                pattern = rf'({num})\s+ant\.\s*\n\s*([^\n]+(?:\n[^\n]+)*?)\n+(SALMO|CANTICO)\s*([^\s]+(?:\s+[\d,:\-]+)*?)\s+([^\n]+)\n(.*?)\n{num}\s+ant\.'
-                match = re.search(pattern, testo_sezione, re.DOTALL)
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Day":
+        return cls(
+            data=data.get("data"),
+            data_iso=data.get("data_iso"),
+            giorno_settimana=data.get("giorno_settimana"),
+            lodi_mattutine=Hour.from_dict(data["lodi_mattutine"]) if data.get("lodi_mattutine") else None,
+            vespri=Hour.from_dict(data["vespri"]) if data.get("vespri") else None,
+            santo_del_giorno=(SantoDelGiorno.from_dict(data["santo_del_giorno"])
+                              if data.get("santo_del_giorno") else None),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Motore dichiarativo per le ore della Liturgia delle Ore
+#
+# Ogni ora è descritta da un OraSpec (intestazioni delle sezioni e campi da
+# estrarre). compila_spec() costruisce una sola volta, per spec, il pattern
+# combinato delle intestazioni e i pattern dei campi: una scansione del testo
+# individua tutte le sezioni e ogni campo viene poi estratto con un pattern
+# precompilato che parte dalla propria intestazione, invece di riscandire
+# l'intero testo dall'inizio con una re.search per sezione.
+# ---------------------------------------------------------------------------
+def _intestazione_re(intestazione: str) -> str:
+    """Pattern di un'intestazione: parole letterali separate da spazi qualsiasi"""
+    return r"\s+".join(re.escape(parola) for parola in intestazione.split())
+
+
+_SPAZI_RE = re.compile(r'\s*')
+
+
+class CampoRe:
+    """
+    Pattern di un campo composto da un prefisso (l'intestazione) e da un corpo
+    che arriva fino al terminatore, senza limiti di riga.
+
+    Una re.search del pattern intero riprova da ogni occorrenza del prefisso e,
+    se il terminatore manca, riscandisce ogni volta fino a fine testo (tempo
+    quadratico). Ma se il corpo fallisce dopo il primo prefisso valido non c'è
+    un terminatore più avanti, quindi fallirebbe anche dopo i successivi:
+    basta una sola .match dal primo prefisso.
+    """
+
+    __slots__ = ("prefisso", "pattern")
+
+    def __init__(self, prefisso: str, corpo: str, flags: int = 0):
+        self.prefisso = re.compile(prefisso, flags)
+        self.pattern = re.compile(prefisso + corpo, flags)
+
+    def search(self, text: str, pos: int = 0):
+        inizio = self.prefisso.search(text, pos)
+        return self.pattern.match(text, inizio.start()) if inizio else None
+
+
+class CampoRighe(CampoRe):
+    """
+    Pattern di un campo il cui corpo occupa righe consecutive dopo l'intestazione
+    (si ferma alla prima riga vuota).
+
+    Se il corpo fallisce dopo un'intestazione, fallisce anche dopo le intestazioni
+    successive dello stesso paragrafo: le righe che proverebbero sono un sottoinsieme
+    di quelle già provate. Quelle occorrenze vengono saltate senza riscandire.
+    """
+
+    def search(self, text: str, pos: int = 0):
+        paragrafo_escluso = -1
+        while True:
+            inizio = self.prefisso.search(text, pos)
+            if not inizio:
+                return None
+            pos = inizio.start() + 1
+            spazi = _SPAZI_RE.match(text, inizio.end()).end()
+            if spazi < paragrafo_escluso:
+                continue
+            match = self.pattern.match(text, inizio.start())
+            if match:
+                return match
+            if '\n' in text[inizio.end():spazi]:
+                paragrafo = text.find('\n\n', spazi)
+                paragrafo_escluso = len(text) if paragrafo == -1 else paragrafo
+
+
+class OraSpec:
+    """Descrizione dichiarativa di un'ora: intestazioni delle sezioni e campi estratti"""
+
+    # Intestazioni comuni a tutte le ore con salmodia (intestazione -> nome della sezione)
+    INTESTAZIONI_COMUNI = {
+        "INNO": "inno",
+        "1 ant.": "ant",
+        "2 ant.": "ant",
+        "3 ant.": "ant",
+        "LETTURA BREVE": "lettura",
+        "RESPONSORIO": "responsorio",
+        "ORAZIONE": "orazione",
+    }
+
+    # (campo di Hour, estrattore di OraParser), nell'ordine del JSON; se la sezione
+    # manca il campo resta vuoto
+    CAMPI = (
+        ("titolo", "_estrai_titolo"),
+        ("versicoli", "_estrai_versicoli"),
+        ("gloria_al_padre", "_estrai_gloria"),
+        ("inno", "_estrai_inno"),
+        ("antifone_e_salmi", "_estrai_salmodia"),
+        ("lettura_breve", "_estrai_lettura"),
+        ("responsorio_breve", "_estrai_responsorio"),
+        ("antifona_cantico_finale", "_estrai_antifona_cantico"),
+        ("cantico_finale", "_estrai_cantico"),
+        ("preci", "_estrai_preci"),
+        ("orazione", "_estrai_orazione"),
+    )
+
+    def __init__(self, tipo: str, titolo: str, antifona_cantico: str, cantico: str, preci: str,
+                 campo_preci: str, inizi_preci: Tuple[str, ...], max_lettura: Optional[int] = None,
+                 riferimento_cantico: str = r"Lc[\s\d,:\-]+"):
+        """
+        Args:
+            tipo: valore del campo "tipo" nel JSON
+            titolo: pattern del titolo del giorno (gruppo 1)
+            antifona_cantico: intestazione dell'antifona al cantico evangelico
+            cantico: intestazione del cantico evangelico
+            preci: intestazione delle preci (invocazioni/intercessioni)
+            campo_preci: chiave JSON delle preci (Hour.campo_preci)
+            inizi_preci: pattern con cui inizia ogni singola preghiera
+            max_lettura: lunghezza massima del testo della lettura breve
+            riferimento_cantico: pattern del riferimento biblico del cantico
+        """
+        self.tipo = tipo
+        self.titolo = titolo
+        self.antifona_cantico = antifona_cantico
+        self.cantico = cantico
+        self.preci = preci
+        self.campo_preci = campo_preci
+        self.inizi_preci = tuple(inizi_preci)
+        self.max_lettura = max_lettura
+        self.riferimento_cantico = riferimento_cantico
+
+    def intestazioni(self) -> Dict[str, str]:
+        intestazioni = dict(self.INTESTAZIONI_COMUNI)
+        intestazioni[self.antifona_cantico] = "antifona_cantico"
+        intestazioni[self.cantico] = "cantico"
+        intestazioni[self.preci] = "preci"
+        return intestazioni
+
+
+class SpecCompilata:
+    """Pattern precompilati di un OraSpec"""
+
+    def __init__(self, spec: OraSpec):
+        self.spec = spec
+        self.intestazioni = spec.intestazioni()
+        self.campi = spec.CAMPI
+        # Ogni alternativa inizia con un letterale: re salta in C le posizioni che non possono
+        # aprire una sezione, e tutte le sezioni dell'ora si trovano con la stessa scansione
+        self.sezioni_re = re.compile("|".join(
+            _intestazione_re(intestazione) + (r"\s*\n" if nome == "inno" else "")
+            for intestazione, nome in self.intestazioni.items()
+        ))
+
+        antifona_cantico = _intestazione_re(spec.antifona_cantico)
+        preci = _intestazione_re(spec.preci)
+        self.titolo_re = re.compile(spec.titolo)
+        self.responsorio_re = CampoRe(r'RESPONSORIO\s+BREVE\s*\n', rf'(.*?)(?={antifona_cantico})', re.DOTALL)
+        self.antifona_cantico_re = CampoRighe(
+            antifona_cantico, rf'\s*\n\s*([^\n]+(?:\n[^\n]+)*?)\n\s*(?=CANTICO|{preci})')
+        self.cantico_re = CampoRe(rf'{_intestazione_re(spec.cantico)}\s*\n\s*({spec.riferimento_cantico})\n',
+                                  r'(.*?)(?=Gloria al Padre)', re.DOTALL)
+        self.preci_re = CampoRe(rf'{preci}\s*\n', r'(.*?)(?=Padre\s+nostro)', re.DOTALL)
+        self.preci_split_re = re.compile(rf'\n(?=(?:{"|".join(spec.inizi_preci)}))')
+
+
+@lru_cache(maxsize=None)
+def compila_spec(spec: OraSpec) -> SpecCompilata:
+    """Compila (una volta sola per spec) i pattern di un'ora"""
+    return SpecCompilata(spec)
+
+
+_VERSICOLO_RE = re.compile(r'V\.\s*\n\s*([^\n]+)\n\s*R\.\s*\n\s*([^\n]+)')
+_GLORIA_RE = CampoRe(r'Gloria al Padre', r'[\s\S]*?nei secoli dei secoli\.\s*Amen\.?\s*(?:Alleluia\.)?', re.IGNORECASE)
+_INNO_RE = CampoRe(r'INNO\s*\n', r'(.*?)(?=\d+\s+ant\.)', re.DOTALL)
+# Il lookahead dopo SALMO|CANTICO non cambia i match: verifica subito che dopo la riga
+# ci sia ancora una chiusura "\nN ant.", invece di scoprirlo dopo aver provato ogni
+# scomposizione del numero del salmo (quadratico su righe lunghe di numeri)
+_ANTIFONE_RE = {
+    num: re.compile(
+        rf'({num})\s+ant\.\s*\n\s*([^\n]+(?:\n[^\n]+)*?)\n+(SALMO|CANTICO)(?=[^\n]*\n.*?\n{num}\s+ant\.)'
+        rf'\s*([^\s]+(?:\s+[\d,:\-]+)*?)\s+([^\n]+)\n(.*?)\n{num}\s+ant\.',
+        re.DOTALL
+    )
+    for num in ('1', '2', '3')
+}
+_CONTENUTO_SALMO_RE = re.compile(r'\)\.?\s*(.*)', re.DOTALL)
+_LETTURA_RE = CampoRe(r'LETTURA\s+BREVE\s*\n\s*([^\n]+)\n', r'(.*?)(?=RESPONSORIO)', re.DOTALL)
+_ORAZIONE_RE = CampoRe(r'ORAZIONE\s*\n', r'(.*?Amen\.)', re.DOTALL)
+
+
+class SezioniTesto:
+    """Posizioni delle intestazioni di sezione trovate con una sola scansione"""
+
+    __slots__ = ("text", "posizioni", "antifone")
+
+    def __init__(self, text: str, compilata: SpecCompilata):
+        self.text = text
+        # Inizio di ogni occorrenza di ogni intestazione, in ordine
+        self.posizioni: Dict[str, List[int]] = {}
+        # Occorrenze di "N ant." per numero: [(inizio, fine), ...]
+        self.antifone: Dict[str, List[Tuple[int, int]]] = {}
+        sezioni_re = compilata.sezioni_re
+        intestazioni = compilata.intestazioni
+        pos = 0
+        while True:
+            match = sezioni_re.search(text, pos)
+            if not match:
+                break
+            testo = match.group()
+            nome = intestazioni[" ".join(testo.split())]
+            if nome == "ant":
+                self.antifone.setdefault(testo[0], []).append(match.span())
+            self.posizioni.setdefault(nome, []).append(match.start())
+            # Si riparte dal carattere successivo, non dalla fine: intestazioni sovrapposte
+            # (es. "INVOCAZIONINNO") vengono trovate come farebbe una re.search dedicata
+            pos = match.start() + 1
+
+    def search(self, pattern, sezione: str):
+        """Cerca pattern partendo dalla prima occorrenza dell'intestazione `sezione`"""
+        posizioni = self.posizioni.get(sezione)
+        if not posizioni:
+            return None
+        return pattern.search(self.text, posizioni[0])
+
+    def prima_dopo(self, sezione: str, pos: int) -> Optional[int]:
+        """Prima occorrenza dell'intestazione `sezione` che inizia da pos in poi"""
+        return next((p for p in self.posizioni.get(sezione, ()) if p >= pos), None)
+
+
+class OraParser(BaseLiturgiaParser):
+    """Parser generico di un'ora: le sottoclassi dichiarano solo SPEC"""
+
+    SPEC: Optional[OraSpec] = None
+
+    @classmethod
+    def parse(cls, text: str) -> Hour:
+        compilata = compila_spec(cls.SPEC)
+        sezioni = SezioniTesto(text, compilata)
+        valori = {}
+        for campo, estrattore in compilata.campi:
+            valore = getattr(cls, estrattore)(sezioni, compilata)
+            if valore is not None:
+                valori[campo] = valore
+        return Hour(tipo=compilata.spec.tipo, campo_preci=compilata.spec.campo_preci, **valori)
+
+    # Titolo, versicolo e Gloria precedono le sezioni: la ricerca si ferma presto
+    @classmethod
+    def _estrai_titolo(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[str]:
+        titolo_match = compilata.titolo_re.search(sezioni.text)
+        return cls.clean_text(titolo_match.group(1)) if titolo_match else None
+
+    @classmethod
+    def _estrai_versicoli(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[List[Versicolo]]:
+        versicolo_match = _VERSICOLO_RE.search(sezioni.text)
+        if not versicolo_match:
+            return None
+        return [Versicolo(
+            versicolo=cls.clean_text(versicolo_match.group(1)),
+            risposta=cls.clean_text(versicolo_match.group(2))
+        )]
+
+    @classmethod
+    def _estrai_gloria(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[str]:
+        gloria_match = _GLORIA_RE.search(sezioni.text)
+        return cls.clean_text(gloria_match.group(0)) if gloria_match else None
+
+    @classmethod
+    def _estrai_inno(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[str]:
+        inno_match = sezioni.search(_INNO_RE, "inno")
+        return cls.clean_text(inno_match.group(1)) if inno_match else None
+
+    @classmethod
+    def _estrai_salmodia(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[List[AntifonaSalmo]]:
+        # La salmodia va dal primo "1 ant." a LETTURA BREVE
+        occorrenze_1 = sezioni.antifone.get('1')
+        if not occorrenze_1:
+            return None
+        inizio_sezione, fine_ant = occorrenze_1[0]
+        fine_sezione = sezioni.prima_dopo("lettura", fine_ant)
+        if fine_sezione is None:
+            return None
+        text = sezioni.text
+
+        antifone = []
+        for num, pattern in _ANTIFONE_RE.items():
+            occorrenze = [p for p in sezioni.antifone.get(num, ()) if inizio_sezione <= p[0] < fine_sezione]
+            # Fine delle chiusure possibili: "N ant." a inizio riga e interamente nella salmodia
+            chiusure = [fine for inizio, fine in occorrenze
+                        if inizio > 0 and text[inizio - 1] == '\n' and fine <= fine_sezione]
+            if not chiusure:
+                continue
+
+            # Ogni match termina su una chiusura valida: oltre l'ultima il pattern non deve
+            # cercare. Senza questo limite, una pagina senza la riga di chiusura faceva
+            # scandire il corpo fino a fine testo per ogni riga SALMO/CANTICO (tempo quadratico)
+            limite = chiusure[-1]
+            match = None
+            paragrafo_escluso = -1
+            for inizio, fine in occorrenze:
+                spazi = _SPAZI_RE.match(text, fine).end()
+                # Il testo dell'antifona occupa righe consecutive: un'occorrenza dentro al
+                # paragrafo già scandito senza successo da una precedente fallirebbe allo stesso modo
+                if spazi < paragrafo_escluso:
+                    continue
+                match = pattern.match(text, inizio, limite)
                 if match:
-                    contenuto_raw = match.group(6)
-                    contenuto_match = re.search(r'\)\.?\s*(.*)', contenuto_raw, re.DOTALL)
-                    contenuto = contenuto_match.group(1) if contenuto_match else contenuto_raw
-                    contenuto_pulito = cls.clean_duplicate_lines(contenuto)
-                    data["antifone_e_salmi"].append({
-                        "antifona_numero": match.group(1),
-                        "antifona_testo": cls.clean_text(match.group(2)),
-                        "tipo": match.group(3),
-                        "numero": cls.clean_text(match.group(4)),
-                        "titolo": cls.clean_text(match.group(5)),
-                        "contenuto": contenuto_pulito
-                    })
-
-        lettura_match = re.search(r'LETTURA\s+BREVE\s*\n\s*([^\n]+)\n(.*?)(?=RESPONSORIO)', text, re.DOTALL)
-        if lettura_match:
-            data["lettura_breve"] = {
-                "riferimento": cls.clean_text(lettura_match.group(1)),
-                "contenuto": cls.clean_text(lettura_match.group(2))
-            }
+                    break
+                if '\n' in text[fine:spazi]:
+                    paragrafo = text.find('\n\n', spazi, limite)
+                    paragrafo_escluso = limite if paragrafo == -1 else paragrafo
+
+            if match:
+                contenuto_raw = match.group(6)
+                contenuto_match = _CONTENUTO_SALMO_RE.search(contenuto_raw)
+                contenuto = contenuto_match.group(1) if contenuto_match else contenuto_raw
+                antifone.append(AntifonaSalmo(
+                    antifona_numero=match.group(1),
+                    antifona_testo=cls.clean_text(match.group(2)),
+                    tipo=match.group(3),
+                    numero=cls.clean_text(match.group(4)),
+                    titolo=cls.clean_text(match.group(5)),
+                    contenuto=cls.clean_duplicate_lines(contenuto)
+                ))
+        return antifone
 
-        responsorio_match = re.search(r'RESPONSORIO\s+BREVE\s*\n(.*?)(?=Ant\.\s+al\s+Magn\.)', text, re.DOTALL)
-        if responsorio_match:
-            data["responsorio_breve"] = {"contenuto": responsorio_match.group(1).strip()}
-
-        ant_match = re.search(r'Ant\.\s+al\s+Magn\.\s*\n\s*([^\n]+(?:\n[^\n]+)*?)\n\s*(?=CANTICO|INTERCESSIONI)', text)
-        if ant_match:
-            data["antifona_cantico_finale"] = cls.clean_text(ant_match.group(1))
-
-        cantico_match = re.search(r'CANTICO\s+DELLA\s+BEATA\s+VERGINE\s*\n\s*(Lc[\s\d,:\-]+)\n(.*?)(?=Gloria al Padre)',
-                                  text, re.DOTALL)
-        if cantico_match:
-            linee = cantico_match.group(2).split('\n', 1)
-            contenuto = linee[1].strip() if len(linee) > 1 else cantico_match.group(2).strip()
-            data["cantico_finale"] = {
-                "riferimento": cls.clean_text(cantico_match.group(1)),
-                "contenuto": contenuto
-            }
+    @classmethod
+    def _estrai_lettura(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[Dict]:
+        lettura_match = sezioni.search(_LETTURA_RE, "lettura")
+        if not lettura_match:
+            return None
+        return {
+            "riferimento": cls.clean_text(lettura_match.group(1)),
+            "contenuto": cls.clean_text(lettura_match.group(2))[:compilata.spec.max_lettura]
+        }
 
-        intercessioni_match = re.search(r'INTERCESSIONI\s*\n(.*?)(?=Padre\s+nostro)', text, re.DOTALL)
-        if intercessioni_match:
-            inter_list = re.split(r'\n(?=(?:Salva|Raccogli|Benedici|Mostra|Sii))', intercessioni_match.group(1))
-            for inter in inter_list:
-                inter_pulita = cls.clean_text(inter)
-                if inter_pulita and len(inter_pulita) > 10:
-                    data["intercessioni"].append(inter_pulita)
+    @classmethod
+    def _estrai_responsorio(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[Dict]:
+        responsorio_match = sezioni.search(compilata.responsorio_re, "responsorio")
+        return {"contenuto": responsorio_match.group(1).strip()} if responsorio_match else None
 
-        orazione_match = re.search(r'ORAZIONE\s*\n(.*?Amen\.)', text, re.DOTALL)
-        if orazione_match:
-            data["orazione"] = orazione_match.group(1).strip()
+    @classmethod
+    def _estrai_antifona_cantico(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[str]:
+        ant_match = sezioni.search(compilata.antifona_cantico_re, "antifona_cantico")
+        return cls.clean_text(ant_match.group(1)) if ant_match else None
+
+    @classmethod
+    def _estrai_cantico(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[Dict]:
+        cantico_match = sezioni.search(compilata.cantico_re, "cantico")
+        if not cantico_match:
+            return None
+        linee = cantico_match.group(2).split('\n', 1)
+        contenuto = linee[1].strip() if len(linee) > 1 else cantico_match.group(2).strip()
+        return {
+            "riferimento": cls.clean_text(cantico_match.group(1)),
+            "contenuto": contenuto
+        }
+
+    @classmethod
+    def _estrai_preci(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[List[str]]:
+        preci_match = sezioni.search(compilata.preci_re, "preci")
+        if not preci_match:
+            return None
+        preci = []
+        for voce in compilata.preci_split_re.split(preci_match.group(1)):
+            voce_pulita = cls.clean_text(voce)
+            if voce_pulita and len(voce_pulita) > 10:
+                preci.append(voce_pulita)
+        return preci
+
+    @classmethod
+    def _estrai_orazione(cls, sezioni: SezioniTesto, compilata: SpecCompilata) -> Optional[str]:
+        orazione_match = sezioni.search(_ORAZIONE_RE, "orazione")
+        return orazione_match.group(1).strip() if orazione_match else None
+
+
+LODI_SPEC = OraSpec(
+    tipo="lodi-mattutine",
+    titolo=r"(MARTEDI'.*?SALTERIO)",
+    antifona_cantico="Ant. al Ben.",
+    cantico="CANTICO DI ZACCARIA",
+    preci="INVOCAZIONI",
+    campo_preci="invocazioni",
+    inizi_preci=(r"Re\s", "Cristo", "Signore", "Concedici", "Infondi", "Fa"),
+    max_lettura=400,
+)
+
+VESPRI_SPEC = OraSpec(
+    tipo="vespri",
+    titolo=r"(LUNEDI'.*?SALTERIO)",
+    antifona_cantico="Ant. al Magn.",
+    cantico="CANTICO DELLA BEATA VERGINE",
+    preci="INTERCESSIONI",
+    campo_preci="intercessioni",
+    inizi_preci=("Salva", "Raccogli", "Benedici", "Mostra", "Sii"),
+)
+
+
+class LodiParser(OraParser):
+    """Parser per Lodi Mattutine"""
+
+    SPEC = LODI_SPEC
+
+
+class VespriParser(OraParser):
+    """Parser per Vespri"""
+
+    SPEC = VESPRI_SPEC
 
-        return data
+
+_SANTO_BLOCCHI_RE = re.compile(
+    r'\n(?=(?:San |Santa |Beato |Beata |Memoria facoltativa|Nel |A |Nel villaggio|Presso|Nell\'))')
+_SANTO_NOME_RE = re.compile(r'((?:San|Santa|Beato|Beata)\s+[^,\n]+)', re.IGNORECASE)
+_SANTO_JQUERY_RE = re.compile(r"jQuery\('img\[data-enlargeable\]'\).*?\}\);?\s*\}\);?\s*\}\);",
+                              re.DOTALL | re.IGNORECASE)
 
 
 class SantoParser(BaseLiturgiaParser):
@@ -316,34 +1391,26 @@ class SantoParser(BaseLiturgiaParser):
             return ""
 
     @classmethod
-    def parse(cls, text: str, data_str: str = None) -> Dict:
+    def parse(cls, text: str, data_str: str = None) -> SantoDelGiorno:
         """Parsifica il testo dei santi. data_str deve essere in formato YYYYMMDD"""
-        data = {
-            "giorno": "",
-            "santo_principale": {"nome": "", "martirologio": ""},
-            "altri_santi": [],
-            "numero_santi_celebrati": 0
-        }
+        data = SantoDelGiorno()
 
         if not text or len(text) < 10:
             return data
 
         # Usa la data passata per evitare ambiguità
         if data_str:
-            data["giorno"] = cls.converti_data(data_str)
+            data.giorno = cls.converti_data(data_str)
 
         # Dividi il testo per blocchi di santi
-        blocchi = re.split(
-            r'\n(?=(?:San |Santa |Beato |Beata |Memoria facoltativa|Nel |A |Nel villaggio|Presso|Nell\'))',
-            text
-        )
+        blocchi = _SANTO_BLOCCHI_RE.split(text)
 
         santo_trovato = False
         for blocco in blocchi:
             if not blocco.strip() or len(blocco) < 20:
                 continue
 
-            nome_match = re.search(r'((?:San|Santa|Beato|Beata)\s+[^,\n]+)', blocco, re.IGNORECASE)
+            nome_match = _SANTO_NOME_RE.search(blocco)
             if not nome_match:
                 continue
 
@@ -355,111 +1422,512 @@ class SantoParser(BaseLiturgiaParser):
             martirologio = martirologio.strip()
 
             if not santo_trovato:
-                data["santo_principale"]["nome"] = nome
-                martirologio_pulito = re.sub(
-                    r"jQuery\('img\[data-enlargeable\]'\).*?\}\);?\s*\}\);?\s*\}\);",
-                    '',
-                    martirologio,
-                    flags=re.DOTALL | re.IGNORECASE
-                )
-                data["santo_principale"]["martirologio"] = martirologio_pulito.strip()
+                martirologio_pulito = _SANTO_JQUERY_RE.sub('', martirologio)
+                data.santo_principale = Santo(nome, martirologio_pulito.strip())
                 santo_trovato = True
             else:
-                if (nome.lower() != data["santo_principale"]["nome"].lower() and nome and martirologio and len(
+                if (nome.lower() != data.santo_principale.nome.lower() and nome and martirologio and len(
                         martirologio) > 10):
-                    data["altri_santi"].append({"nome": nome, "martirologio": martirologio[:500]})
+                    data.altri_santi.append(Santo(nome, martirologio[:500]))
 
-        data["numero_santi_celebrati"] = 1 + len(data["altri_santi"])
+        data.numero_santi_celebrati = 1 + len(data.altri_santi)
         return data
 
 
+# Ora -> (parametro "ora" dell'URL, marcatore di inizio testo, parser)
+PAGINE_ORE = {
+    "lodi_mattutine": ("lodi-mattutine", "Lodi mattutine", LodiParser),
+    "vespri": ("vespri", "Vespri", VespriParser),
+}
+
+
+def estrai_testo_ora(ora: str, html: str, estrattore=None, backend: str = "streaming") -> List[str]:
+    """
+    Estrae le righe di testo della pagina HTML di un'ora (chiave di ORE)
+
+    Args:
+        estrattore: Funzione (html, marker_start, **kwargs) alternativa a
+            estrai_testo_filtrato, usata dalle verifiche e dai benchmark
+        backend: "streaming" o "lxml" (vedi EXTRACTION_BACKENDS)
+    """
+    if estrattore is None and backend == "lxml":
+        estrattore = BaseLiturgiaParser.estrai_testo_lxml
+    elif backend not in EXTRACTION_BACKENDS:
+        raise ValueError(f"Backend di estrazione sconosciuto: {backend}")
+
+    if ora == "santo_del_giorno":
+        # Lo script jQuery delimita il blocco che _pulisci_santo_testo deve scartare
+        texts = (estrattore or BaseLiturgiaParser.estrai_testo_filtrato)(
+            html, "Santo del Giorno", skip_tags=("style",))
+        return LiturgiaManager._pulisci_santo_testo(texts)
+
+    marker = PAGINE_ORE[ora][1]
+    return (estrattore or BaseLiturgiaParser.estrai_testo_filtrato)(html, marker)
+
+
+def impronta_testo(texts: List[str]) -> str:
+    """Impronta (sha256) del testo estratto di una pagina: cambia solo se cambia il contenuto"""
+    return hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+
+
+def parse_page(ora: str, html: str, date_str: str, backend: str = "streaming") -> Optional[Union[Hour, SantoDelGiorno]]:
+    """
+    Estrae il testo dalla pagina HTML di un'ora e lo parsifica.
+
+    Funzione di modulo (serializzabile) per poterla eseguire anche nei
+    processi worker della riparsificazione offline.
+    """
+    return parse_testo(ora, estrai_testo_ora(ora, html, backend=backend), date_str)
+
+
+def parse_page_impronta(ora: str, html: str, date_str: str, backend: str = "streaming",
+                        impronta_salvata: Optional[str] = None) -> Tuple[Optional[Union[Hour, SantoDelGiorno]], str]:
+    """
+    Come parse_page, restituendo anche l'impronta del testo estratto (vedi impronta_testo)
+
+    Se l'impronta coincide con impronta_salvata il testo non è cambiato: il
+    parsing viene saltato e l'ora restituita è None.
+    """
+    texts = estrai_testo_ora(ora, html, backend=backend)
+    impronta = impronta_testo(texts)
+    if impronta_salvata and impronta == impronta_salvata:
+        return None, impronta
+    return parse_testo(ora, texts, date_str), impronta
+
+
+def parse_testo(ora: str, texts: List[str], date_str: str) -> Optional[Union[Hour, SantoDelGiorno]]:
+    """Parsifica le righe di testo già estratte dalla pagina di un'ora"""
+    if ora == "santo_del_giorno":
+        return SantoParser.parse('\n'.join(texts), data_str=date_str)
+
+    if not texts:
+        return None
+    return PAGINE_ORE[ora][2].parse('\n'.join(texts))
+
+
+# Risultato di _fetch_ora per un'ora il cui testo non è cambiato dall'ultimo salvataggio
+ORA_INVARIATA = object()
+
+
 class LiturgiaManager(BaseLiturgiaParser):
     """Manager principale per la gestione della liturgia"""
 
     BASE_URL = "https://www.chiesacattolica.it"
 
-    def __init__(self, output_dir: str = "json"):
+    # Chiavi delle ore scaricate per ogni giorno
+    ORE = ("lodi_mattutine", "vespri", "santo_del_giorno")
+
+    def __init__(self, output_dir: str = "json", max_workers: int = 6, max_per_host: int = 3,
+                 requests_per_second: float = 2.0, burst: int = 3, pool_size: Optional[int] = None,
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 512 * 1024 * 1024,
+                 refresh_cache: bool = False, timeout: int = 10,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 extraction_backend: str = "streaming", skip_unchanged: bool = True):
+        """
+        Args:
+            output_dir: Cartella dei file JSON
+            max_workers: Thread di download usati dalla modalità concorrente
+            max_per_host: Richieste contemporanee massime verso lo stesso host
+            requests_per_second: Frequenza media massima delle richieste
+            burst: Richieste consentite a raffica prima del rate limit
+            pool_size: Connessioni keep-alive per host (default: max_per_host)
+            cache_dir: Cartella della cache HTML su disco (None = disattivata)
+            cache_max_bytes: Dimensione massima della cache prima dell'evizione LRU
+            refresh_cache: Se True rivalida le pagine in cache con ETag/If-Modified-Since
+            timeout: Timeout in secondi di ogni richiesta
+            retry_policy: Politica di retry (default: RetryPolicy())
+            circuit_breaker: Circuit breaker condiviso (default: CircuitBreaker())
+            extraction_backend: "streaming" oppure "lxml" (richiede il pacchetto lxml)
+            skip_unchanged: Se True le ore il cui testo estratto ha la stessa impronta
+                dell'ultimo salvataggio non vengono né parsificate né salvate
+        """
+        if extraction_backend not in EXTRACTION_BACKENDS:
+            raise ValueError(f"Backend di estrazione sconosciuto: {extraction_backend}")
+        if extraction_backend == "lxml" and lxml is None:
+            print("⚠️  lxml non installato: uso l'estrattore in streaming")
+            extraction_backend = "streaming"
         self.output_dir = output_dir
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max(1, max_per_host)
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        self.connection_stats = ConnectionStats()
+        self.session = self._create_session(pool_size or self.max_per_host)
+        self.cache = HtmlCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.refresh_cache = refresh_cache
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.extraction_backend = extraction_backend
         self._create_dirs()
+        self.failed_items = FailedItems(os.path.join(self.output_dir, "download_falliti.json"))
+        self.skip_unchanged = skip_unchanged
+        self.impronte = ImpronteStore(os.path.join(self.output_dir, "impronte_pagine.json"))
+        # Impronte delle ore parsificate, registrate solo dopo il salvataggio del giorno
+        self._impronte_nuove: Dict[Tuple[str, str], str] = {}
+        self._impronte_lock = threading.Lock()
+
+    def _create_session(self, pool_size: int) -> requests.Session:
+        """Sessione condivisa con connessioni keep-alive in pool e compressione gzip/brotli"""
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        adapter = PooledHTTPAdapter(self.connection_stats, pool_connections=4, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Chiude le connessioni del pool"""
+        self.session.close()
+
+    def print_connection_stats(self):
+        stats = self.connection_stats.summary()
+        print(f"🔌 Richieste HTTP: {stats['richieste']} | connessioni aperte: {stats['connessioni_aperte']} "
+              f"| riusate: {stats['connessioni_riusate']} ({stats['percentuale_riuso']}%) "
+              f"| handshake risparmiato ~{stats['handshake_risparmiato_s']}s")
+        if len(self.failed_items):
+            print(f"⚠️  Download falliti da riprovare: {len(self.failed_items)} ({self.failed_items.path})")
+        if self.cache:
+            cache_stats = self.cache.summary()
+            print(f"🗄️  Cache HTML: {cache_stats['hit']} hit | {cache_stats['miss']} miss "
+                  f"| {cache_stats['rivalidate']} rivalidate (304)")
 
     def _create_dirs(self):
         for d in [self.output_dir]:
             if not os.path.exists(d):
                 os.makedirs(d)
 
-    def _fetch_and_parse(self, date_str: str, ora: str, marker: str, parser_class) -> Optional[Dict]:
-        url = f"{self.BASE_URL}/la-liturgia-delle-ore/?data-liturgia={date_str}&ora={ora}"
-        html = self.fetch_url(url)
+    @contextmanager
+    def _host_slot(self, url: str):
+        """Limita il numero di richieste in corso verso lo stesso host"""
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        with slot:
+            yield
+
+    def _request(self, url: str, headers: Dict) -> requests.Response:
+        """
+        GET con retry/backoff e circuit breaker; restituisce risposte 200/304.
+
+        Raises:
+            FetchError: se i tentativi sono esauriti o l'errore non è recuperabile
+        """
+        attempt = 0
+        while True:
+            self.circuit_breaker.wait()
+            response = None
+            with self._host_slot(url):
+                self.rate_limiter.acquire()
+                self.connection_stats.record_request()
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                    reason = f"HTTP {response.status_code}"
+                except requests.RequestException as e:
+                    reason = f"{type(e).__name__}: {e}"
+
+            if response is not None and response.status_code in (200, 304):
+                self.circuit_breaker.record(True)
+                response.encoding = 'utf-8'
+                return response
+
+            self.circuit_breaker.record(False)
+            retryable = response is None or response.status_code in RetryPolicy.RETRY_STATUS
+            if not retryable or attempt >= self.retry_policy.max_retries:
+                print(f"Errore nel fetch di {url}: {reason}")
+                raise FetchError(url, reason)
+
+            retry_after = None
+            if response is not None and response.status_code in (429, 503):
+                retry_after = response.headers.get("Retry-After")
+            delay = self.retry_policy.delay(attempt, retry_after)
+            print(f"  ↻ {reason} per {url}, nuovo tentativo tra {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def _fetch(self, url: str, date_str: Optional[str] = None) -> Optional[str]:
+        """
+        Scarica una pagina rispettando il limite per host e il rate limit.
+
+        Con la cache attiva le pagine già scaricate non toccano la rete; con
+        refresh_cache vengono rivalidate tramite richiesta condizionale.
+
+        Raises:
+            FetchError: se il download fallisce e la pagina non è in cache
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached and not self.refresh_cache:
+            return cached["html"]
+
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = self._request(url, headers)
+        except FetchError:
+            if cached:
+                return cached["html"]
+            raise
+
+        if response.status_code == 304:
+            if not cached:
+                return None
+            self.cache.touch(url)
+            return cached["html"]
+
+        html = response.text
+        if self.cache:
+            self.cache.put(url, html, date_str=date_str,
+                           etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"))
+        return html
+
+    @classmethod
+    def page_url(cls, date_str: str, ora: str) -> str:
+        """URL della pagina di un'ora (chiave di ORE) per la data YYYYMMDD"""
+        if ora == "santo_del_giorno":
+            return f"{cls.BASE_URL}/santo-del-giorno/?data-liturgia={date_str}"
+        if ora not in PAGINE_ORE:
+            raise ValueError(f"Ora sconosciuta: {ora}")
+        return f"{cls.BASE_URL}/la-liturgia-delle-ore/?data-liturgia={date_str}&ora={PAGINE_ORE[ora][0]}"
+
+    def _fetch_ora(self, date_str: str, ora: str) -> Optional[Union[Hour, SantoDelGiorno]]:
+        """
+        Scarica e parsifica una singola ora (chiave di ORE) di un giorno.
+
+        I download falliti vengono registrati in failed_items per retry_failed().
+        Con skip_unchanged restituisce ORA_INVARIATA, senza parsificare, se il
+        testo estratto ha la stessa impronta dell'ultimo salvataggio: il valore
+        resta interno, i giorni lo ricevono già risolto da _componi_giorno.
+        """
+        url = self.page_url(date_str, ora)
+        try:
+            html = self._fetch(url, date_str)
+        except FetchError as e:
+            self.failed_items.add(date_str, ora, e.url, e.reason)
+            return None
+
+        self.failed_items.discard(date_str, ora)
         if not html:
             return None
-        texts = self.estrai_testo_filtrato(html, marker)
-        if not texts:
+
+        texts = estrai_testo_ora(ora, html, backend=self.extraction_backend)
+        if self.skip_unchanged:
+            impronta = impronta_testo(texts)
+            if impronta == self.impronta_salvata(date_str, ora):
+                return ORA_INVARIATA
+            with self._impronte_lock:
+                self._impronte_nuove[(date_str, ora)] = impronta
+        return parse_testo(ora, texts, date_str)
+
+    def impronta_salvata(self, date_str: str, ora: str) -> Optional[str]:
+        """Impronta del testo dell'ora salvata per ultima (None se il giorno va comunque salvato)"""
+        if not os.path.exists(os.path.join(self.output_dir, f"liturgia_{date_str}.json")):
             return None
-        testo_completo = '\n'.join(texts)
-        return parser_class.parse(testo_completo)
+        return self.impronte.get(date_str, ora)
+
+    def registra_impronte(self, date_str: str, impronte: Dict[str, str]):
+        """Registra le impronte {ora: sha256} delle ore appena salvate di un giorno"""
+        for ora, impronta in impronte.items():
+            self.impronte.set(date_str, ora, impronta)
+
+    def _conferma_impronte(self, data: Day):
+        """Registra le impronte delle ore salvate del giorno e scarta quelle delle ore vuote"""
+        date_str = data.data_iso
+        with self._impronte_lock:
+            nuove = {ora: self._impronte_nuove.pop((date_str, ora), None) for ora in self.ORE}
+        impronte = {ora: impronta for ora, impronta in nuove.items() if impronta and getattr(data, ora)}
+        if impronte:
+            self.registra_impronte(date_str, impronte)
 
-    def get_single_day(self, date_str: str) -> Dict:
-        """Recupera tutti i dati liturgici per una singola data (formato: YYYYMMDD)"""
+    @staticmethod
+    def _new_day(date_str: str) -> Optional[Day]:
+        """Crea il giorno senza ore, None se la data non è valida"""
         try:
             date_obj = datetime.strptime(date_str, "%Y%m%d")
-            formatted_date = date_obj.strftime("%d/%m/%Y")
         except ValueError:
             print(f"Errore: formato data non valido {date_str}")
-            return {}
-
-        data = {
-            "data": formatted_date,
-            "data_iso": date_str,
-            "giorno_settimana": date_obj.strftime("%A"),
-            "lodi_mattutine": None,
-            "vespri": None,
-            "santo_del_giorno": None
-        }
+            return None
 
-        print(f"\n📅 Elaborazione: {formatted_date}")
+        return Day(
+            data=date_obj.strftime("%d/%m/%Y"),
+            data_iso=date_str,
+            giorno_settimana=date_obj.strftime("%A"),
+        )
 
-        print("  → Scaricando lodi mattutine...")
-        data["lodi_mattutine"] = self._fetch_and_parse(date_str, "lodi-mattutine", "Lodi mattutine", LodiParser)
+    ETICHETTE_ORE = {
+        "lodi_mattutine": "lodi mattutine",
+        "vespri": "vespri",
+        "santo_del_giorno": "santo del giorno",
+    }
 
-        print("  → Scaricando vespri...")
-        data["vespri"] = self._fetch_and_parse(date_str, "vespri", "Vespri", VespriParser)
+    @staticmethod
+    def _componi_giorno(data: Day, risultati: Dict[str, object]) -> Tuple[Day, List[str]]:
+        """
+        Assegna al giorno le ore scaricate. Le ore invariate (ORA_INVARIATA)
+        restano None e vengono restituite a parte.
+        """
+        invariate = []
+        for ora, risultato in risultati.items():
+            if risultato is ORA_INVARIATA:
+                invariate.append(ora)
+                risultato = None
+            setattr(data, ora, risultato)
+        return data, invariate
+
+    def _scarica_giorno(self, date_str: str, ore: Optional[Iterable[str]] = None) -> Optional[Tuple[Day, List[str]]]:
+        """Scarica le ore di un giorno: (giorno, ore invariate), None se la data non è valida"""
+        data = self._new_day(date_str)
+        if not data:
+            return None
 
-        print("  → Scaricando santo del giorno...")
-        url_santo = f"{self.BASE_URL}/santo-del-giorno/?data-liturgia={date_str}"
-        html_santo = self.fetch_url(url_santo)
-        if html_santo:
-            texts = self.estrai_testo_filtrato(html_santo, "Santo del Giorno")
-            texts = self._pulisci_santo_testo(texts)
-            testo_santo = '\n'.join(texts)
-            data["santo_del_giorno"] = SantoParser.parse(testo_santo, data_str=date_str)
+        print(f"\n📅 Elaborazione: {data.data}")
+
+        risultati = {}
+        for ora in (ore if ore is not None else self.ORE):
+            print(f"  → Scaricando {self.ETICHETTE_ORE[ora]}...")
+            risultati[ora] = self._fetch_ora(date_str, ora)
+        return self._componi_giorno(data, risultati)
+
+    def get_single_day(self, date_str: str, ore: Optional[Iterable[str]] = None) -> Optional[Day]:
+        """
+        Recupera i dati liturgici per una singola data (formato: YYYYMMDD)
+
+        Args:
+            date_str: Data nel formato YYYYMMDD
+            ore: Sottoinsieme di ORE da scaricare (default: tutte); le altre restano None,
+                come quelle invariate dall'ultimo salvataggio con skip_unchanged
+        """
+        giorno = self._scarica_giorno(date_str, ore)
+        return giorno[0] if giorno else None
+
+    def _submit_day(self, executor: ThreadPoolExecutor, date_str: str, ore: Iterable[str]) -> Dict[str, Future]:
+        """Avvia in parallelo il download delle ore richieste di un giorno"""
+        return {ora: executor.submit(self._fetch_ora, date_str, ora) for ora in ore}
+
+    def _iter_days_concurrent(self, plan: List[Tuple[str, Tuple[str, ...]]]) -> Iterator[Tuple[Day, List[str]]]:
+        """Scarica i giorni in parallelo restituendoli nell'ordine delle date"""
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="liturgia") as executor:
+            pending = deque()
+            for date_str, ore in plan:
+                data = self._new_day(date_str)
+                if not data:
+                    continue
+                pending.append((data, self._submit_day(executor, date_str, ore)))
+                # Limita i giorni in volo per non accumulare risultati in memoria
+                while len(pending) >= window:
+                    yield self._collect_day(*pending.popleft())
+            while pending:
+                yield self._collect_day(*pending.popleft())
 
-        return data
+    @classmethod
+    def _collect_day(cls, data: Day, futures: Dict[str, Future]) -> Tuple[Day, List[str]]:
+        giorno = cls._componi_giorno(data, {ora: future.result() for ora, future in futures.items()})
+        print(f"📅 Elaborato: {data.data}")
+        return giorno
 
-    def get_date_range(self, start_date: str, end_date: str) -> List[Dict]:
-        """Recupera dati liturgici per un intervallo di date (formato: YYYYMMDD)"""
+    @staticmethod
+    def _iter_dates(start_date: str, end_date: str) -> Iterator[str]:
         try:
             start = datetime.strptime(start_date, "%Y%m%d")
             end = datetime.strptime(end_date, "%Y%m%d")
         except ValueError:
             print("Errore: formato data non valido. Usa YYYYMMDD")
-            return []
+            return
 
-        results = []
         current = start
         while current <= end:
-            date_str = current.strftime("%Y%m%d")
-            data = self.get_single_day(date_str)
-            if data:
-                results.append(data)
-                self.save_json(data, f"liturgia_{date_str}.json")
+            yield current.strftime("%Y%m%d")
             current += timedelta(days=1)
-            time.sleep(1)
-
-        return results
 
-    def save_json(self, data: Dict, filename: str) -> bool:
+    @classmethod
+    def _date_list(cls, start_date: str, end_date: str) -> List[str]:
+        return list(cls._iter_dates(start_date, end_date))
+
+    def iter_plan(self, plan: Iterable[Tuple[str, Tuple[str, ...]]], concurrent: bool = False) -> Iterator[Day]:
+        """
+        Scarica e salva i giorni di un piano [(YYYYMMDD, ore da scaricare), ...]
+        restituendo ogni giorno appena salvato.
+
+        Con concurrent=True le pagine vengono scaricate da un pool di thread
+        (le ore dello stesso giorno in parallelo), ma i giorni vengono
+        comunque salvati in ordine di data. Il piano viene consumato man mano:
+        la memoria non cresce con la lunghezza dell'intervallo.
+        """
+        if concurrent:
+            days = self._iter_days_concurrent(plan)
+        else:
+            days = (self._scarica_giorno(date_str, ore) for date_str, ore in plan)
+
+        invariati = 0
+        try:
+            for giorno in days:
+                if not giorno:
+                    continue
+                # Le ore invariate restano None: save_json conserva quelle già salvate
+                data, invariate = giorno
+                if invariate and not any(getattr(data, ora) for ora in self.ORE):
+                    invariati += 1
+                    print(f"⏭️  Invariato: {data.data}")
+                    continue
+                if self.save_json(data, f"liturgia_{data.data_iso}.json"):
+                    self._conferma_impronte(data)
+                yield data
+        finally:
+            self.impronte.save()
+
+        if invariati:
+            print(f"⏭️  Giorni invariati non riparsificati: {invariati}")
+        self.print_connection_stats()
+
+    def process_plan(self, plan: Iterable[Tuple[str, Tuple[str, ...]]], concurrent: bool = False) -> List[Day]:
+        """Come iter_plan, ma restituisce l'elenco dei giorni salvati a fine piano"""
+        return list(self.iter_plan(plan, concurrent=concurrent))
+
+    def iter_date_range(self, start_date: str, end_date: str, concurrent: bool = False) -> Iterator[Day]:
+        """Scarica e salva un intervallo di date (YYYYMMDD) restituendo ogni giorno appena salvato"""
+        plan = ((date_str, self.ORE) for date_str in self._iter_dates(start_date, end_date))
+        return self.iter_plan(plan, concurrent=concurrent)
+
+    def get_date_range(self, start_date: str, end_date: str, concurrent: bool = False) -> List[Day]:
+        """Recupera dati liturgici per un intervallo di date (formato: YYYYMMDD)"""
+        return list(self.iter_date_range(start_date, end_date, concurrent=concurrent))
+
+    def failed_plan(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Piano [(YYYYMMDD, ore)] dei download falliti registrati nelle esecuzioni precedenti"""
+        per_giorno: Dict[str, List[str]] = {}
+        for item in self.failed_items.items():
+            per_giorno.setdefault(item["data_iso"], []).append(item["ora"])
+        return [
+            (date_str, tuple(ora for ora in self.ORE if ora in ore))
+            for date_str, ore in sorted(per_giorno.items())
+        ]
+
+    def retry_failed(self, concurrent: bool = False) -> List[Day]:
+        """Riprova i download falliti; quelli riusciti vengono tolti dall'elenco"""
+        plan = self.failed_plan()
+        print(f"\n🔁 Retry di {len(self.failed_items)} download falliti su {len(plan)} giorni")
+        return self.process_plan(plan, concurrent=concurrent)
+
+    def save_json(self, data: Day, filename: str) -> bool:
         filepath = os.path.join(self.output_dir, filename)
+        data = data.to_dict()
         try:
+            # Giorno parziale: conserva le ore già presenti nel file esistente
+            if any(data.get(ora) is None for ora in self.ORE) and os.path.exists(filepath):
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+                data = {**data, **{ora: existing.get(ora) for ora in self.ORE if data.get(ora) is None}}
+
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             print(f"✅ Salvato: {filepath}")
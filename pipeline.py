@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Pipeline a stadi per i download massivi della liturgia
+
+    fetch (thread, I/O) → estrazione + parsing (processi, CPU) → scrittura (un solo writer)
+
+Gli stadi sono collegati da code limitate: se il parsing o la scrittura
+rallentano, i download si fermano invece di accumulare pagine in memoria.
+Ogni stadio si dimensiona in modo indipendente e i processi di parsing
+vengono riciclati ogni `pages_per_worker` pagine, perché gli alberi
+BeautifulSoup gonfiano la memoria residente dei worker.
+
+Uso:
+    python pipeline.py 20240101 20241231 [--fetch-workers 6] [--parse-workers N]
+                       [--queue-size 64] [--pages-per-worker 200] [--sync]
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Union
+
+from old.lrgyParser import (EXTRACTION_BACKENDS, Day, FetchError, Hour, LiturgiaManager, SantoDelGiorno,
+                            parse_page_impronta)
+from completo import LiturgiaParserWithDB
+
+_FINE = None
+
+
+class LiturgiaPipeline:
+    """Esegue un piano [(YYYYMMDD, ore)] con stadi fetch/parse/scrittura separati"""
+
+    def __init__(self, manager: LiturgiaManager, fetch_workers: int = 6, parse_workers: Optional[int] = None,
+                 queue_size: int = 64, pages_per_worker: int = 200):
+        """
+        Args:
+            manager: Manager usato per scaricare (cache, retry, rate limit) e salvare i giorni
+            fetch_workers: Thread di download
+            parse_workers: Processi di estrazione/parsing (default: tutti i core)
+            queue_size: Capienza delle code tra gli stadi (pagine)
+            pages_per_worker: Pagine elaborate da un processo prima di essere sostituito
+        """
+        self.manager = manager
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = max(1, queue_size)
+        self.pages_per_worker = max(1, pages_per_worker)
+
+    # ------------------------------------------------------------------
+    # Stadio 1: download
+    # ------------------------------------------------------------------
+    def _feed(self, plan: List[Tuple[str, Tuple[str, ...]]], work_q: queue.Queue):
+        for date_str, ore in plan:
+            for ora in ore:
+                work_q.put((date_str, ora))
+        for _ in range(self.fetch_workers):
+            work_q.put(_FINE)
+
+    def _fetch_worker(self, work_q: queue.Queue, html_q: queue.Queue):
+        while True:
+            item = work_q.get()
+            if item is _FINE:
+                return
+            date_str, ora = item
+            url = self.manager.page_url(date_str, ora)
+            html = None
+            try:
+                html = self.manager._fetch(url, date_str)
+                self.manager.failed_items.discard(date_str, ora)
+            except FetchError as e:
+                self.manager.failed_items.add(date_str, ora, e.url, e.reason)
+            except Exception as e:
+                # Qualsiasi errore (cache, rete...) conta come pagina fallita: gli stadi
+                # successivi attendono una voce per ogni pagina del piano
+                print(f"❌ Errore nel download di {ora} {date_str}: {e}")
+                self.manager.failed_items.add(date_str, ora, url, f"{type(e).__name__}: {e}")
+            finally:
+                html_q.put((date_str, ora, html))
+
+    # ------------------------------------------------------------------
+    # Stadio 2: estrazione + parsing nei processi
+    # ------------------------------------------------------------------
+    def _dispatch(self, executor: ProcessPoolExecutor, html_q: queue.Queue, parsed_q: queue.Queue,
+                  slots: threading.Semaphore, totale: int):
+        for _ in range(totale):
+            date_str, ora, html = html_q.get()
+            if not html:
+                parsed_q.put((date_str, ora, (None, None), False))
+                continue
+            # Limita le pagine in volo tra parsing e scrittura
+            slots.acquire()
+            # Con skip_unchanged il worker confronta l'impronta prima di parsificare
+            salvata = self.manager.impronta_salvata(date_str, ora) if self.manager.skip_unchanged else None
+            try:
+                future = executor.submit(parse_page_impronta, ora, html, date_str,
+                                         self.manager.extraction_backend, salvata)
+            except Exception as e:
+                # Pool rotto (es. worker terminato dal sistema) o chiuso: la pagina conta
+                # come non parsificata, run() attende comunque una voce per ogni pagina
+                print(f"❌ Errore nel parsing di {ora} {date_str}: {e}")
+                parsed_q.put((date_str, ora, (None, None), True))
+                continue
+            future.add_done_callback(
+                lambda f, d=date_str, o=ora: parsed_q.put((d, o, self._result(f, d, o), True)))
+
+    @staticmethod
+    def _result(future: Future, date_str: str,
+                ora: str) -> Tuple[Optional[Union[Hour, SantoDelGiorno]], Optional[str]]:
+        """(ora parsificata, impronta del testo estratto); l'ora è None se il testo è invariato"""
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"❌ Errore nel parsing di {ora} {date_str}: {e}")
+            return None, None
+
+    def _registra_impronta(self, date_str: str, ora: str, impronta: Optional[str]) -> bool:
+        """
+        Tiene l'impronta dell'ora da confermare dopo il salvataggio del giorno
+
+        Il confronto con l'impronta salvata ripete quello del worker, che per le
+        ore invariate ha già saltato il parsing.
+
+        Returns:
+            bool: True se l'ora è invariata dall'ultimo salvataggio (skip_unchanged) e non va riscritta
+        """
+        if not impronta:
+            return False
+        if self.manager.skip_unchanged and impronta == self.manager.impronta_salvata(date_str, ora):
+            return True
+        with self.manager._impronte_lock:
+            self.manager._impronte_nuove[(date_str, ora)] = impronta
+        return False
+
+    # ------------------------------------------------------------------
+    # Stadio 3: scrittura (unico writer, in ordine di data)
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _salva_impronte(self):
+        """Le impronte confermate vengono salvate anche se la pipeline si interrompe"""
+        try:
+            yield
+        finally:
+            self.manager.impronte.save()
+
+    def run(self, plan: List[Tuple[str, Tuple[str, ...]]]) -> int:
+        """
+        Esegue il piano e salva i giorni in ordine di data
+
+        Returns:
+            int: Numero di giorni salvati
+        """
+        plan = [(date_str, ore) for date_str, ore in plan if ore and LiturgiaManager._new_day(date_str)]
+        totale = sum(len(ore) for _, ore in plan)
+        if not totale:
+            return 0
+
+        work_q = queue.Queue(maxsize=self.queue_size)
+        html_q = queue.Queue(maxsize=self.queue_size)
+        parsed_q = queue.Queue()
+        slots = threading.Semaphore(self.queue_size)
+
+        ordine = [date_str for date_str, _ in plan]
+        attese = {date_str: len(ore) for date_str, ore in plan}
+        giorni: Dict[str, Day] = {}
+        invariate: Dict[str, int] = {}
+        prossimo = 0
+        salvati = 0
+        invariati = 0
+        started = time.perf_counter()
+
+        print(f"🚀 Pipeline: {len(plan)} giorni, {totale} pagine | fetch {self.fetch_workers} thread, "
+              f"parse {self.parse_workers} processi, code da {self.queue_size}")
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers,
+                                 max_tasks_per_child=self.pages_per_worker) as executor, self._salva_impronte():
+            threads = [threading.Thread(target=self._feed, args=(plan, work_q), daemon=True)]
+            threads += [
+                threading.Thread(target=self._fetch_worker, args=(work_q, html_q), daemon=True)
+                for _ in range(self.fetch_workers)
+            ]
+            threads.append(threading.Thread(
+                target=self._dispatch, args=(executor, html_q, parsed_q, slots, totale), daemon=True))
+            for t in threads:
+                t.start()
+
+            for _ in range(totale):
+                date_str, ora, (result, impronta), in_slot = parsed_q.get()
+                if in_slot:
+                    slots.release()
+                data = giorni.setdefault(date_str, LiturgiaManager._new_day(date_str))
+                # Le ore invariate restano None: save_json conserva quelle già salvate
+                if self._registra_impronta(date_str, ora, impronta):
+                    invariate[date_str] = invariate.get(date_str, 0) + 1
+                    result = None
+                setattr(data, ora, result)
+                attese[date_str] -= 1
+
+                # Salva i giorni completi rispettando l'ordine delle date
+                while prossimo < len(ordine) and attese[ordine[prossimo]] == 0:
+                    giorno = giorni.pop(ordine[prossimo])
+                    prossimo += 1
+                    if invariate.pop(giorno.data_iso, 0) and not any(
+                            getattr(giorno, o) for o in LiturgiaManager.ORE):
+                        invariati += 1
+                        continue
+                    if self.manager.save_json(giorno, f"liturgia_{giorno.data_iso}.json"):
+                        self.manager._conferma_impronte(giorno)
+                    salvati += 1
+
+            for t in threads:
+                t.join()
+
+        elapsed = time.perf_counter() - started
+        print(f"✅ Pipeline completata: {salvati} giorni in {elapsed:.1f}s ({totale / elapsed:.1f} pagine/s)")
+        if invariati:
+            print(f"⏭️  Giorni invariati non riscritti: {invariati}")
+        self.manager.print_connection_stats()
+        return salvati
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download massivo della liturgia con pipeline a stadi")
+    parser.add_argument("start_date", help="Data iniziale YYYYMMDD")
+    parser.add_argument("end_date", help="Data finale YYYYMMDD")
+    parser.add_argument("--fetch-workers", type=int, default=6, help="Thread di download")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Processi di parsing (default: tutti i core)")
+    parser.add_argument("--queue-size", type=int, default=64, help="Capienza delle code tra gli stadi")
+    parser.add_argument("--pages-per-worker", type=int, default=200,
+                        help="Pagine per processo di parsing prima del riciclo")
+    parser.add_argument("--sync", action="store_true", help="Scarica solo giorni/ore mancanti")
+    parser.add_argument("--cache-dir", default="cache", help="Cartella della cache HTML")
+    parser.add_argument("--db", default="instance/oremus.db", help="Percorso del database SQLite")
+    parser.add_argument("--backend", choices=EXTRACTION_BACKENDS, default="streaming",
+                        help="Backend di estrazione del testo")
+    args = parser.parse_args()
+
+    manager = LiturgiaParserWithDB(db_path=args.db, cache_dir=args.cache_dir,
+                                   max_per_host=args.fetch_workers, pool_size=args.fetch_workers,
+                                   extraction_backend=args.backend)
+    if args.sync:
+        # Nessuna cancellazione preventiva: le ore vengono sostituite solo se il salvataggio riesce
+        plan = manager.plan_sync(args.start_date, args.end_date)
+    else:
+        plan = [(date_str, manager.ORE) for date_str in manager._date_list(args.start_date, args.end_date)]
+
+    pipeline = LiturgiaPipeline(manager, fetch_workers=args.fetch_workers, parse_workers=args.parse_workers,
+                                queue_size=args.queue_size, pages_per_worker=args.pages_per_worker)
+    try:
+        pipeline.run(plan)
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Profilo per sezione dell'estrazione e del parsing delle pagine della liturgia
+
+Strumenta temporaneamente il modulo dei parser (pattern *_RE di modulo e
+delle spec compilate, estrattori dei campi di OraParser, estrazione del
+testo, clean_text...) ed elabora le pagine di un corpus registrando per
+ogni sezione chiamate, match/miss, tempo totale e tempo proprio (al netto
+delle sezioni annidate).
+
+Stampa una tabella ordinata per tempo proprio e, con --flamegraph, scrive
+le pile nel formato "folded" (una riga "a;b;c microsecondi") letto da
+flamegraph.pl, speedscope e inferno.
+
+Uso:
+    python profile_parser.py [--dir fixtures/pagine] [--cache-dir cache --start 20250101 --end 20251231]
+                             [--backend streaming|lxml|bs4] [--repeat 3] [--top 30] [--flamegraph parser.folded]
+"""
+import argparse
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from old import lrgyParser
+from old.lrgyParser import (BaseLiturgiaParser, CampoRe, LiturgiaManager, OraParser, OraSpec, PAGINE_ORE,
+                            SezioniTesto, compila_spec, estrai_testo_ora, lxml, parse_testo)
+from benchmark import CORPUS_DIR
+from verify_extractor import pagine_da_cache, pagine_da_cartella
+
+
+def _trovato(risultato, args) -> bool:
+    return risultato is not None
+
+
+def _sempre(risultato, args) -> bool:
+    return True
+
+
+# Metodo dei pattern -> esito (match o miss) della chiamata
+_ESITI_PATTERN = {
+    "search": _trovato,
+    "match": _trovato,
+    "fullmatch": _trovato,
+    "split": lambda risultato, args: len(risultato) > 1,
+    "sub": lambda risultato, args: risultato != args[1],
+    "findall": lambda risultato, args: bool(risultato),
+}
+
+
+class Profilo:
+    """Tempi e conteggi per sezione raccolti dalle chiamate strumentate"""
+
+    def __init__(self):
+        # nome -> [chiamate, match, miss, tempo totale, tempo proprio]
+        self.sezioni: Dict[str, List] = {}
+        # "a;b;c" -> tempo proprio della pila
+        self.pile: Dict[str, float] = {}
+        self._pila: List[str] = []
+        self._figli: List[float] = []
+
+    def chiama(self, nome: str, funzione: Callable, args: tuple, kwargs: Dict,
+               esito: Callable = lambda risultato, args: bool(risultato)):
+        """Esegue funzione(*args, **kwargs) come sezione `nome` annidata in quella corrente"""
+        self._pila.append(nome)
+        self._figli.append(0.0)
+        started = time.perf_counter()
+        try:
+            risultato = funzione(*args, **kwargs)
+        finally:
+            totale = time.perf_counter() - started
+            proprio = totale - self._figli.pop()
+            pila = ";".join(self._pila)
+            self._pila.pop()
+            if self._figli:
+                self._figli[-1] += totale
+            self.pile[pila] = self.pile.get(pila, 0.0) + proprio
+            voce = self.sezioni.setdefault(nome, [0, 0, 0, 0.0, 0.0])
+            voce[0] += 1
+            voce[3] += totale
+            voce[4] += proprio
+        voce[1 if esito(risultato, args) else 2] += 1
+        return risultato
+
+    def tabella(self) -> List[Dict]:
+        """Sezioni ordinate per tempo proprio decrescente"""
+        totale = sum(self.pile.values()) or 1.0
+        righe = [{
+            "sezione": nome,
+            "chiamate": chiamate,
+            "match": match,
+            "miss": miss,
+            "totale_ms": tempo * 1000,
+            "proprio_ms": proprio * 1000,
+            "percentuale": proprio / totale * 100,
+            "us_chiamata": tempo / chiamate * 1e6,
+        } for nome, (chiamate, match, miss, tempo, proprio) in self.sezioni.items()]
+        return sorted(righe, key=lambda r: r["proprio_ms"], reverse=True)
+
+    def scrivi_folded(self, path: str):
+        """Pile nel formato folded dei flamegraph (tempo proprio in microsecondi)"""
+        with open(path, "w", encoding="utf-8") as f:
+            for pila, secondi in sorted(self.pile.items()):
+                microsecondi = round(secondi * 1e6)
+                if microsecondi:
+                    f.write(f"{pila} {microsecondi}\n")
+
+
+class _PatternProfilato:
+    """Sostituto di un pattern (re.Pattern o CampoRe) che misura search/match/split/sub"""
+
+    __slots__ = ("_profilo", "_nome", "_pattern")
+
+    def __init__(self, profilo: Profilo, nome: str, pattern):
+        self._profilo = profilo
+        self._nome = nome
+        self._pattern = pattern
+
+    def __getattr__(self, attributo: str):
+        valore = getattr(self._pattern, attributo)
+        esito = _ESITI_PATTERN.get(attributo)
+        if esito is None or not callable(valore):
+            return valore
+        return lambda *args, **kwargs: self._profilo.chiama(self._nome, valore, args, kwargs, esito)
+
+
+def _avvolgi_metodo(profilo: Profilo, classe: type, attributo: str, nome: str,
+                    esito: Callable = lambda risultato, args: bool(risultato)):
+    """Sostituisce un metodo statico/di classe/di istanza con la versione misurata"""
+    originale = classe.__dict__[attributo]
+    if isinstance(originale, staticmethod):
+        funzione = originale.__func__
+        sostituto = staticmethod(lambda *a, **k: profilo.chiama(nome, funzione, a, k, esito))
+    elif isinstance(originale, classmethod):
+        funzione = originale.__func__
+        sostituto = classmethod(lambda cls, *a, **k: profilo.chiama(nome, funzione, (cls,) + a, k, esito))
+    else:
+        sostituto = lambda *a, **k: profilo.chiama(nome, originale, a, k, esito)
+    setattr(classe, attributo, sostituto)
+    return classe, attributo, originale
+
+
+@contextmanager
+def strumenta(profilo: Profilo):
+    """Installa le misure nel modulo dei parser per la durata del blocco e poi le rimuove"""
+    ripristini: List[Tuple[object, str, object]] = []
+
+    def sostituisci(oggetto, attributo: str, valore):
+        ripristini.append((oggetto, attributo, getattr(oggetto, attributo)))
+        setattr(oggetto, attributo, valore)
+
+    try:
+        # Pattern di modulo: i parser li leggono come variabili globali a ogni chiamata
+        for nome, valore in list(vars(lrgyParser).items()):
+            if not nome.endswith("_RE"):
+                continue
+            if isinstance(valore, (re.Pattern, CampoRe)):
+                sostituisci(lrgyParser, nome, _PatternProfilato(profilo, nome, valore))
+            elif isinstance(valore, dict):
+                sostituisci(lrgyParser, nome, {
+                    chiave: _PatternProfilato(profilo, f"{nome}[{chiave}]", pattern)
+                    for chiave, pattern in valore.items()
+                })
+
+        # Pattern delle spec compilate (in cache: le stesse istanze usate dai parser)
+        for ora, (_, _, parser) in PAGINE_ORE.items():
+            compilata = compila_spec(parser.SPEC)
+            for attributo, valore in list(vars(compilata).items()):
+                if isinstance(valore, (re.Pattern, CampoRe)):
+                    sostituisci(compilata, attributo, _PatternProfilato(profilo, f"{ora}.{attributo}", valore))
+
+        # Estrattori dei campi e fasi comuni
+        metodi = [(OraParser, estrattore, estrattore) for _, estrattore in OraSpec.CAMPI]
+        metodi += [
+            (BaseLiturgiaParser, "clean_text", "clean_text"),
+            (BaseLiturgiaParser, "clean_duplicate_lines", "clean_duplicate_lines"),
+            (BaseLiturgiaParser, "estrai_testo_filtrato", "estrazione:streaming"),
+            (BaseLiturgiaParser, "estrai_testo_lxml", "estrazione:lxml"),
+            (BaseLiturgiaParser, "estrai_testo_filtrato_bs4", "estrazione:bs4"),
+            (LiturgiaManager, "_pulisci_santo_testo", "pulizia_santo"),
+        ]
+        for classe, attributo, nome in metodi:
+            ripristini.append(_avvolgi_metodo(profilo, classe, attributo, nome))
+        ripristini.append(_avvolgi_metodo(profilo, SezioniTesto, "__init__", "scansione_sezioni", _sempre))
+        yield profilo
+    finally:
+        for oggetto, attributo, originale in reversed(ripristini):
+            setattr(oggetto, attributo, originale)
+
+
+def _data_pagina(nome: str) -> str:
+    """YYYYMMDD dal nome del file del corpus o dall'URL della cache (serve al parser del santo)"""
+    data = re.search(r"\d{8}", nome)
+    return data.group() if data else ""
+
+
+def profila(pagine: Iterable[Tuple[str, str, str]], backend: str = "streaming", repeat: int = 1) -> Profilo:
+    """Estrae e parsifica ogni pagina `repeat` volte con le misure installate"""
+    pagine = [(ora, html, _data_pagina(nome)) for nome, ora, html in pagine]
+
+    profilo = Profilo()
+    with strumenta(profilo):
+        # Letto dopo strumenta() per usare la versione misurata
+        estrattore = BaseLiturgiaParser.estrai_testo_filtrato_bs4 if backend == "bs4" else None
+        opzioni = {"estrattore": estrattore, "backend": "streaming" if backend == "bs4" else backend}
+
+        def elabora(ora: str, html: str, date_str: str):
+            texts = profilo.chiama("estrazione", estrai_testo_ora, (ora, html), opzioni)
+            return profilo.chiama(f"parse:{ora}", parse_testo, (ora, texts, date_str), {})
+
+        for _ in range(repeat):
+            for ora, html, date_str in pagine:
+                profilo.chiama(f"pagina:{ora}", elabora, (ora, html, date_str), {})
+    return profilo
+
+
+def stampa(profilo: Profilo, top: int = 30):
+    righe = profilo.tabella()
+    print(f"{'sezione':40} {'chiamate':>9} {'match':>8} {'miss':>8} {'totale ms':>11} "
+          f"{'proprio ms':>11} {'%':>6} {'µs/chiamata':>12}")
+    for riga in righe[:top]:
+        print(f"{riga['sezione']:40} {riga['chiamate']:9d} {riga['match']:8d} {riga['miss']:8d} "
+              f"{riga['totale_ms']:11.2f} {riga['proprio_ms']:11.2f} {riga['percentuale']:6.1f} "
+              f"{riga['us_chiamata']:12.1f}")
+    if len(righe) > top:
+        print(f"... altre {len(righe) - top} sezioni")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profilo per sezione dell'estrazione e del parsing")
+    parser.add_argument("--dir", default=CORPUS_DIR if os.path.isdir(CORPUS_DIR) else None,
+                        help=f"Cartella del corpus (<dir>/<ora>/*.html), predefinita {CORPUS_DIR} se esiste")
+    parser.add_argument("--cache-dir", help="Cache HTML di LiturgiaManager")
+    parser.add_argument("--start", default="19000101", help="Prima data della cache (YYYYMMDD)")
+    parser.add_argument("--end", default="21001231", help="Ultima data della cache (YYYYMMDD)")
+    parser.add_argument("--backend", choices=("streaming", "lxml", "bs4"), default="streaming",
+                        help="Estrattore del testo")
+    parser.add_argument("--repeat", type=int, default=1, help="Passate sul corpus")
+    parser.add_argument("--top", type=int, default=30, help="Righe della tabella")
+    parser.add_argument("--flamegraph", metavar="FILE", help="Scrive le pile in formato folded")
+    args = parser.parse_args()
+
+    if args.backend == "lxml" and lxml is None:
+        parser.error("lxml non installato")
+    pagine = []
+    if args.dir:
+        pagine += list(pagine_da_cartella(args.dir))
+    if args.cache_dir:
+        pagine += list(pagine_da_cache(args.cache_dir, args.start, args.end))
+    if not pagine:
+        parser.error("nessuna pagina: indicare --dir o --cache-dir")
+
+    print(f"🔬 Profilo di {len(pagine)} pagine x {args.repeat} (estrattore {args.backend})\n")
+    started = time.perf_counter()
+    profilo = profila(pagine, backend=args.backend, repeat=args.repeat)
+    durata = time.perf_counter() - started
+    stampa(profilo, top=args.top)
+    print(f"\n⏱️  {len(pagine) * args.repeat / durata:.1f} pagine/s con le misure attive")
+
+    if args.flamegraph:
+        profilo.scrivi_folded(args.flamegraph)
+        print(f"🔥 Pile salvate in {args.flamegraph}")
+
+
+if __name__ == "__main__":
+    main()
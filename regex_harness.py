@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Harness delle prestazioni dei pattern dei parser
+
+Esegue ogni pattern dei parser (e il parse completo di ogni ora) sulle
+pagine reali del corpus e su input patologici generati (sezioni senza
+chiusura, intestazioni ripetute, righe senza terminatore...), ciascun
+pattern in un processo separato con un budget di tempo per input.
+
+Un pattern che sfora il budget viene interrotto e il programma termina
+con codice 1: un backtracking catastrofico fa fallire la verifica invece
+di bloccare un worker dello scraping.
+
+Uso:
+    python regex_harness.py [--dir fixtures/pagine] [--cache-dir cache --start 20250101 --end 20251231]
+                            [--budget 0.5] [--dimensione 100000] [--solo antifone]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from old import lrgyParser
+from old.lrgyParser import CampoRe, PAGINE_ORE, SantoParser, compila_spec, estrai_testo_ora
+from benchmark import CORPUS_DIR
+from verify_extractor import pagine_da_cache, pagine_da_cartella
+
+# Pattern usati solo ancorati alle occorrenze trovate da SezioniTesto e limitati alla
+# loro ultima chiusura: una re.search libera non è il loro uso, li copre parse:<ora>
+SOLO_ANCORATI = {"_ANTIFONE_RE"}
+
+
+def registro_pattern() -> Dict[str, Callable[[str], object]]:
+    """
+    Returns:
+        dict: {nome: funzione(testo)} per ogni pattern dei parser e per il parse di ogni ora
+    """
+    registro = {}
+    for nome, valore in sorted(vars(lrgyParser).items()):
+        if not nome.endswith("_RE") or nome in SOLO_ANCORATI:
+            continue
+        if isinstance(valore, (re.Pattern, CampoRe)):
+            registro[nome] = valore.search
+        elif isinstance(valore, dict):
+            for chiave, pattern in valore.items():
+                registro[f"{nome}[{chiave}]"] = pattern.search
+
+    for ora, (_, _, parser) in PAGINE_ORE.items():
+        compilata = compila_spec(parser.SPEC)
+        for attributo, valore in sorted(vars(compilata).items()):
+            if isinstance(valore, (re.Pattern, CampoRe)):
+                registro[f"{ora}.{attributo}"] = valore.search
+        registro[f"parse:{ora}"] = parser.parse
+    registro["parse:santo_del_giorno"] = SantoParser.parse
+    return registro
+
+
+def input_avversari(dimensione: int) -> Dict[str, str]:
+    """Input patologici di circa `dimensione` caratteri"""
+    def ripeti(blocco: str) -> str:
+        return blocco * max(1, dimensione // len(blocco))
+
+    intestazioni = ["INNO\n", "1 ant.\n", "2 ant.\n", "3 ant.\n", "SALMO 1 titolo\n", "LETTURA BREVE\n",
+                    "RESPONSORIO BREVE\n", "Ant. al Ben.\n", "Ant. al Magn.\n", "CANTICO DI ZACCARIA\n",
+                    "CANTICO DELLA BEATA VERGINE\n", "INVOCAZIONI\n", "INTERCESSIONI\n", "ORAZIONE\n",
+                    "Gloria al Padre\n", "V.\n", "R.\n", "Lc 1, 68\n", "San Martino\n"]
+    rnd = random.Random(0)
+    mescolate = "".join(rnd.choice(intestazioni) for _ in range(dimensione // 12))
+
+    avversari = {
+        "salmodia_senza_chiusura": "1 ant.\nantifona\n" + ripeti("SALMO 1 titolo\n") + "LETTURA BREVE\n",
+        "antifone_ripetute": ripeti("1 ant.\n") + "LETTURA BREVE\n",
+        "antifona_senza_salmo": "1 ant.\n" + ripeti("riga dell'antifona\n") + "1 ant.\nLETTURA BREVE\n",
+        "numeri_salmo": "1 ant.\nantifona\nSALMO " + ripeti("1 ") + "\n1 ant.\nLETTURA BREVE\n",
+        "spazi": "INNO" + ripeti(" ") + "x",
+        "inno_senza_antifone": "INNO\n" + ripeti("riga dell'inno\n"),
+        "gloria_aperto": "Gloria al Padre " + ripeti("nei secoli "),
+        "versicoli_aperti": ripeti("V.\n \n"),
+        "lettura_aperta": "LETTURA BREVE\nRm 1, 1\n" + ripeti("testo della lettura\n"),
+        "responsorio_aperto": "RESPONSORIO BREVE\n" + ripeti("R. risposta\n"),
+        "antifona_cantico_aperta": "Ant. al Ben.\n" + ripeti("riga\n") + "Ant. al Magn.\n" + ripeti("riga\n"),
+        "cantico_aperto": "CANTICO DI ZACCARIA\nLc 1, 68\n" + ripeti("versetto\n"),
+        "riferimento_cantico": "CANTICO DELLA BEATA VERGINE\nLc" + ripeti(" 1,"),
+        "preci_aperte": "INVOCAZIONI\n" + ripeti("Cristo, ascoltaci\n") + "INTERCESSIONI\n" + ripeti("Salva\n"),
+        "orazione_senza_amen": "ORAZIONE\n" + ripeti("O Dio "),
+        "santi_ripetuti": ripeti("\nSan Martino"),
+        "jquery_aperto": "San Martino\n" + "jQuery('img[data-enlargeable]')" + ripeti("});"),
+        "intestazioni_mescolate": mescolate,
+        "riga_unica": ripeti("parola "),
+    }
+    # Ogni intestazione ripetuta senza il resto della sezione
+    for intestazione in intestazioni:
+        avversari[f"ripetuta:{intestazione.strip()}"] = ripeti(intestazione)
+    return avversari
+
+
+def input_corpus(pagine: Iterable[Tuple[str, str, str]]) -> Dict[str, str]:
+    """Testo estratto (come lo riceve il parser) di ogni pagina del corpus"""
+    return {nome: "\n".join(estrai_testo_ora(ora, html)) for nome, ora, html in pagine}
+
+
+def _esegui(nome: str, testi: List[Tuple[str, str]], uscita):
+    """Processo figlio: esegue un pattern su tutti gli input riportando l'inizio e la durata di ognuno"""
+    # Pipe e non Queue: l'invio è sincrono, mentre il thread di una Queue resterebbe
+    # fermo sul GIL per tutta la durata di una re.search patologica
+    funzione = registro_pattern()[nome]
+    for etichetta, testo in testi:
+        uscita.send(("inizio", etichetta, 0.0))
+        started = time.perf_counter()
+        funzione(testo)
+        uscita.send(("fine", etichetta, time.perf_counter() - started))
+    uscita.send(("completato", "", 0.0))
+    uscita.close()
+
+
+def misura_pattern(nome: str, testi: List[Tuple[str, str]], budget: float) -> Dict:
+    """
+    Esegue un pattern in un processo separato, interrompendolo al primo input che sfora il budget.
+
+    Returns:
+        dict: {"peggiore": (input, secondi), "sforato": input o None}
+    """
+    ricezione, uscita = multiprocessing.Pipe(duplex=False)
+    processo = multiprocessing.Process(target=_esegui, args=(nome, testi, uscita), daemon=True)
+    processo.start()
+    uscita.close()
+
+    risultato = {"peggiore": ("", 0.0), "sforato": None}
+    etichetta_corrente = "avvio"
+    # Il primo messaggio include l'avvio del processo
+    attesa = budget + 5.0
+    completato = False
+    try:
+        while True:
+            if not ricezione.poll(attesa):
+                risultato["sforato"] = etichetta_corrente
+                break
+            try:
+                evento, etichetta, secondi = ricezione.recv()
+            except EOFError:
+                break
+            if evento == "completato":
+                completato = True
+                break
+            if evento == "inizio":
+                etichetta_corrente = etichetta
+                attesa = budget
+            elif evento == "fine":
+                if secondi > risultato["peggiore"][1]:
+                    risultato["peggiore"] = (etichetta, secondi)
+                if secondi > budget:
+                    risultato["sforato"] = etichetta
+                    break
+    finally:
+        if not completato and processo.is_alive():
+            processo.terminate()
+        processo.join()
+        ricezione.close()
+    if risultato["sforato"] is None and not completato:
+        risultato["sforato"] = f"errore (codice {processo.exitcode})"
+    return risultato
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget di tempo dei pattern dei parser su input reali e patologici")
+    parser.add_argument("--dir", help=f"Cartella del corpus (<dir>/<ora>/*.html), predefinita {CORPUS_DIR} "
+                                      "se non si usa --cache-dir")
+    parser.add_argument("--cache-dir", help="Cache HTML di LiturgiaManager")
+    parser.add_argument("--start", default="19000101", help="Prima data della cache (YYYYMMDD)")
+    parser.add_argument("--end", default="21001231", help="Ultima data della cache (YYYYMMDD)")
+    parser.add_argument("--budget", type=float, default=0.5, help="Secondi massimi per pattern e input")
+    parser.add_argument("--dimensione", type=int, default=100_000, help="Caratteri degli input patologici")
+    parser.add_argument("--solo", help="Esegue solo i pattern il cui nome contiene questo testo")
+    args = parser.parse_args()
+
+    cartella = args.dir or (None if args.cache_dir else CORPUS_DIR)
+    if cartella and not os.path.isdir(cartella):
+        parser.error(f"corpus non trovato: {cartella} (registrarlo con python benchmark.py --registra "
+                     "oppure usare --cache-dir)")
+
+    testi = [(f"avversario:{nome}", testo) for nome, testo in input_avversari(args.dimensione).items()]
+    if cartella:
+        testi += [(f"pagina:{nome}", testo) for nome, testo in input_corpus(pagine_da_cartella(cartella)).items()]
+    if args.cache_dir:
+        testi += [(f"cache:{nome}", testo)
+                  for nome, testo in input_corpus(pagine_da_cache(args.cache_dir, args.start, args.end)).items()]
+
+    nomi = [nome for nome in registro_pattern() if not args.solo or args.solo in nome]
+    print(f"⏱️  {len(nomi)} pattern x {len(testi)} input, budget {args.budget:.2f}s per input\n")
+
+    sforati = []
+    for nome in nomi:
+        risultato = misura_pattern(nome, testi, args.budget)
+        peggiore, secondi = risultato["peggiore"]
+        if risultato["sforato"]:
+            sforati.append(nome)
+            print(f"❌ {nome:40} budget sforato su {risultato['sforato']}")
+        else:
+            print(f"✅ {nome:40} {secondi * 1000:8.1f} ms  ({peggiore})")
+
+    print()
+    if sforati:
+        print(f"❌ {len(sforati)} pattern oltre il budget: {', '.join(sforati)}")
+        sys.exit(1)
+    print("✅ Tutti i pattern entro il budget")
+
+
+if __name__ == "__main__":
+    main()
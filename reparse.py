@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Riparsificazione offline della liturgia
+
+Rilegge le pagine HTML archiviate nella cache su disco (vedi HtmlCache),
+esegue estrazione e parsing su tutti i core con un ProcessPoolExecutor e
+riscrive in blocco le righe dei giorni interessati, senza alcun accesso
+alla rete, in modalità di caricamento massivo (LiturgiaDBManager.bulk_load):
+un commit ogni `giorni_per_transazione` giorni invece di uno per giorno.
+Da usare dopo ogni correzione ai parser. Una pagina che non si riesce a
+riparsificare viene segnalata e lascia invariata l'ora già salvata.
+
+Uso:
+    python reparse.py 20240101 20251231 [--cache-dir cache] [--db instance/oremus.db] [--workers N]
+                      [--giorni-per-transazione 500]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from old.lrgyParser import EXTRACTION_BACKENDS, Day, HtmlCache, LiturgiaManager, parse_page
+from completo import LiturgiaDBManager
+
+# Cache e backend di estrazione impostati una sola volta per processo worker
+_worker_cache: Optional[HtmlCache] = None
+_worker_backend = "streaming"
+
+
+def _init_worker(cache_dir: str, backend: str):
+    global _worker_cache, _worker_backend
+    _worker_cache = HtmlCache(cache_dir)
+    _worker_backend = backend
+
+
+def _reparse_day(job: Tuple[str, Dict[str, str]]) -> Tuple[Day, List[Tuple[str, str]]]:
+    """Worker: legge le pagine di un giorno dalla cache e le riparsifica; (giorno, [(ora, errore)])"""
+    date_str, urls = job
+    data = LiturgiaManager._new_day(date_str)
+    errori = []
+    for ora, url in urls.items():
+        try:
+            cached = _worker_cache.get(url, touch=False)
+            if cached:
+                setattr(data, ora, parse_page(ora, cached["html"], date_str, backend=_worker_backend))
+        except Exception as e:
+            # L'ora resta None: replace_days mantiene quella già salvata
+            errori.append((ora, f"{type(e).__name__}: {e}"))
+    return data, errori
+
+
+def plan_jobs(cache: HtmlCache, start_date: str, end_date: str) -> List[Tuple[str, Dict[str, str]]]:
+    """Giorni dell'intervallo con le URL delle ore presenti in cache"""
+    in_cache = cache.list_range(start_date, end_date)
+    jobs = []
+    for date_str in LiturgiaManager._date_list(start_date, end_date):
+        urls = {}
+        for ora in LiturgiaManager.ORE:
+            url = LiturgiaManager.page_url(date_str, ora)
+            if url in in_cache:
+                urls[ora] = url
+        if urls:
+            jobs.append((date_str, urls))
+    return jobs
+
+
+def reparse(start_date: str, end_date: str, cache_dir: str = "cache", db_path: str = "instance/oremus.db",
+            workers: Optional[int] = None, giorni_per_transazione: int = 500, backend: str = "streaming") -> int:
+    """
+    Riparsifica l'intervallo dalla cache e riscrive il database
+
+    Returns:
+        int: Numero di giorni riscritti
+    """
+    cache = HtmlCache(cache_dir)
+    jobs = plan_jobs(cache, start_date, end_date)
+    if not jobs:
+        print(f"⚠️  Nessuna pagina in cache tra {start_date} e {end_date}")
+        return 0
+
+    db_manager = LiturgiaDBManager(db_path)
+    workers = workers or os.cpu_count() or 1
+    print(f"🔁 Riparsificazione di {len(jobs)} giorni con {workers} processi...")
+
+    started = time.perf_counter()
+    riscritti = 0
+    fallite = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_dir, backend)) as executor, \
+            db_manager.bulk_load(giorni_per_transazione=giorni_per_transazione):
+        futures = [executor.submit(_reparse_day, job) for job in jobs]
+        for (date_str, urls), future in zip(jobs, futures):
+            try:
+                data, errori = future.result()
+            except Exception as e:
+                # Worker terminato o pool rotto: il giorno resta com'è, gli altri proseguono
+                print(f"❌ Errore nella riparsificazione di {date_str}: {e}")
+                fallite += len(urls)
+                continue
+            for ora, errore in errori:
+                print(f"❌ Errore nel parsing di {ora} {date_str}: {errore}")
+            fallite += len(errori)
+            if any(getattr(data, ora) for ora in LiturgiaManager.ORE):
+                riscritti += db_manager.replace_days([data])
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {riscritti} giorni riscritti in {elapsed:.1f}s ({len(jobs) / elapsed:.1f} giorni/s)")
+    if fallite:
+        print(f"⚠️  Pagine non riparsificate: {fallite}")
+    return riscritti
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Riparsifica offline le pagine in cache")
+    parser.add_argument("start_date", help="Data iniziale YYYYMMDD")
+    parser.add_argument("end_date", help="Data finale YYYYMMDD")
+    parser.add_argument("--cache-dir", default="cache", help="Cartella della cache HTML")
+    parser.add_argument("--db", default="instance/oremus.db", help="Percorso del database SQLite")
+    parser.add_argument("--workers", type=int, default=None, help="Processi worker (default: tutti i core)")
+    parser.add_argument("--backend", choices=EXTRACTION_BACKENDS, default="streaming",
+                        help="Backend di estrazione del testo")
+    parser.add_argument("--giorni-per-transazione", type=int, default=500, help="Giorni per commit")
+    args = parser.parse_args()
+
+    reparse(args.start_date, args.end_date, cache_dir=args.cache_dir, db_path=args.db, workers=args.workers,
+            giorni_per_transazione=args.giorni_per_transazione, backend=args.backend)
+
+
+if __name__ == "__main__":
+    main()
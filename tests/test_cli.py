@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from old.lrgyParser import HtmlCache, LiturgiaManager
+
+PAGINE = os.path.join(RADICE, "fixtures", "pagine")
+ATTESI = os.path.join(RADICE, "fixtures", "attesi.json")
+
+
+def _esegui(*argomenti) -> str:
+    risultato = subprocess.run([sys.executable, *argomenti], cwd=RADICE, capture_output=True, text=True,
+                               timeout=300)
+    assert risultato.returncode == 0, risultato.stdout + risultato.stderr
+    return risultato.stdout
+
+
+def test_benchmark(tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    assert "pagine/s" in _esegui("benchmark.py", "--dir", PAGINE, "--repeat", "1", "--salva-baseline", baseline)
+    with open(baseline, encoding="utf-8") as f:
+        assert json.load(f)["pagine"] == 3 * len(os.listdir(os.path.join(PAGINE, "vespri")))
+
+
+def test_benchmark_salva_attesi(tmp_path):
+    attesi = str(tmp_path / "attesi.json")
+    _esegui("benchmark.py", "--dir", PAGINE, "--salva-attesi", attesi)
+    with open(attesi, encoding="utf-8") as f, open(ATTESI, encoding="utf-8") as g:
+        assert json.load(f) == json.load(g)
+
+
+@pytest.mark.parametrize("backend", ["streaming", "lxml"])
+def test_verify_extractor(backend):
+    assert "differenze: 0" in _esegui("verify_extractor.py", "--dir", PAGINE, "--backend", backend)
+
+
+def test_regex_harness():
+    assert "Tutti i pattern entro il budget" in _esegui("regex_harness.py", "--dir", PAGINE, "--dimensione", "5000")
+
+
+def test_profile_parser(tmp_path):
+    folded = str(tmp_path / "parser.folded")
+    _esegui("profile_parser.py", "--dir", PAGINE, "--top", "5", "--flamegraph", folded)
+    assert os.path.getsize(folded)
+
+
+def test_import_json(tmp_path):
+    cartella = tmp_path / "json"
+    cartella.mkdir()
+    with open(ATTESI, encoding="utf-8") as f:
+        giorni = json.load(f)
+    for date_str, giorno in giorni.items():
+        with open(cartella / f"liturgia_{date_str}.json", "w", encoding="utf-8") as f:
+            json.dump(giorno, f, ensure_ascii=False)
+
+    db_path = str(tmp_path / "db" / "oremus.db")
+    _esegui("import_json.py", str(cartella), "--db", db_path, "--workers", "2")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert sorted(riga[0] for riga in conn.execute("SELECT data_iso FROM giorni_liturgici")) == sorted(giorni)
+    finally:
+        conn.close()
+
+
+def test_reparse(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    cache = HtmlCache(cache_dir)
+    date = sorted(nome[:-5] for nome in os.listdir(os.path.join(PAGINE, "vespri")))
+    for date_str in date:
+        for ora in LiturgiaManager.ORE:
+            with open(os.path.join(PAGINE, ora, f"{date_str}.html"), encoding="utf-8") as f:
+                cache.put(LiturgiaManager.page_url(date_str, ora), f.read(), date_str=date_str)
+
+    db_path = str(tmp_path / "db" / "oremus.db")
+    _esegui("reparse.py", date[0], date[-1], "--cache-dir", cache_dir, "--db", db_path, "--workers", "2")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM giorni_liturgici").fetchone()[0] == len(date)
+    finally:
+        conn.close()
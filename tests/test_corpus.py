@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+import pytest
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from benchmark import ATTESI_PATH, CORPUS_DATE, CORPUS_DIR
+from old.lrgyParser import BaseLiturgiaParser, LiturgiaManager, PAGINE_ORE, estrai_testo_ora, lxml, parse_page
+from verify_extractor import pagine_da_cartella, verifica
+
+with open(ATTESI_PATH, encoding="utf-8") as f:
+    ATTESI = json.load(f)
+
+BACKEND = ["streaming"] + (["lxml"] if lxml is not None else [])
+# Giorni con script, stili e commenti tra i marcatori
+GIORNI_RUMOROSI = ("20241216", "20250121")
+
+
+def test_corpus_date_coincide_con_le_pagine():
+    date = sorted(date_str for giorni in CORPUS_DATE.values() for date_str in giorni)
+    assert date == sorted(ATTESI)
+    for ora in LiturgiaManager.ORE:
+        assert sorted(nome[:-5] for nome in os.listdir(os.path.join(CORPUS_DIR, ora))) == date
+
+
+@pytest.mark.parametrize("backend", BACKEND)
+@pytest.mark.parametrize("date_str", sorted(ATTESI))
+def test_parsing_uguale_agli_attesi(date_str, backend):
+    giorno = LiturgiaManager._new_day(date_str)
+    for ora in LiturgiaManager.ORE:
+        with open(os.path.join(CORPUS_DIR, ora, f"{date_str}.html"), encoding="utf-8") as f:
+            setattr(giorno, ora, parse_page(ora, f.read(), date_str, backend=backend))
+    assert giorno.to_dict() == ATTESI[date_str]
+
+
+@pytest.mark.parametrize("date_str", GIORNI_RUMOROSI)
+@pytest.mark.parametrize("ora", LiturgiaManager.ORE)
+def test_il_rumore_tra_i_marcatori_conta(ora, date_str):
+    # Senza scartare script e stili il riferimento partirebbe o finirebbe altrove
+    with open(os.path.join(CORPUS_DIR, ora, f"{date_str}.html"), encoding="utf-8") as f:
+        html = f.read()
+    marker = "Santo del Giorno" if ora == "santo_del_giorno" else PAGINE_ORE[ora][1]
+    grezzo = BaseLiturgiaParser.estrai_testo_filtrato_bs4(html, marker, skip_tags=())
+    assert grezzo != estrai_testo_ora(ora, html, estrattore=BaseLiturgiaParser.estrai_testo_filtrato_bs4)
+
+
+@pytest.mark.parametrize("backend", BACKEND)
+def test_estrattori_uguali_al_riferimento_bs4(backend):
+    assert verifica(pagine_da_cartella(CORPUS_DIR), backend=backend)
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+import db_codec
+import migrate_compressione
+import migrate_testi
+from completo import LiturgiaDBManager
+from old.lrgyParser import LiturgiaManager, parse_page
+
+PAGINE = os.path.join(RADICE, "fixtures", "pagine")
+INVOCAZIONE = "Cristo, sole di giustizia, che illumini ogni uomo, accogli la lode del mattino e guida i nostri passi."
+
+
+def _giorno(date_str: str):
+    giorno = LiturgiaManager._new_day(date_str)
+    for ora in LiturgiaManager.ORE:
+        with open(os.path.join(PAGINE, ora, f"{date_str}.html"), encoding="utf-8") as f:
+            setattr(giorno, ora, parse_page(ora, f.read(), date_str))
+    return giorno
+
+
+def _db(tmp_path, *date) -> str:
+    db_path = str(tmp_path / "db" / "oremus.db")
+    assert LiturgiaDBManager(db_path).replace_days([_giorno(date_str) for date_str in date]) == len(date)
+    return db_path
+
+
+def _lettura(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = db_codec.row_factory
+    db_codec.registra_funzioni(conn)
+    return conn
+
+
+def test_interna_e_risolvi():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(db_codec.SCHEMA_TESTI)
+    cursor = conn.cursor()
+
+    assert db_codec.interna(cursor, "Breve") == "Breve"
+    riferimento = db_codec.interna(cursor, INVOCAZIONE)
+    assert db_codec.riferimento(riferimento)
+    assert db_codec.interna(cursor, INVOCAZIONE) == riferimento
+    assert conn.execute("SELECT COUNT(*) FROM testi").fetchone()[0] == 1
+    assert db_codec.risolvi(conn, riferimento) == INVOCAZIONE
+    assert db_codec.decodifica(conn, "Breve") == "Breve"
+
+
+def test_giorno_salvato_si_rilegge_in_chiaro(tmp_path):
+    giorno = _giorno("20241201")
+    db_path = _db(tmp_path, "20241201", "20241225")
+
+    grezzo = sqlite3.connect(db_path)
+    try:
+        gloria, = grezzo.execute("SELECT gloria_al_padre FROM lodi_mattutine WHERE giorno_id = 1").fetchone()
+        assert db_codec.riferimento(gloria)
+        # Le invocazioni non sono più internate: nessuna lettura risolverebbe i riferimenti
+        assert not grezzo.execute(
+            "SELECT COUNT(*) FROM invocazioni WHERE substr(contenuto, 1, ?) = ?",
+            (len(db_codec.PREFISSO_TESTO), db_codec.PREFISSO_TESTO)).fetchone()[0]
+    finally:
+        grezzo.close()
+
+    conn = _lettura(db_path)
+    try:
+        riga = conn.execute("SELECT gloria_al_padre, cantico_finale FROM lodi_mattutine WHERE giorno_id = 1").fetchone()
+        assert riga["gloria_al_padre"] == giorno.lodi_mattutine.gloria_al_padre
+        assert riga["cantico_finale"] == giorno.lodi_mattutine.cantico_finale["contenuto"]
+        salmi = conn.execute(db_codec.SELECT_ANTIFONE_SALMI + " WHERE a.lodi_id = 1 ORDER BY a.id").fetchall()
+        assert [riga["contenuto"] for riga in salmi] == [a.contenuto for a in giorno.lodi_mattutine.antifone_e_salmi]
+    finally:
+        conn.close()
+
+
+def test_migrazione_riporta_in_chiaro_le_colonne_non_piu_internate(tmp_path):
+    db_path = _db(tmp_path, "20241201")
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            riferimento = db_codec.interna(conn.cursor(), INVOCAZIONE)
+            conn.execute("UPDATE invocazioni SET contenuto = ? WHERE id = 1", (riferimento,))
+            # Finché la colonna ha riferimenti, i loro testi non sono orfani
+            assert db_codec.elimina_testi_orfani(conn.cursor()) == 0
+    finally:
+        conn.close()
+
+    migrate_testi.migra(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT contenuto FROM invocazioni WHERE id = 1").fetchone()[0] == INVOCAZIONE
+        assert not conn.execute("SELECT COUNT(*) FROM testi WHERE testo = ?", (INVOCAZIONE,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("algoritmo", ["zlib", "zstd"])
+@pytest.mark.parametrize("con_dizionario", [False, True], ids=["senza_dizionario", "con_dizionario"])
+def test_comprimi_e_decomprimi(algoritmo, con_dizionario):
+    if algoritmo == "zstd" and db_codec.zstandard is None:
+        pytest.skip("zstandard non installato")
+    conn = sqlite3.connect(":memory:")
+    for schema in db_codec.SCHEMA_COMPRESSIONE:
+        conn.execute(schema)
+    dizionario_id = None
+    if con_dizionario:
+        campioni = [f"{INVOCAZIONE} Variante {i}." for i in range(200)]
+        dati = db_codec.addestra_dizionario(campioni, algoritmo, dimensione=4096)
+        dizionario_id = db_codec.salva_dizionario(conn.cursor(), algoritmo, dati)
+
+    testo = f"{INVOCAZIONE} È così che preghiamo: «Venga il tuo regno»."
+    valore = db_codec.comprimi(conn, testo, algoritmo, dizionario_id=dizionario_id)
+    assert db_codec.compresso(valore)
+    assert db_codec.decodifica(conn, valore) == testo
+
+
+def test_codifica_comprime_solo_i_testi_lunghi():
+    conn = sqlite3.connect(":memory:")
+    for schema in db_codec.SCHEMA_COMPRESSIONE:
+        conn.execute(schema)
+    conn.execute("INSERT INTO compressione_colonne (tabella, colonna, algoritmo, livello) VALUES ('salmi', 'contenuto', 'zlib', 9)")
+    compressione = db_codec.Compressione.carica(conn.cursor())
+
+    lungo = " ".join([INVOCAZIONE] * 3)
+    assert compressione.codifica("salmi", "contenuto", INVOCAZIONE[:40]) == INVOCAZIONE[:40]
+    assert compressione.codifica("vespri", "inno", lungo) == lungo
+    assert compressione.codifica("salmi", "contenuto", None) is None
+    valore = compressione.codifica("salmi", "contenuto", lungo)
+    assert db_codec.compresso(valore)
+    assert db_codec.decodifica(conn, valore) == lungo
+
+
+def _contenuti_salmi(conn, giorno_id: int) -> list:
+    return [riga["contenuto"] for riga in conn.execute(db_codec.SELECT_ANTIFONE_SALMI + '''
+        JOIN lodi_mattutine l ON l.id = a.lodi_id WHERE l.giorno_id = ? ORDER BY a.id
+    ''', (giorno_id,))]
+
+
+def test_colonne_compresse_si_rileggono_in_chiaro(tmp_path):
+    giorni = {date_str: _giorno(date_str) for date_str in ("20241201", "20241225")}
+    db_path = _db(tmp_path, "20241201")
+    colonne = ["salmi.contenuto"]
+    assert migrate_compressione.migra(db_path, colonne, dizionario=True) > 0
+
+    # Da qui in poi il manager comprime in scrittura anche i salmi nuovi
+    assert LiturgiaDBManager(db_path).replace_days([giorni["20241225"]]) == 1
+
+    conn = _lettura(db_path)
+    try:
+        # Compressi i salmi migrati e quelli nuovi abbastanza lunghi, in chiaro i brevi
+        righe = conn.execute("SELECT typeof(contenuto), length(testo(contenuto)) FROM salmi WHERE id > 3").fetchall()
+        assert righe and all((tipo == "blob") == (lunghezza >= db_codec.LUNGHEZZA_MINIMA_COMPRESSIONE)
+                             for tipo, lunghezza in righe)
+        assert any(tipo == "blob" for tipo, _ in righe)
+        for giorno_id, date_str in ((1, "20241201"), (2, "20241225")):
+            attesi = [a.contenuto for a in giorni[date_str].lodi_mattutine.antifone_e_salmi]
+            assert _contenuti_salmi(conn, giorno_id) == attesi
+        parola = giorni["20241225"].lodi_mattutine.antifone_e_salmi[0].contenuto.split()[-1]
+        assert conn.execute("SELECT COUNT(*) FROM salmi WHERE testo(contenuto) LIKE ?",
+                            (f"%{parola}%",)).fetchone()[0] >= 1
+    finally:
+        conn.close()
+
+    migrate_compressione.migra(db_path, colonne, disattiva=True)
+    conn = _lettura(db_path)
+    try:
+        assert not conn.execute("SELECT COUNT(*) FROM salmi WHERE typeof(contenuto) = 'blob'").fetchone()[0]
+        assert _contenuti_salmi(conn, 2) == [a.contenuto for a in giorni["20241225"].lodi_mattutine.antifone_e_salmi]
+    finally:
+        conn.close()
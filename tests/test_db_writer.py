@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from completo import LiturgiaDBManager, LiturgiaDBWriter, LiturgiaParserWithDB
+from old.lrgyParser import LiturgiaManager, parse_page
+
+PAGINE = os.path.join(RADICE, "fixtures", "pagine")
+
+
+def _giorno(date_str: str):
+    giorno = LiturgiaManager._new_day(date_str)
+    for ora in LiturgiaManager.ORE:
+        with open(os.path.join(PAGINE, ora, f"{date_str}.html"), encoding="utf-8") as f:
+            setattr(giorno, ora, parse_page(ora, f.read(), date_str))
+    return giorno
+
+
+def _giorni_salvati(db_path: str) -> set:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {riga[0] for riga in conn.execute("SELECT data_iso FROM giorni_liturgici")}
+    finally:
+        conn.close()
+
+
+def test_save_json_restituisce_l_esito_del_commit(tmp_path):
+    db_path = str(tmp_path / "db" / "oremus.db")
+    manager = LiturgiaParserWithDB(output_dir=str(tmp_path / "json"), db_path=db_path, cache_dir=None)
+    try:
+        assert manager.save_json(_giorno("20241201"), "liturgia_20241201.json")
+        # Già visibile a un'altra connessione, senza flush()
+        assert _giorni_salvati(db_path) == {"20241201"}
+
+        rotto = _giorno("20241225")
+        rotto.giorno_settimana = None
+        assert not manager.save_json(rotto, "liturgia_20241225.json")
+        assert _giorni_salvati(db_path) == {"20241201"}
+    finally:
+        manager.close()
+
+
+def test_commit_fallito_annulla_il_lotto(tmp_path):
+    db_manager = LiturgiaDBManager(str(tmp_path / "db" / "oremus.db"))
+    writer = LiturgiaDBWriter(db_manager, attesa_commit=0)
+    salva = db_manager._save_day
+
+    def save_day_con_chiave_rotta(cursor, data):
+        # Vincolo differito: la violazione emerge solo al COMMIT
+        cursor.execute('PRAGMA defer_foreign_keys = ON')
+        cursor.execute("INSERT INTO santi (giorno_id, giorno, nome_santo) VALUES (999999, '1 Dicembre', 'San Nessuno')")
+        return salva(cursor, data)
+
+    db_manager._save_day = save_day_con_chiave_rotta
+    try:
+        assert writer.attendi(writer.submit(_giorno("20241201"))) is False
+        db_manager._save_day = salva
+        assert writer.attendi(writer.submit(_giorno("20241225"))) is True
+    finally:
+        writer.close()
+
+    assert _giorni_salvati(db_manager.db_path) == {"20241225"}
+    assert writer.stato()["falliti"] == 1
+
+
+def test_close_non_si_blocca_se_il_thread_e_fermo_con_la_coda_piena(tmp_path):
+    writer = LiturgiaDBWriter(LiturgiaDBManager(str(tmp_path / "db" / "oremus.db")), queue_size=1)
+    fermo = threading.Thread(target=lambda: None)
+    fermo.start()
+    fermo.join()
+    writer._thread = fermo
+    future = Future()
+    writer._coda.put(("giorno", "20241201", None, future, time.perf_counter()))
+
+    writer.close()
+    assert future.result(timeout=0) is False
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from old.lrgyParser import BaseLiturgiaParser, lxml
+
+ESTRATTORI = [BaseLiturgiaParser.estrai_testo_filtrato]
+if lxml is not None:
+    ESTRATTORI.append(BaseLiturgiaParser.estrai_testo_lxml)
+
+# L'inizio del testo è la seconda occorrenza del marcatore in <body>, ovunque si trovi:
+# ripetuta nello stesso contenitore, la prima fuori dal contenitore, oppure assente.
+# Script, stili, commenti ed entità stanno tra i marcatori
+PAGINE = {
+    "marcatore_ripetuto_nel_contenitore": """<html><body><div class="entry-content">
+        <h1>Lodi mattutine</h1><p>Introduzione</p><h2>Lodi mattutine</h2>
+        <p>INNO</p><p>Splendore della gloria del Padre.</p><p>Condividi</p></div></body></html>""",
+    "marcatore_fuori_dal_contenitore": """<html><head><title>Lodi mattutine</title></head><body>
+        <nav><a href="/">Home</a> <a href="?ora=lodi">Lodi mattutine</a></nav>
+        <script>var x = "Lodi mattutine";</script>
+        <main><p>Menu della liturgia</p></main>
+        <div><h2>Lodi mattutine</h2><p>V. O Dio, vieni a salvarmi.</p>
+        <style>.inno { color: red }</style><!-- commento nel testo -->
+        <p>INNO</p><p>O luce&nbsp;radiosa &amp; santa,<br>splendore del Padre.</p>
+        <p>INNO</p><p>INNO</p><p>x</p><span>Condividi</span><p>Dopo la fine</p></div></body></html>""",
+    "senza_seconda_occorrenza": """<html><body><header>Vespri</header><article>
+        <p>V. O Dio, vieni a salvarmi.</p><p>R. Signore, vieni presto in mio aiuto.</p>
+        <p>Condividi</p><p>Altro</p></article></body></html>""",
+    "testo_fuori_dal_body": """<html><head><title>Lodi mattutine</title><!-- Lodi mattutine --></head>
+        <body><p>Lodi mattutine</p><p>Lodi mattutine</p><p>ORAZIONE</p><p>O Dio.</p></body></html>""",
+}
+
+
+ATTESI = {
+    "marcatore_ripetuto_nel_contenitore": ["Lodi mattutine", "INNO", "Splendore della gloria del Padre."],
+    "marcatore_fuori_dal_contenitore": ["Lodi mattutine", "V. O Dio, vieni a salvarmi.", "commento nel testo", "INNO",
+                                        "O luce\xa0radiosa & santa,", "splendore del Padre.", "INNO"],
+    "senza_seconda_occorrenza": ["Vespri", "V. O Dio, vieni a salvarmi.", "R. Signore, vieni presto in mio aiuto."],
+    "testo_fuori_dal_body": ["Lodi mattutine", "ORAZIONE", "O Dio."],
+}
+
+
+@pytest.mark.parametrize("estrattore", ESTRATTORI, ids=lambda e: e.__name__)
+@pytest.mark.parametrize("nome", sorted(PAGINE))
+def test_estrattori_dalla_seconda_occorrenza_del_marcatore(nome, estrattore):
+    html = PAGINE[nome]
+    marker = "Vespri" if "Vespri" in html else "Lodi mattutine"
+    assert estrattore(html, marker) == ATTESI[nome]
@@ -0,0 +1,103 @@
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from completo import LiturgiaDBManager
+from import_json import importa
+
+
+def _ora(tipo: str, inno: str) -> dict:
+    return {
+        "tipo": tipo,
+        "titolo": "MARTEDI' DELLA XXX SETTIMANA DEL TEMPO ORDINARIO",
+        "versicoli": [{"versicolo": "O Dio, vieni a salvarmi.", "risposta": "Signore, vieni presto in mio aiuto."}],
+        "gloria_al_padre": "Gloria al Padre e al Figlio e allo Spirito Santo.",
+        "inno": inno,
+        "antifone_e_salmi": [
+            {"antifona_numero": "1", "antifona_testo": "Lodate il Signore dai cieli.", "tipo": "SALMO",
+             "numero": "42", "titolo": "Nostalgia del tempio", "contenuto": "Come la cerva anela ai corsi d'acqua."},
+            {"antifona_numero": "2", "antifona_testo": "Salvaci, Signore.", "tipo": "CANTICO",
+             "numero": "Is", "titolo": "38, 10-14", "contenuto": "Io dicevo: a metà dei miei giorni me ne vado."},
+        ],
+        "lettura_breve": {"riferimento": "Rm 13, 11-12", "contenuto": "È ormai tempo di svegliarvi dal sonno."},
+        "responsorio_breve": {"contenuto": "R. Ascolta la mia voce, Signore."},
+        "antifona_cantico_finale": "Benedetto il Signore, Dio d'Israele.",
+        "cantico_finale": {"riferimento": "Lc 1, 68-79", "contenuto": "Benedetto il Signore Dio d'Israele."},
+        "invocazioni": ["Cristo, sole di giustizia, illumina i nostri cuori.", "Re dei secoli, accogli la nostra lode."],
+        "orazione": "O Dio, che ci hai chiamati alla luce. Per il nostro Signore. Amen.",
+    }
+
+
+def _scrivi_giorni(cartella, giorni: int, inno: str = "O luce radiosa del giorno."):
+    cartella.mkdir(exist_ok=True)
+    for giorno in range(1, giorni + 1):
+        data_iso = f"202001{giorno:02d}"
+        data = {
+            "data": f"{giorno:02d}/01/2020",
+            "data_iso": data_iso,
+            "giorno_settimana": "Wednesday",
+            "lodi_mattutine": _ora("lodi-mattutine", inno),
+            "vespri": _ora("vespri", inno),
+            "santo_del_giorno": {
+                "giorno": f"{giorno} Gennaio",
+                "santo_principale": {"nome": "San Martino di Tours", "martirologio": "vescovo"},
+                "altri_santi": [{"nome": "Santa Maria degli Angeli", "martirologio": "vergine e monaca."}],
+            },
+        }
+        (cartella / f"liturgia_{data_iso}.json").write_text(json.dumps(data), encoding="utf-8")
+
+
+def _conteggi(db_path) -> dict:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            tabella: conn.execute(f"SELECT COUNT(*) FROM {tabella}").fetchone()[0]
+            for tabella in ("giorni_liturgici", "lodi_mattutine", "vespri", "antifone_salmi",
+                            "versicoli", "invocazioni", "orazioni", "santi")
+        }
+    finally:
+        conn.close()
+
+
+def test_reimport_su_db_popolato_sostituisce_i_giorni(tmp_path):
+    db_path = str(tmp_path / "oremus.db")
+    cartella = tmp_path / "json"
+    _scrivi_giorni(cartella, 5)
+
+    primo = importa([str(cartella)], db_path=db_path, workers=1)
+    conteggi = _conteggi(db_path)
+    assert primo["importati"] == 5
+    assert conteggi["giorni_liturgici"] == 5
+    assert conteggi["santi"] == 10
+
+    _scrivi_giorni(cartella, 5, inno="Inno aggiornato.")
+    secondo = importa([str(cartella)], db_path=db_path, workers=1)
+    assert secondo["importati"] == 5
+    assert _conteggi(db_path) == conteggi
+
+    conn = sqlite3.connect(db_path)
+    try:
+        inni = {riga[0] for riga in conn.execute("SELECT inno FROM lodi_mattutine")}
+    finally:
+        conn.close()
+    assert inni == {"Inno aggiornato."}
+
+
+def test_bulk_load_mantiene_gli_indici_delle_sostituzioni(tmp_path):
+    db_path = str(tmp_path / "oremus.db")
+    cartella = tmp_path / "json"
+    _scrivi_giorni(cartella, 2)
+    importa([str(cartella)], db_path=db_path, workers=1)
+
+    db_manager = LiturgiaDBManager(db_path)
+    with db_manager.bulk_load() as bulk:
+        indici = {riga[0] for riga in bulk.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        piano = " ".join(str(riga) for riga in bulk.conn.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM santi WHERE giorno_id = 1"))
+
+    assert set(LiturgiaDBManager.INDICI_SCRITTURA) <= indici
+    assert not set(LiturgiaDBManager.INDICI_LETTURA) & indici
+    assert "idx_santi_giorno" in piano
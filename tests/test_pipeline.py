@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from completo import LiturgiaParserWithDB
+from pipeline import LiturgiaPipeline
+
+PAGINE = os.path.join(RADICE, "fixtures", "pagine")
+DATE = ("20241201", "20241225", "20250305")
+
+
+def _manager(tmp_path) -> LiturgiaParserWithDB:
+    manager = LiturgiaParserWithDB(output_dir=str(tmp_path / "json"), db_path=str(tmp_path / "db" / "oremus.db"),
+                                   cache_dir=None)
+
+    def fetch(url, date_str):
+        ora = next(ora for ora in manager.ORE if manager.page_url(date_str, ora) == url)
+        with open(os.path.join(PAGINE, ora, f"{date_str}.html"), encoding="utf-8") as f:
+            return f.read()
+
+    manager._fetch = fetch
+    return manager
+
+
+def _esegui(tmp_path) -> int:
+    manager = _manager(tmp_path)
+    try:
+        return LiturgiaPipeline(manager, fetch_workers=2, parse_workers=2, queue_size=2,
+                                pages_per_worker=0).run([(date_str, manager.ORE) for date_str in DATE])
+    finally:
+        manager.close()
+
+
+def test_pipeline_salva_i_giorni_e_salta_quelli_invariati(tmp_path):
+    assert _esegui(tmp_path) == len(DATE)
+    for date_str in DATE:
+        with open(tmp_path / "json" / f"liturgia_{date_str}.json", encoding="utf-8") as f:
+            giorno = json.load(f)
+        assert giorno["lodi_mattutine"] and giorno["vespri"] and giorno["santo_del_giorno"]
+
+    assert _esegui(tmp_path) == 0
+
+
+def test_pipeline_termina_se_il_pool_si_rompe(tmp_path, monkeypatch):
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("pool non utilizzabile")
+
+    monkeypatch.setattr(ProcessPoolExecutor, "submit", submit)
+    # Nessuna pagina parsificata, ma la pipeline arriva in fondo al piano
+    _esegui(tmp_path)
+    with open(tmp_path / "json" / f"liturgia_{DATE[-1]}.json", encoding="utf-8") as f:
+        assert json.load(f)["lodi_mattutine"] is None
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+import pytest
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from old.lrgyParser import Day, Hour, LiturgiaManager, Santo, Versicolo, parse_page
+
+PAGINE = os.path.join(RADICE, "fixtures", "pagine")
+DATE = sorted(nome[:-5] for nome in os.listdir(os.path.join(PAGINE, "lodi_mattutine")))
+
+
+def _giorno(date_str: str) -> Day:
+    giorno = LiturgiaManager._new_day(date_str)
+    for ora in LiturgiaManager.ORE:
+        with open(os.path.join(PAGINE, ora, f"{date_str}.html"), encoding="utf-8") as f:
+            setattr(giorno, ora, parse_page(ora, f.read(), date_str))
+    return giorno
+
+
+@pytest.mark.parametrize("date_str", DATE)
+def test_day_round_trip_dal_json(date_str):
+    giorno = _giorno(date_str)
+    assert giorno.lodi_mattutine and giorno.vespri and giorno.santo_del_giorno
+
+    dati = json.loads(json.dumps(giorno.to_dict(), ensure_ascii=False))
+    assert Day.from_dict(dati) == giorno
+    assert Day.from_dict(dati).to_dict() == dati
+    assert "invocazioni" in dati["lodi_mattutine"] and "intercessioni" in dati["vespri"]
+
+
+def test_day_parziale_mantiene_le_ore_mancanti_a_none():
+    giorno = _giorno(DATE[0])
+    giorno.vespri = None
+    giorno.santo_del_giorno = None
+
+    dati = giorno.to_dict()
+    assert dati["vespri"] is None and dati["santo_del_giorno"] is None
+    assert Day.from_dict(dati) == giorno
+
+
+def test_from_dict_lascia_none_le_chiavi_assenti():
+    ora = Hour.from_dict({"tipo": "lodi-mattutine", "versicoli": [{"versicolo": "O Dio, vieni a salvarmi."}]})
+
+    assert ora.inno is None and ora.orazione is None
+    assert ora.versicoli == [Versicolo("O Dio, vieni a salvarmi.", None)]
+    assert ora.preci == [] and ora.lettura_breve == {}
+    assert Santo.from_dict({}) == Santo(None, None)
+    assert Hour.from_dict(ora.to_dict()) == ora
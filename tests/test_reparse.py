@@ -0,0 +1,43 @@
+import os
+import sqlite3
+import sys
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RADICE)
+
+from old.lrgyParser import HtmlCache, LiturgiaManager
+from reparse import reparse
+
+PAGINE = os.path.join(RADICE, "fixtures", "pagine")
+DATE = sorted(nome[:-5] for nome in os.listdir(os.path.join(PAGINE, "lodi_mattutine")))
+
+
+def _cache(tmp_path) -> str:
+    cache_dir = str(tmp_path / "cache")
+    cache = HtmlCache(cache_dir)
+    for date_str in DATE:
+        for ora in LiturgiaManager.ORE:
+            with open(os.path.join(PAGINE, ora, f"{date_str}.html"), encoding="utf-8") as f:
+                cache.put(LiturgiaManager.page_url(date_str, ora), f.read(), date_str=date_str)
+    return cache_dir
+
+
+def test_reparse_riscrive_i_giorni_in_cache(tmp_path):
+    db_path = str(tmp_path / "db" / "oremus.db")
+    assert reparse(DATE[0], DATE[-1], cache_dir=_cache(tmp_path), db_path=db_path, workers=2) == len(DATE)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM lodi_mattutine").fetchone()[0] == len(DATE)
+        assert conn.execute("SELECT COUNT(*) FROM vespri").fetchone()[0] == len(DATE)
+    finally:
+        conn.close()
+
+
+def test_reparse_prosegue_se_le_pagine_falliscono(tmp_path, capsys):
+    # Un backend sconosciuto fa fallire l'estrazione di ogni pagina nei worker
+    riscritti = reparse(DATE[0], DATE[-1], cache_dir=_cache(tmp_path), db_path=str(tmp_path / "db" / "oremus.db"),
+                        workers=2, backend="sconosciuto")
+
+    assert riscritti == 0
+    assert f"Pagine non riparsificate: {len(DATE) * len(LiturgiaManager.ORE)}" in capsys.readouterr().out
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Verifica dell'estrattore di testo in streaming
+
+Confronta estrai_testo_filtrato (parser a eventi) o, con --backend lxml,
+l'estrazione con il parser di lxml con l'implementazione originale basata su
+BeautifulSoup su un corpus di pagine salvate e segnala ogni pagina il cui
+testo estratto differisce.
+
+Il corpus può essere una cartella organizzata per ora
+(<dir>/lodi_mattutine/*.html, <dir>/vespri/*.html, <dir>/santo_del_giorno/*.html)
+oppure la cache HTML su disco di LiturgiaManager.
+
+Uso:
+    python verify_extractor.py --dir fixtures/pagine [--backend lxml]
+    python verify_extractor.py --cache-dir cache --start 20250101 --end 20251231
+"""
+import argparse
+import difflib
+import os
+import sys
+import time
+from typing import Iterator, Tuple
+
+from old.lrgyParser import (BaseLiturgiaParser, EXTRACTION_BACKENDS, HtmlCache, LiturgiaManager, PAGINE_ORE,
+                            estrai_testo_ora)
+
+
+def ora_da_url(url: str) -> str:
+    if "santo-del-giorno" in url:
+        return "santo_del_giorno"
+    for ora, (parametro, _, _) in PAGINE_ORE.items():
+        if f"ora={parametro}" in url:
+            return ora
+    return ""
+
+
+def pagine_da_cartella(cartella: str) -> Iterator[Tuple[str, str, str]]:
+    """Restituisce (nome, ora, html) per ogni pagina del corpus su disco"""
+    for ora in LiturgiaManager.ORE:
+        sottocartella = os.path.join(cartella, ora)
+        if not os.path.isdir(sottocartella):
+            continue
+        for nome in sorted(os.listdir(sottocartella)):
+            if nome.endswith(".html"):
+                with open(os.path.join(sottocartella, nome), "r", encoding="utf-8") as f:
+                    yield f"{ora}/{nome}", ora, f.read()
+
+
+def pagine_da_cache(cache_dir: str, start_date: str, end_date: str) -> Iterator[Tuple[str, str, str]]:
+    cache = HtmlCache(cache_dir)
+    for url in sorted(cache.list_range(start_date, end_date)):
+        ora = ora_da_url(url)
+        cached = cache.get(url, touch=False)
+        if ora and cached:
+            yield url, ora, cached["html"]
+
+
+def verifica(pagine: Iterator[Tuple[str, str, str]], mostra_diff: bool = True, backend: str = "streaming") -> bool:
+    totale = 0
+    differenze = 0
+    tempo_bs4 = 0.0
+    tempo_streaming = 0.0
+
+    for nome, ora, html in pagine:
+        totale += 1
+        started = time.perf_counter()
+        atteso = estrai_testo_ora(ora, html, estrattore=BaseLiturgiaParser.estrai_testo_filtrato_bs4)
+        tempo_bs4 += time.perf_counter() - started
+
+        started = time.perf_counter()
+        ottenuto = estrai_testo_ora(ora, html, backend=backend)
+        tempo_streaming += time.perf_counter() - started
+
+        if atteso != ottenuto:
+            differenze += 1
+            print(f"❌ {nome}: testo estratto diverso")
+            if mostra_diff:
+                for riga in difflib.unified_diff(atteso, ottenuto, "bs4", backend, lineterm="", n=1):
+                    print(f"    {riga}")
+
+    if not totale:
+        print("⚠️  Nessuna pagina trovata")
+        return False
+
+    print(f"\n📊 Pagine verificate: {totale} | differenze: {differenze}")
+    print(f"⏱️  BeautifulSoup: {tempo_bs4 / totale * 1000:.2f} ms/pagina | "
+          f"{backend}: {tempo_streaming / totale * 1000:.2f} ms/pagina")
+    return differenze == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confronta l'estrattore in streaming con quello BeautifulSoup")
+    parser.add_argument("--dir", help="Cartella del corpus (<dir>/<ora>/*.html)")
+    parser.add_argument("--cache-dir", help="Cartella della cache HTML")
+    parser.add_argument("--start", default="00000000", help="Data iniziale YYYYMMDD (con --cache-dir)")
+    parser.add_argument("--end", default="99999999", help="Data finale YYYYMMDD (con --cache-dir)")
+    parser.add_argument("--backend", choices=EXTRACTION_BACKENDS, default="streaming",
+                        help="Backend da confrontare con BeautifulSoup")
+    parser.add_argument("--no-diff", action="store_true", help="Non mostrare le differenze riga per riga")
+    args = parser.parse_args()
+
+    if args.dir:
+        if not os.path.isdir(args.dir):
+            parser.error(f"corpus non trovato: {args.dir}")
+        pagine = pagine_da_cartella(args.dir)
+    elif args.cache_dir:
+        pagine = pagine_da_cache(args.cache_dir, args.start, args.end)
+    else:
+        parser.error("specificare --dir oppure --cache-dir")
+
+    sys.exit(0 if verifica(pagine, mostra_diff=not args.no_diff, backend=args.backend) else 1)
+
+
+if __name__ == "__main__":
+    main()